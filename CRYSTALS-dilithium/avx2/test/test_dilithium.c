@@ -8,10 +8,13 @@ Description: Aggiornati i parametri di test
 #include <stddef.h>
 #include <stdint.h>
 #include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
 #include <time.h> // Libreria per la misurazione dei tempi
 #include <openssl/sha.h> // Include OpenSSL for SHA-256
 #include "../randombytes.h"
 #include "../sign.h"
+#include "bench_utils.h"
 
 #define SHA256LEN 32
 #define SHA512LEN 64
@@ -51,15 +54,29 @@ int loop(const char* filename, int sha256, int sha512)
   uint8_t pk[CRYPTO_PUBLICKEYBYTES];
   uint8_t sk[CRYPTO_SECRETKEYBYTES];
   clock_t start, end;                   // Variabili per misurare i tempi di esecuzione di algoritmi
-  double keygen_time[ITERATIONS];       // Valore dei tempi di keygen
-  double signature_time[ITERATIONS];    // Valore dei tempi di firma
-  double ok_check_time[ITERATIONS];     // Valore dei tempi di verifica
-  long keygen_cycles[ITERATIONS];
-  long signature_cycles[ITERATIONS];
-  long ok_check_cycles[ITERATIONS];
+  double target = target_rel_error();   // Errore relativo del campionamento adattivo (0 = disattivato)
+  size_t warmup = target > 0 ? WARMUP_ITERATIONS : 0;
+  size_t max_iterations = target > 0 ? ITERATIONS * MAX_ITERATIONS_FACTOR : ITERATIONS;
+  size_t round, n;
+  // Tempi e cicli di ogni iterazione, allocati in due blocchi (con il campionamento adattivo possono essere molti)
+  double *times = malloc(3 * max_iterations * sizeof(double));
+  long *cycles = malloc(3 * max_iterations * sizeof(long));
+  double *keygen_time = times;                            // Valore dei tempi di keygen
+  double *signature_time = times + max_iterations;        // Valore dei tempi di firma
+  double *ok_check_time = times + 2 * max_iterations;     // Valore dei tempi di verifica
+  long *keygen_cycles = cycles;
+  long *signature_cycles = cycles + max_iterations;
+  long *ok_check_cycles = cycles + 2 * max_iterations;
   uint8_t hash256[SHA256LEN];
   uint8_t hash512[SHA512LEN];
 
+  if (times == NULL || cycles == NULL) {
+    fprintf(stderr, "ERRORE - Memoria insufficiente per %zu iterazioni\n", max_iterations);
+    free(times);
+    free(cycles);
+    return -1;
+  }
+
   // ====== AVVIO CICLO PER MESSAGGIO COMPLETO ======
   FILE *file = fopen(filename, "w");
   // Errore di apertura?
@@ -67,12 +84,15 @@ int loop(const char* filename, int sha256, int sha512)
     perror("Errore nell'aprire il file");
     return -1;
   }
+  FILE *samples = open_samples(filename);
 	printf("|MLEN|MTOTLEN|PUBLEN|PRVLEN|SIGLEN|KGTM|SIGTM|CHECKTM|HASHSZ|\r\n");
 
   for(MLEN = MINMLEN; MLEN < MAXMLEN; MLEN = MLEN * INCREMENT) 
   {
-    for(i = 0; i < ITERATIONS; i++)
+    for(round = 0, n = 0; n < max_iterations; round++)
     {
+      // Le iterazioni di riscaldamento vengono scritte nella prima posizione e poi sovrascritte
+      i = round < warmup ? 0 : round - warmup;
       // Generazione del messaggio
       randombytes(m, MLEN);
       // Calcolo HASH SHA256 del messaggio:
@@ -183,25 +203,45 @@ int loop(const char* filename, int sha256, int sha512)
       {
         fprintf(stderr, "INFO - Verifica della firma riuscita!\n\n");
       }
+
+      // Fine del campionamento: ITERATIONS iterazioni oppure, se adattivo, medie stabili
+      if(round >= warmup)
+      {
+        n = i + 1;
+        if(n >= ITERATIONS && (target <= 0 || (converged(keygen_time, n, target) &&
+            converged(signature_time, n, target) && converged(ok_check_time, n, target))))
+          break;
+      }
     }
 
     char output_line[512];
     sprintf(output_line, "|%lu|%lu|%d|%d|%d|%f|%f|%f|%lu|\r\n", 
       MLEN, smlen, CRYPTO_PUBLICKEYBYTES, CRYPTO_SECRETKEYBYTES, CRYPTO_BYTES, 
-      average_double(keygen_time, ITERATIONS), 
-      average_double(signature_time, ITERATIONS),
-      average_double(ok_check_time, ITERATIONS), mlen);
+      average_double(keygen_time, n), 
+      average_double(signature_time, n),
+      average_double(ok_check_time, n), mlen);
+    if(target > 0)
+      append_stats(output_line, sizeof(output_line), n, ci_double(keygen_time, n),
+        n, ci_double(signature_time, n), n, ci_double(ok_check_time, n));
     printf("%s", output_line);
 
     // Scrittura nel file
     if (fprintf(file, "%s", output_line) < 0) {
       perror("Errore nella scrittura del file");
       fclose(file);
+      close_samples(samples);
+      return -1;
+    }
+    // Scrittura dei campioni grezzi
+    if (write_samples(samples, MLEN, keygen_time, n, signature_time, n, ok_check_time, n) != 0) {
+      fclose(file);
+      close_samples(samples);
       return -1;
     }
   }
 
-  // Chiusura del file:
+  // Chiusura dei file:
+  close_samples(samples);
   if (fclose(file) != 0) {
     perror("Errore nella chiusura del file");
     return -1;
@@ -211,6 +251,8 @@ int loop(const char* filename, int sha256, int sha512)
   free(m);
   free(m2);
   free(sm);
+  free(times);
+  free(cycles);
 
   printf("CRYPTO_PUBLICKEYBYTES = %d\n", CRYPTO_PUBLICKEYBYTES);
   printf("CRYPTO_SECRETKEYBYTES = %d\n", CRYPTO_SECRETKEYBYTES);
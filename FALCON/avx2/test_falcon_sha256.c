@@ -8,10 +8,12 @@ Description: modifica dei parametri di test
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
+#include <stdint.h>
 #include <time.h>
 #include <openssl/sha.h> // Include OpenSSL for SHA-256
 #include "falcon.h"
 #include "randombytes.h"
+#include "bench_utils.h"
 
 #define SHALEN 32
 #define MINMLEN 32 // Minima lunghezza messaggio in bytes
@@ -20,6 +22,7 @@ int INCREMENT = 2;
 int ITERATIONS = 100;
 long unsigned int MLEN = MINMLEN; // Message Length in Bytes
 FILE *file; // File di output
+FILE *samples_file; // File dei campioni grezzi (NULL se non attivo)
 
 static void * xmalloc(size_t len)
 {
@@ -43,6 +46,17 @@ static void xfree(void *buf)
 	}
 }
 
+// Funzione per calcolare la media dei tempi
+static double average_double(double *t, size_t tlen)
+{
+	size_t i;
+	double acc = 0;
+
+	for (i = 0; i < tlen; i++)
+		acc += t[i];
+	return acc / tlen;
+}
+
 /*
  * Benchmark function takes an opaque context and an iteration count;
  * it returns 0 on success, a negative error code on error.
@@ -52,13 +66,34 @@ typedef int (*bench_fun)(void *ctx, unsigned long num);
 /*
  * Returned value is the time per iteration in nanoseconds. If the
  * benchmark function reports an error, 0.0 is returned.
+ * If samples is not NULL, the time of each iteration (in seconds)
+ * is stored in samples[i]: the buffer must hold max_bench_iterations(iterations)
+ * values. If count/ci are not NULL, they receive the number of measured
+ * iterations and the 95% confidence interval half-width of the mean (in seconds).
+ * With TARGET_REL_ERROR set, the loop is adaptive: WARMUP_ITERATIONS discarded
+ * iterations, then from iterations up to iterations * MAX_ITERATIONS_FACTOR
+ * iterations, until the mean reaches the requested relative error.
  */
-static double do_bench(bench_fun bf, void *ctx, unsigned int iterations) {
-    unsigned long num;
-    double total_time = 0.0;
+static size_t max_bench_iterations(unsigned int iterations) {
+    return target_rel_error() > 0 ? (size_t)iterations * MAX_ITERATIONS_FACTOR : (size_t)iterations;
+}
+
+static double do_bench(bench_fun bf, void *ctx, unsigned int iterations, double *samples, size_t *count, double *ci) {
+    double target = target_rel_error();
+    size_t warmup = target > 0 ? WARMUP_ITERATIONS : 0;
+    size_t max_iterations = max_bench_iterations(iterations);
+    double *times = samples != NULL ? samples : xmalloc(max_iterations * sizeof(double));
+    size_t n = 0;
+    double mean;
     int r;
 
-    for (unsigned int i = 0; i < iterations; i++) {
+    if (count != NULL) {
+        *count = 0;
+    }
+    if (ci != NULL) {
+        *ci = 0.0;
+    }
+    for (size_t i = 0; n < max_iterations; i++) {
         clock_t begin, end;
         double tt;
 
@@ -67,13 +102,32 @@ static double do_bench(bench_fun bf, void *ctx, unsigned int iterations) {
         end = clock();
         if (r != 0) {
             fprintf(stderr, "ERR: %d\n", r);
+            if (times != samples) {
+                xfree(times);
+            }
             return 0.0;
         }
         tt = (double)(end - begin) / (double)CLOCKS_PER_SEC;
-        total_time += tt;
+        if (i < warmup) {
+            continue; // Iterazione di riscaldamento, scartata
+        }
+        times[n++] = tt;
+        if (n >= iterations && (target <= 0 || converged(times, n, target))) {
+            break;
+        }
     }
 
-    return (total_time / (double)iterations) * 1000000000.0; // Convert to microseconds for consistency
+    mean = average_double(times, n);
+    if (count != NULL) {
+        *count = n;
+    }
+    if (ci != NULL) {
+        *ci = ci_double(times, n);
+    }
+    if (times != samples) {
+        xfree(times);
+    }
+    return mean * 1000000000.0; // Convert to nanoseconds for consistency
 }
 
 typedef struct {
@@ -83,7 +137,6 @@ typedef struct {
 	size_t tmp_len;
 	uint8_t *pk;
 	uint8_t *sk;
-	uint8_t *esk;
 	uint8_t *sig;
 	size_t sig_len;
 	uint8_t *sigct;
@@ -149,66 +202,6 @@ static int bench_sign_dyn_ct(void *ctx, unsigned long num)
 	return 0;
 }
 
-static int bench_expand_privkey(void *ctx, unsigned long num)
-{
-	bench_context *bc;
-
-	bc = ctx;
-	while (num -- > 0) {
-		CC(falcon_expand_privkey(
-			bc->esk, FALCON_EXPANDEDKEY_SIZE(bc->logn),
-			bc->sk, FALCON_PRIVKEY_SIZE(bc->logn),
-			bc->tmp, bc->tmp_len));
-	}
-	return 0;
-}
-
-static int bench_sign_tree(void *ctx, unsigned long num)
-{
-	bench_context *bc;
-
-	bc = ctx;
-	while (num -- > 0) {
-		bc->sig_len = FALCON_SIG_COMPRESSED_MAXSIZE(bc->logn);
-		CC(falcon_sign_tree(&bc->rng,
-			bc->sig, &bc->sig_len, FALCON_SIG_COMPRESSED,
-			bc->esk,
-			bc->hash, SHALEN, bc->tmp, bc->tmp_len)); // Aggiunto il riferimento all'hash messaggio variabile
-	}
-	return 0;
-}
-
-static int bench_sign_tree_ct(void *ctx, unsigned long num)
-{
-	bench_context *bc;
-
-	bc = ctx;
-	while (num -- > 0) {
-		bc->sigct_len = FALCON_SIG_CT_SIZE(bc->logn);
-		CC(falcon_sign_tree(&bc->rng,
-			bc->sigct, &bc->sigct_len, FALCON_SIG_CT,
-			bc->esk,
-			bc->hash, SHALEN, bc->tmp, bc->tmp_len)); // Aggiunto il riferimento all'hash messaggio variabile
-	}
-	return 0;
-}
-
-static int bench_verify(void *ctx, unsigned long num)
-{
-	bench_context *bc;
-	size_t pk_len;
-
-	bc = ctx;
-	pk_len = FALCON_PUBKEY_SIZE(bc->logn);
-	while (num -- > 0) {
-		CC(falcon_verify(
-			bc->sig, bc->sig_len, FALCON_SIG_COMPRESSED,
-			bc->pk, pk_len,
-			bc->hash, SHALEN, bc->tmp, bc->tmp_len)); // Aggiunto il riferimento all'hash messaggio variabile
-	}
-	return 0;
-}
-
 static int bench_verify_ct(void *ctx, unsigned long num)
 {
 	bench_context *bc;
@@ -249,14 +242,11 @@ static void test_speed_falcon(unsigned logn, double threshold, size_t msg_len)
 	}
 	len = FALCON_TMPSIZE_KEYGEN(logn);
 	len = maxsz(len, FALCON_TMPSIZE_SIGNDYN(logn));
-	len = maxsz(len, FALCON_TMPSIZE_SIGNTREE(logn));
-	len = maxsz(len, FALCON_TMPSIZE_EXPANDPRIV(logn));
 	len = maxsz(len, FALCON_TMPSIZE_VERIFY(logn));
 	bc.tmp = xmalloc(len);
 	bc.tmp_len = len;
 	bc.pk = xmalloc(FALCON_PUBKEY_SIZE(logn));
 	bc.sk = xmalloc(FALCON_PRIVKEY_SIZE(logn));
-	bc.esk = xmalloc(FALCON_EXPANDEDKEY_SIZE(logn));
 	bc.sig = xmalloc(FALCON_SIG_COMPRESSED_MAXSIZE(logn));
 	bc.sig_len = 0;
 	bc.sigct = xmalloc(FALCON_SIG_CT_SIZE(logn));
@@ -266,35 +256,54 @@ static void test_speed_falcon(unsigned logn, double threshold, size_t msg_len)
 
 	// Genero il messaggio
 	randombytes(bc.msg, bc.msg_len);
+
+	// Buffer per i campioni grezzi delle operazioni scritte nel file di output
+	double *kg_samples = NULL, *sdc_samples = NULL, *vvc_samples = NULL;
+	if (samples_file != NULL) {
+		kg_samples = xmalloc(max_bench_iterations(threshold) * sizeof(double));
+		sdc_samples = xmalloc(max_bench_iterations(threshold) * sizeof(double));
+		vvc_samples = xmalloc(max_bench_iterations(threshold) * sizeof(double));
+	}
+
+	// Iterazioni misurate e intervalli di confidenza delle operazioni scritte nel file di output
+	size_t kg_n, sdc_n, vvc_n;
+	double kg_ci, sdc_ci, vvc_ci;
 	// Calcolo HASH SHA256 del messaggio:
 	SHA256(bc.msg, bc.msg_len, bc.hash);
 
-	double kg = do_bench(&bench_keygen, &bc, threshold) / 1000000000.0;
-	double ek = do_bench(&bench_expand_privkey, &bc, threshold) / 1000000000.0;
-	double sd = do_bench(&bench_sign_dyn, &bc, threshold) / 1000000000.0;
-	double sdc = do_bench(&bench_sign_dyn_ct, &bc, threshold) / 1000000000.0;
-	double st = do_bench(&bench_sign_tree, &bc, threshold) / 1000000000.0;
-	double stc = do_bench(&bench_sign_tree_ct, &bc, threshold) / 1000000000.0;
-	double vv = do_bench(&bench_verify, &bc, threshold) / 1000000000.0;
-	double vvc = do_bench(&bench_verify_ct, &bc, threshold) / 1000000000.0;
+	double kg = do_bench(&bench_keygen, &bc, threshold, kg_samples, &kg_n, &kg_ci) / 1000000000.0;
+	double sdc = do_bench(&bench_sign_dyn_ct, &bc, threshold, sdc_samples, &sdc_n, &sdc_ci) / 1000000000.0;
+	double vvc = do_bench(&bench_verify_ct, &bc, threshold, vvc_samples, &vvc_n, &vvc_ci) / 1000000000.0;
+	// Firma compressa (non misurata) per la dimensione della firma scritta nel file di output
+	if (bench_sign_dyn(&bc, 1) != 0) {
+		fprintf(stderr, "signature failed\n");
+		exit(EXIT_FAILURE);
+	}
 
     char output_line[512];
 	sprintf(output_line, "|%zu|%zu|%u|%u|%zu|%f|%f|%f|%d|\r\n",
 		bc.msg_len, bc.msg_len + bc.sig_len, FALCON_PUBKEY_SIZE(bc.logn),
 		FALCON_PRIVKEY_SIZE(bc.logn), bc.sig_len, kg, sdc, vvc, SHALEN);
+	if (target_rel_error() > 0) {
+		append_stats(output_line, sizeof(output_line), kg_n, kg_ci, sdc_n, sdc_ci, vvc_n, vvc_ci);
+	}
 	printf("%s", output_line);
 	// Scrittura nel file
     if (fprintf(file, "%s", output_line) < 0) {
       perror("Errore nella scrittura del file");
     }
+	// Scrittura dei campioni grezzi
+	write_samples(samples_file, bc.msg_len, kg_samples, kg_n, sdc_samples, sdc_n, vvc_samples, vvc_n);
 
 	xfree(bc.tmp);
 	xfree(bc.pk);
 	xfree(bc.sk);
-	xfree(bc.esk);
 	xfree(bc.sig);
 	xfree(bc.sigct);
 	xfree(bc.msg); // Libero il buffer del messaggio
+	xfree(kg_samples);
+	xfree(sdc_samples);
+	xfree(vvc_samples);
 }
 
 int
@@ -332,13 +341,15 @@ main(int argc, char *argv[])
 		perror("Errore nell'aprire il file");
 		return -1;
 	}
+	samples_file = open_samples(filename1);
 	printf("|MLEN|MTOTLEN|PUBLEN|PRVLEN|SIGLEN|KGTM|SIGTM|CHECKTM|HASHSZ|\r\n");
 	for(MLEN = MINMLEN; MLEN < MAXMLEN; MLEN = MLEN * INCREMENT) 
 	{
 		test_speed_falcon(9, ITERATIONS, MLEN); 
 		// 9 --> 2^9 = 256 bit di chiave --> equivale a un livello di sicurezza classico a 128bit
 	}
-	// Chiusura del file:
+	// Chiusura dei file:
+	close_samples(samples_file);
 	if (fclose(file) != 0) {
 		perror("Errore nella chiusura del file");
 		return -1;
@@ -351,13 +362,15 @@ main(int argc, char *argv[])
 		perror("Errore nell'aprire il file");
 		return -1;
 	}
+	samples_file = open_samples(filename2);
 	printf("|MLEN|MTOTLEN|PUBLEN|PRVLEN|SIGLEN|KGTM|SIGTM|CHECKTM|HASHSZ|\r\n");
 	for(MLEN = MINMLEN; MLEN < MAXMLEN; MLEN = MLEN * INCREMENT) 
 	{
 		test_speed_falcon(10, ITERATIONS, MLEN); 
 		// 10 --> 2^10 = 512 bit di chiave --> equivale a un livello di sicurezza classico a 256bit
 	}
-	// Chiusura del file:
+	// Chiusura dei file:
+	close_samples(samples_file);
 	if (fclose(file) != 0) {
 		perror("Errore nella chiusura del file");
 		return -1;
@@ -8,12 +8,14 @@ Description: Modificato con lo standard di output delle altre prove
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
+#include <stdint.h>
 #include <time.h>
 #include <openssl/rsa.h>
 #include <openssl/pem.h>
 #include <openssl/err.h>
 #include <openssl/sha.h>
 #include "randombytes.c"
+#include "bench_utils.h"
 
 #define SHA256LEN 32    // Minima lunghezza dell'hashcode - SHA 256
 #define SHA512LEN 64    // Massima lunghezza dell'hashcode - SHA 512
@@ -48,18 +50,36 @@ void test_rsa(int bits, const char* filename1, const char* filename2)
     BIGNUM *e = BN_new();
     BN_set_word(e, RSA_F4);
     
+    // Campionamento adattivo di firma e verifica (errore relativo 0 = disattivato), il keygen resta fisso
+    double target = target_rel_error();
+    size_t warmup = target > 0 ? WARMUP_ITERATIONS : 0;
+    size_t max_iterations = target > 0 ? ITERATIONS * MAX_ITERATIONS_FACTOR : ITERATIONS;
+    size_t n;
+
     double keygen_time[KEYGEN_ITERATIONS];       // Valore dei tempi di keygen
-    double signature_time[ITERATIONS];    // Valore dei tempi di firma
-    double ok_check_time[ITERATIONS];     // Valore dei tempi di verifica
     long keygen_cycles[KEYGEN_ITERATIONS];
-    long signature_cycles[ITERATIONS];
-    long ok_check_cycles[ITERATIONS];
+
+    // Tempi e cicli di firma e verifica, allocati in due blocchi (con il campionamento adattivo possono essere molti)
+    double *times = malloc(2 * max_iterations * sizeof(double));
+    long *cycles = malloc(2 * max_iterations * sizeof(long));
+    double *signature_time = times;                     // Valore dei tempi di firma
+    double *ok_check_time = times + max_iterations;     // Valore dei tempi di verifica
+    long *signature_cycles = cycles;
+    long *ok_check_cycles = cycles + max_iterations;
+    if (times == NULL || cycles == NULL) {
+        fprintf(stderr, "ERRORE - Memoria insufficiente per %zu iterazioni\n", max_iterations);
+        free(times);
+        free(cycles);
+        return;
+    }
 
     // Apertura file
     FILE *file1 = fopen(filename1, "w");
     // Errore di apertura?
     if (file1 == NULL) {
         perror("Errore nell'aprire il file");
+        free(times);
+        free(cycles);
         return;
     }
 
@@ -69,9 +89,15 @@ void test_rsa(int bits, const char* filename1, const char* filename2)
     if (file2 == NULL) {
         perror("Errore nell'aprire il file");
         fclose(file1);
+        free(times);
+        free(cycles);
         return;
     }
 
+    // Apertura dei file dei campioni grezzi (se attivi)
+    FILE *samples1 = open_samples(filename1);
+    FILE *samples2 = open_samples(filename2);
+
     // Do key-generation test
     printf("Starting keygen tests: ");
     for(int round = 0; round < KEYGEN_ITERATIONS; round++)
@@ -110,8 +136,11 @@ void test_rsa(int bits, const char* filename1, const char* filename2)
         if(VERBOSE_LEVEL >= 1) printf("=== MESSAGE HASHCODE SIZE: %lu", MLEN);
         // Test multiple times
         unsigned int sig_len;
-        for(int round = 0; round < ITERATIONS; round++)
+        n = 0;
+        for(size_t step = 0; n < max_iterations; step++)
         {
+            // Le iterazioni di riscaldamento vengono scritte nella prima posizione e poi sovrascritte
+            size_t round = step < warmup ? 0 : step - warmup;
             unsigned char *message = malloc(MLEN);
             unsigned char *hashcode = malloc(SHA256LEN);
             // Generazione del messaggio casuale
@@ -150,6 +179,15 @@ void test_rsa(int bits, const char* filename1, const char* filename2)
 
             free(message);
             free(sig);
+
+            // Fine del campionamento: ITERATIONS iterazioni oppure, se adattivo, medie stabili
+            if(step >= warmup)
+            {
+                n = round + 1;
+                if(n >= ITERATIONS && (target <= 0 ||
+                    (converged(signature_time, n, target) && converged(ok_check_time, n, target))))
+                    break;
+            }
         }
 
         // Print result:
@@ -157,8 +195,11 @@ void test_rsa(int bits, const char* filename1, const char* filename2)
         sprintf(output_line, "|%lu|%u|%d|%d|%d|%f|%f|%f|%d|\r\n", 
             MLEN, sig_len, pub_len, priv_len, sig_len - SHA256LEN, 
             average_double(keygen_time, KEYGEN_ITERATIONS), 
-            average_double(signature_time, ITERATIONS),
-            average_double(ok_check_time, ITERATIONS), SHA256LEN);
+            average_double(signature_time, n),
+            average_double(ok_check_time, n), SHA256LEN);
+        if(target > 0)
+            append_stats(output_line, sizeof(output_line), KEYGEN_ITERATIONS, ci_double(keygen_time, KEYGEN_ITERATIONS),
+                n, ci_double(signature_time, n), n, ci_double(ok_check_time, n));
         printf("%s", output_line);
 
         // Scrittura nel file
@@ -166,6 +207,21 @@ void test_rsa(int bits, const char* filename1, const char* filename2)
             perror("Errore nella scrittura del file");
             fclose(file1);
             fclose(file2);
+            close_samples(samples1);
+            close_samples(samples2);
+            free(times);
+            free(cycles);
+            return;
+        }
+
+        // Scrittura dei campioni grezzi (il keygen ha solo KEYGEN_ITERATIONS campioni)
+        if (write_samples(samples1, MLEN, keygen_time, KEYGEN_ITERATIONS, signature_time, n, ok_check_time, n) != 0) {
+            fclose(file1);
+            fclose(file2);
+            close_samples(samples1);
+            close_samples(samples2);
+            free(times);
+            free(cycles);
             return;
         }
     }
@@ -178,8 +234,11 @@ void test_rsa(int bits, const char* filename1, const char* filename2)
         if(VERBOSE_LEVEL >= 1) printf("=== MESSAGE HASHCODE SIZE: %lu", MLEN);
         // Test multiple times
         unsigned int sig_len;
-        for(int round = 0; round < ITERATIONS; round++)
+        n = 0;
+        for(size_t step = 0; n < max_iterations; step++)
         {
+            // Le iterazioni di riscaldamento vengono scritte nella prima posizione e poi sovrascritte
+            size_t round = step < warmup ? 0 : step - warmup;
             unsigned char *message = malloc(MLEN);
             unsigned char *hashcode = malloc(SHA512LEN);
             // Generazione del messaggio casuale
@@ -218,6 +277,15 @@ void test_rsa(int bits, const char* filename1, const char* filename2)
 
             free(message);
             free(sig);
+
+            // Fine del campionamento: ITERATIONS iterazioni oppure, se adattivo, medie stabili
+            if(step >= warmup)
+            {
+                n = round + 1;
+                if(n >= ITERATIONS && (target <= 0 ||
+                    (converged(signature_time, n, target) && converged(ok_check_time, n, target))))
+                    break;
+            }
         }
 
         // Print result:
@@ -225,8 +293,11 @@ void test_rsa(int bits, const char* filename1, const char* filename2)
         sprintf(output_line, "|%lu|%u|%d|%d|%d|%f|%f|%f|%d|\r\n", 
             MLEN, sig_len, pub_len, priv_len, sig_len - SHA512LEN, 
             average_double(keygen_time, KEYGEN_ITERATIONS), 
-            average_double(signature_time, ITERATIONS),
-            average_double(ok_check_time, ITERATIONS), SHA512LEN);
+            average_double(signature_time, n),
+            average_double(ok_check_time, n), SHA512LEN);
+        if(target > 0)
+            append_stats(output_line, sizeof(output_line), KEYGEN_ITERATIONS, ci_double(keygen_time, KEYGEN_ITERATIONS),
+                n, ci_double(signature_time, n), n, ci_double(ok_check_time, n));
         printf("%s", output_line);
 
         // Scrittura nel file
@@ -234,11 +305,31 @@ void test_rsa(int bits, const char* filename1, const char* filename2)
             perror("Errore nella scrittura del file");
             fclose(file1);
             fclose(file2);
+            close_samples(samples1);
+            close_samples(samples2);
+            free(times);
+            free(cycles);
+            return;
+        }
+
+        // Scrittura dei campioni grezzi (il keygen ha solo KEYGEN_ITERATIONS campioni)
+        if (write_samples(samples2, MLEN, keygen_time, KEYGEN_ITERATIONS, signature_time, n, ok_check_time, n) != 0) {
+            fclose(file1);
+            fclose(file2);
+            close_samples(samples1);
+            close_samples(samples2);
+            free(times);
+            free(cycles);
             return;
         }
     }
 
-    // Chiusura del file:
+    free(times);
+    free(cycles);
+
+    // Chiusura dei file:
+    close_samples(samples1);
+    close_samples(samples2);
     if (fclose(file1) != 0) {
         perror("Errore nella chiusura del file");
         fclose(file2);
@@ -1,39 +1,211 @@
 #! /usr/bin/env python3
-import fileinput
+
+# Benchmarks all parameter sets: every set is built in its own temporary
+# directory (a copy of the implementation sources), the builds are spread
+# over the available cores and the benchmarks run one at a time on a
+# dedicated core.
+# The output of every benchmark is saved to <output>/<parameter set>.txt;
+# keygen, sign and verify cycles and the key and signature sizes are parsed
+# into a record and appended to the benchmark history in the result store
+# (../output/sphincs_benchmark, see result_store.py).
+#
+#       ./benchmark.py                  # all sets, builds on all cores
+#       ./benchmark.py -j 4 -c 3        # 4 parallel builds, benchmarks on core 3
+
+import argparse
 import itertools
 import os
+import re
+import shutil
+import subprocess
 import sys
-from subprocess import DEVNULL, run
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import NamedTuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BASE_DIR))
+import result_store
 
+# The ref-sha2-* and avx2-sha2-* directories only differ in the default
+# PARAMS of the Makefile (overridden here), so one directory per
+# implementation is enough. The haraka-aesni and shake-avx2 implementations
+# of the upstream repository are not included.
 implementations = [
-                   ('ref', ['shake', 'sha2', 'haraka']),
-                   ('haraka-aesni', ['haraka']),
-                   ('shake-avx2', ['shake']),
-                   ('sha2-avx2', ['sha2']),
+                   ('ref-sha2-128', ['shake', 'sha2', 'haraka']),
+                   ('avx2-sha2-128', ['sha2']),
                    ]
 
 options = ["f", "s"]
 sizes = [128, 192, 256]
 thashes = ['robust', 'simple']
 
-for impl, fns in implementations:
-    params = os.path.join(impl, "params.h")
-    for fn in fns:
-        for opt, size, thash in itertools.product(options, sizes, thashes):
-            paramset = "sphincs-{}-{}{}".format(fn, size, opt)
-            paramfile = "params-{}.h".format(paramset)
+# Build products, not copied to the temporary directories
+BUILD_PRODUCTS = shutil.ignore_patterns('*.o', 'PQCgenKAT_sign', 'benchmark', 'spx', 'fors', 'thashx8',
+                                        'haraka', '*.rsp', '*.req')
+
+# Lines of the test/benchmark.c output: main measurements (sub-measurements start with "  - ") and sizes
+MEASURE_LINE = re.compile(r'^(?P<label>\S[^.]*)\.\.\s+avg\.\s+(?P<us>[\d.]+) us .*median\s+(?P<cycles>[\d,]+) cycles')
+SIZE_LINE = re.compile(r'^(?P<label>Signature|Public key|Secret key) size: (?P<bytes>\d+)')
+MEASURES = {'Generating keypair': 'keygen', 'Signing': 'sign', 'Verifying': 'verify'}
+SIZES = {'Signature': 'signature_size', 'Public key': 'pub_key_size', 'Secret key': 'priv_key_size'}
+
+# Benchmark result of a parameter set (fields as in result_store.SPHINCS_BENCHMARK_COLUMNS)
+class BenchmarkRecord(NamedTuple):
+    run: int
+    impl: str
+    paramset: str
+    hash: str
+    size: int
+    option: str
+    thash: str
+    keygen_cycles: int
+    sign_cycles: int
+    verify_cycles: int
+    keygen_us: float
+    sign_us: float
+    verify_us: float
+    signature_size: int
+    pub_key_size: int
+    priv_key_size: int
+
+# Parses the benchmark output into a record (ValueError if a measurement is missing)
+def parse_benchmark(output, run, impl, paramset, thash):
+    fields = {}
+    for line in output.splitlines():
+        match = MEASURE_LINE.match(line)
+        if match and match.group('label') in MEASURES:
+            name = MEASURES[match.group('label')]
+            fields[name + '_cycles'] = int(match.group('cycles').replace(',', ''))
+            fields[name + '_us'] = float(match.group('us'))
+            continue
+        match = SIZE_LINE.match(line)
+        if match:
+            fields[SIZES[match.group('label')]] = int(match.group('bytes'))
+    _, fn, level = paramset.split('-')
+    fields.update(run=run, impl=impl, paramset=paramset, hash=fn, size=int(level[:-1]), option=level[-1], thash=thash)
+    missing = [field for field in BenchmarkRecord._fields if field not in fields]
+    if missing:
+        raise ValueError("Incomplete benchmark output, missing: {}".format(', '.join(missing)))
+    return BenchmarkRecord(**fields)
+
+# Parameter sets to benchmark: (implementation, parameter set, thash)
+def paramsets():
+    for impl, fns in implementations:
+        for fn in fns:
+            for opt, size, thash in itertools.product(options, sizes, thashes):
+                yield impl, "sphincs-{}-{}{}".format(fn, size, opt), thash
+
+def job_name(impl, paramset, thash):
+    return "{}-{}-{}".format(paramset, thash, impl)
+
+# Builds the benchmark of a parameter set in its temporary directory.
+# Returns the path of the binary (None if the build failed) and the build time
+def build(impl, paramset, thash, scratch_root, cores):
+    start = time.perf_counter()
+    builddir = os.path.join(scratch_root, job_name(impl, paramset, thash))
+    shutil.copytree(os.path.join(BASE_DIR, impl), builddir, ignore=BUILD_PRODUCTS)
+    preexec_fn = (lambda: os.sched_setaffinity(0, cores)) if cores else None
+    process = subprocess.run(["make", "-C", builddir, "benchmarks",
+                              'PARAMS={}'.format(paramset), 'THASH={}'.format(thash)],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, preexec_fn=preexec_fn)
+    if process.returncode != 0:
+        sys.stderr.write(process.stderr)
+        return None, time.perf_counter() - start
+    return os.path.join(builddir, "test", "benchmark"), time.perf_counter() - start
+
+# Runs the benchmark pinned to the given core and captures its output
+def run_benchmark(binary, core):
+    preexec_fn = (lambda: os.sched_setaffinity(0, {core})) if core is not None else None
+    start = time.perf_counter()
+    process = subprocess.run([binary], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                             cwd=os.path.dirname(binary), preexec_fn=preexec_fn)
+    return process.returncode, process.stdout, time.perf_counter() - start
+
+def print_table(rows):
+    header = ('parameter set', 'thash', 'impl', 'keygen [cycles]', 'sign [cycles]', 'verify [cycles]',
+              'sig [B]', 'sign vs prev', 'status')
+    widths = [max(len(str(row[i])) for row in rows + [header]) for i in range(len(header))]
+    for row in [header] + rows:
+        print('  '.join(str(value).ljust(width) for value, width in zip(row, widths)))
+
+# Benchmarks a built parameter set and saves its output.
+# Returns (parameter set, thash, implementation, record or None, status)
+def benchmark(impl, paramset, thash, binary, build_time, core, outdir, run):
+    if binary is None:
+        return (paramset, thash, impl, None, 'build failed')
+    print("Benchmarking", paramset, thash, "using", impl, "on core", core, flush=True)
+    returncode, output, run_time = run_benchmark(binary, core)
+    with open(os.path.join(outdir, job_name(impl, paramset, thash) + '.txt'), 'w') as f:
+        f.write(output)
+    if returncode != 0:
+        return (paramset, thash, impl, None, 'exit {}'.format(returncode))
+    try:
+        return (paramset, thash, impl, parse_benchmark(output, run, impl, paramset, thash), 'ok')
+    except ValueError as error:
+        sys.stderr.write("{} {} {}: {}\n".format(paramset, thash, impl, error))
+        return (paramset, thash, impl, None, 'parse failed')
 
-            print("Benchmarking", paramset, thash, "using", impl, flush=True)
+# Sign cycles of the previous run of every parameter set
+def previous_sign_cycles(store):
+    if not os.path.exists(store):
+        return {}
+    df = result_store.read_sphincs_benchmarks(store).sort_values('run')
+    return {(row.impl, row.paramset, row.thash): row.sign_cycles for row in df.itertuples()}
 
-            params = 'PARAMS={}'.format(paramset)  # overrides Makefile var
-            thash = 'THASH={}'.format(thash)  # overrides Makefile var
+def main(jobs, core, outdir, store):
+    available = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else []
+    if core is None and available:
+        core = available[-1]
+    # With several cores the builds use every core but the benchmark one and run
+    # alongside the benchmarks; with a single core the benchmarks start after the builds
+    build_cores = set(available) - {core}
+    overlap = bool(build_cores)
+    os.makedirs(outdir, exist_ok=True)
+    run = int(time.time())
+    previous = previous_sign_cycles(store)
 
-            run(["make", "-C", impl, "clean", thash, params],
-                stdout=DEVNULL, stderr=sys.stderr)
-            run(["make", "-C", impl, "benchmarks", thash, params],
-                stdout=DEVNULL, stderr=sys.stderr)
-            run(["make", "-C", impl, "benchmark", thash, params],
-                stdout=sys.stdout, stderr=sys.stderr)
+    results = []
+    with tempfile.TemporaryDirectory() as scratch_root:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = {executor.submit(build, impl, paramset, thash, scratch_root, build_cores if overlap else None):
+                       (impl, paramset, thash) for impl, paramset, thash in paramsets()}
+            builds = []
+            for future in as_completed(futures):
+                impl, paramset, thash = futures[future]
+                binary, build_time = future.result()
+                print("Compiled", paramset, thash, "using", impl, "in {:.1f} s".format(build_time), flush=True)
+                builds.append((impl, paramset, thash, binary, build_time))
+                if overlap:
+                    results.append(benchmark(*builds.pop(), core, outdir, run))
+            for args in builds:
+                results.append(benchmark(*args, core, outdir, run))
 
-            print(flush=True)
+    # Append the records to the history and print a summary table
+    records = [record for _, _, _, record, _ in results if record is not None]
+    result_store.append_rows(store, [record._asdict() for record in records], result_store.SPHINCS_BENCHMARK_COLUMNS)
+    rows = []
+    for paramset, thash, impl, record, status in sorted(results):
+        if record is None:
+            rows.append((paramset, thash, impl, '-', '-', '-', '-', '-', status))
+            continue
+        prev = previous.get((impl, paramset, thash))
+        change = "{:+.1f}%".format(100.0 * (record.sign_cycles - prev) / prev) if prev else '-'
+        rows.append((paramset, thash, impl, "{:,}".format(record.keygen_cycles), "{:,}".format(record.sign_cycles),
+                     "{:,}".format(record.verify_cycles), record.signature_size, change, status))
+    print()
+    print_table(rows)
+    print("\n{} records appended to {}".format(len(records), store))
+    return all(status == 'ok' for _, _, _, _, status in results)
 
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the SPHINCS+ parameter sets")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help="number of parallel builds")
+    parser.add_argument('-c', '--core', type=int, help="core dedicated to the benchmarks (default: the last available one)")
+    parser.add_argument('-o', '--output', default=os.path.join(BASE_DIR, 'benchmark_results'),
+                        help="directory for the benchmark output")
+    parser.add_argument('-s', '--store', default=os.path.join(os.path.dirname(BASE_DIR), result_store.SPHINCS_BENCHMARK_FILE),
+                        help="benchmark history file (default: ../output/sphincs_benchmark)")
+    args = parser.parse_args()
+    sys.exit(0 if main(args.jobs, args.core, args.output, os.path.normpath(args.store)) else 1)
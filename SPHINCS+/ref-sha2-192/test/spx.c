@@ -10,11 +10,13 @@ Descrizione: modifica dei parametri di test
 #include <stdlib.h>
 #include <time.h>
 #include <math.h>
+#include <stdint.h>
 #include <openssl/sha.h> // Include OpenSSL for SHA-256 and SHA-512
 
 #include "../api.h"
 #include "../params.h"
 #include "../randombytes.h"
+#include "bench_utils.h"
 
 #define SHA256LEN 32
 #define SHA512LEN 64
@@ -60,6 +62,30 @@ int loop(const char* filename, int sha256, int sha512)
         perror("Errore nell'aprire il file");
         return -1;
     }
+    FILE *samples = open_samples(filename);
+
+    // Campionamento adattivo (errore relativo 0 = disattivato)
+    double target = target_rel_error();
+    size_t warmup = target > 0 ? WARMUP_ITERATIONS : 0;
+    size_t max_iterations = target > 0 ? (size_t)ITERATIONS * MAX_ITERATIONS_FACTOR : (size_t)ITERATIONS;
+
+    // Tempi e cicli di ogni iterazione, allocati in due blocchi (con il campionamento adattivo possono essere molti)
+    double *times = malloc(3 * max_iterations * sizeof(double));
+    long *cycles = malloc(3 * max_iterations * sizeof(long));
+    double *keygen_time = times;                            // Valore dei tempi di keygen
+    double *signature_time = times + max_iterations;        // Valore dei tempi di firma
+    double *ok_check_time = times + 2 * max_iterations;     // Valore dei tempi di verifica
+    long *keygen_cycles = cycles;
+    long *signature_cycles = cycles + max_iterations;
+    long *ok_check_cycles = cycles + 2 * max_iterations;
+    if (times == NULL || cycles == NULL) {
+        fprintf(stderr, "ERRORE - Memoria insufficiente per %zu iterazioni\n", max_iterations);
+        free(times);
+        free(cycles);
+        fclose(file);
+        close_samples(samples);
+        return -1;
+    }
 
     // Intestazione:
     printf("|MLEN|MTOTLEN|PUBLEN|PRVLEN|SIGLEN|KGTM|SIGTM|CHECKTM|HASHSZ|\r\n");
@@ -67,18 +93,15 @@ int loop(const char* filename, int sha256, int sha512)
     // Avvio i test al variare delle dimensioni del messaggio
     for (MLEN = MINMLEN; MLEN <= MAXMLEN; MLEN = (size_t)(MLEN * INCREMENT)) 
     {
-        double keygen_time[ITERATIONS];       // Valore dei tempi di keygen
-        double signature_time[ITERATIONS];    // Valore dei tempi di firma
-        double ok_check_time[ITERATIONS];     // Valore dei tempi di verifica
-        long keygen_cycles[ITERATIONS];
-        long signature_cycles[ITERATIONS];
-        long ok_check_cycles[ITERATIONS];
+        size_t n = 0;                           // Iterazioni misurate
         uint8_t hash256[SHA256LEN];             // Messaggio sottoposto a hashing 256
         uint8_t hash512[SHA512LEN];             // Messaggio sottoposto a hashing 512
 
         // Effettuo 10 iterazioni per ogni dimensione e poi faccio la media dei tempi per operazione
-        for(int round = 0; round < ITERATIONS; round++)
+        for(size_t step = 0; n < max_iterations; step++)
         {
+            // Le iterazioni di riscaldamento vengono scritte nella prima posizione e poi sovrascritte
+            size_t round = step < warmup ? 0 : step - warmup;
             // Generazione delle chiavi
             if(VERBOSE_LEVEL >= 2) printf("Generating keypair..\n");
             clock_t start = clock();
@@ -175,12 +198,21 @@ int loop(const char* filename, int sha256, int sha512)
             free(m);
             free(sm);
             free(mout);
+
+            // Fine del campionamento: ITERATIONS iterazioni oppure, se adattivo, medie stabili
+            if(step >= warmup)
+            {
+                n = round + 1;
+                if(n >= (size_t)ITERATIONS && (target <= 0 || (converged(keygen_time, n, target) &&
+                    converged(signature_time, n, target) && converged(ok_check_time, n, target))))
+                    break;
+            }
         }      
         
         // Calcolo delle medie:
-        double keygen_average_time = average_double(keygen_time, ITERATIONS);
-        double signature_average_time = average_double(signature_time, ITERATIONS);
-        double validation_average_time = average_double(ok_check_time, ITERATIONS);
+        double keygen_average_time = average_double(keygen_time, n);
+        double signature_average_time = average_double(signature_time, n);
+        double validation_average_time = average_double(ok_check_time, n);
         if(VERBOSE_LEVEL >= 1)
         {
             fprintf(stderr, "=== MLEN=%lu | AVG_KG=%f | AVG_SIGN=%f | AVG_VAL=%f ===\n", MLEN, keygen_average_time, signature_average_time, validation_average_time);
@@ -194,17 +226,35 @@ int loop(const char* filename, int sha256, int sha512)
         sprintf(output_line, "|%lu|%llu|%u|%u|%llu|%f|%f|%f|%llu|\r\n",
                 MLEN, smlen, SPX_PK_BYTES, SPX_SK_BYTES, diff,
                 keygen_average_time, signature_average_time, validation_average_time, mlen);
+        if(target > 0)
+            append_stats(output_line, sizeof(output_line), n, ci_double(keygen_time, n),
+                n, ci_double(signature_time, n), n, ci_double(ok_check_time, n));
         printf("%s",output_line);
         // Scrittura nel file
         if (fprintf(file, "%s", output_line) < 0) 
         {
             perror("Errore nella scrittura del file");
             fclose(file);
+            close_samples(samples);
+            free(times);
+            free(cycles);
+            return -1;
+        }
+        // Scrittura dei campioni grezzi
+        if (write_samples(samples, MLEN, keygen_time, n, signature_time, n, ok_check_time, n) != 0) {
+            fclose(file);
+            close_samples(samples);
+            free(times);
+            free(cycles);
             return -1;
         }
     }
 
-    // Chiusura del file:
+    free(times);
+    free(cycles);
+
+    // Chiusura dei file:
+    close_samples(samples);
     if (fclose(file) != 0) {
         perror("Errore nella chiusura del file");
         return -1;
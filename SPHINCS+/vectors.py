@@ -6,7 +6,14 @@
 # With two arguments, checks whether the sha256 sum of the given
 # generated NIST KAT response file is correct, e.g.:
 #
-#       ./vectors.py sphincs-shake-128s-simple shake-avx2
+#       ./vectors.py sphincs-sha2-128f-simple avx2-sha2-128
+#
+# Every instance is built in its own temporary directory and the builds run
+# in parallel. The PQCgenKAT_sign binaries are kept in ../.cache/kat, keyed
+# by the hash of the files PQCgenKAT_sign is built from (Makefile,
+# DET_SOURCES, DET_HEADERS, the params/ header and the local headers they
+# include), the overrides (PARAMS, THASH) and the compiler: an instance is
+# only rebuilt when one of these changes.
 
 import multiprocessing
 import subprocess
@@ -14,9 +21,20 @@ import itertools
 import tempfile
 import hashlib
 import shutil
+import threading
 import os
+import re
 import sys
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(os.path.dirname(BASE_DIR), '.cache', 'kat')
+
+# Implementation used to generate the sums (ref/ in the upstream repository)
+REF_IMPL = 'ref-sha2-128'
+
+# Build products, not copied to the build directories
+BUILD_PRODUCTS = ('*.o', 'PQCgenKAT_sign', 'benchmark', 'spx', 'fors', 'thashx8', 'haraka', '*.rsp', '*.req')
+
 fns = ['shake', 'sha2', 'haraka']
 options = ["f", "s"]
 sizes = [128, 192, 256]
@@ -25,47 +43,130 @@ thashes = ['robust', 'simple']
 def nameFor(fn, opt, size, thash):
     return f"sphincs-{fn}-{size}{opt}-{thash}"
 
-def make(fn, opt, size, thash, bindir, impl):
+# Files PQCgenKAT_sign is built from for the given overrides, as listed by the Makefile
+def katSources(impl, overrides):
+    root = os.path.join(BASE_DIR, impl)
+    files = subprocess.run(["make", "-s", "--no-print-directory", "-C", root, "--eval",
+                            'print-kat-sources: ; @echo Makefile PQCgenKAT_sign.c $(DET_SOURCES) $(DET_HEADERS) params/params-$(PARAMS).h',
+                            "print-kat-sources"] + overrides,
+                           stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True).stdout.split()
+    # Local headers included by those files but missing from HEADERS (e.g. context.h)
+    pending = list(files)
+    while pending:
+        path = os.path.join(root, pending.pop())
+        with open(path, 'r', errors='replace') as f:
+            for header in re.findall(r'^\s*#\s*include\s+"([^"]+)"', f.read(), re.M):
+                header = os.path.normpath(os.path.join(os.path.dirname(os.path.relpath(path, root)), header))
+                if header not in files and os.path.exists(os.path.join(root, header)):
+                    files.append(header)
+                    pending.append(header)
+    return sorted(set(files))
+
+def sourceDigest(impl, overrides):
+    h = hashlib.sha256()
+    root = os.path.join(BASE_DIR, impl)
+    for filename in katSources(impl, overrides):
+        h.update(filename.encode() + b'\0')
+        with open(os.path.join(root, filename), 'rb') as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+# Identifies the compiler used by the Makefile (path, mtime and size)
+def compilerId(impl):
+    cc = subprocess.run(["make", "-s", "--no-print-directory", "-C", os.path.join(BASE_DIR, impl),
+                         "--eval", 'print-cc: ; @echo "$(CC)"', "print-cc"],
+                        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout.split()
+    path = os.path.realpath(shutil.which(cc[0]) or cc[0]) if cc else ''
+    stat = os.stat(path) if os.path.exists(path) else None
+    return f"{path}:{stat.st_mtime_ns}:{stat.st_size}" if stat else path
+
+def cacheKey(impl, overrides, source_digest, compiler_id):
+    h = hashlib.sha256()
+    for part in [impl, source_digest, compiler_id] + overrides:
+        h.update(part.encode() + b'\0')
+    return h.hexdigest()
+
+def make(fn, opt, size, thash, bindir, impl, compiler_id=None):
     name = nameFor(fn, opt, size, thash)
     overrides = [f'PARAMS=sphincs-{fn}-{size}{opt}', 'THASH='+thash]
+    key = cacheKey(impl, overrides, sourceDigest(impl, overrides), compiler_id or compilerId(impl))
+    cached = os.path.join(CACHE_DIR, key, 'PQCgenKAT_sign')
+
+    if os.path.exists(cached):
+        sys.stderr.write(f"Using cached {name}\n")
+        sys.stderr.flush()
+        shutil.copy2(cached, os.path.join(bindir, name))
+        return (name, size)
 
     sys.stderr.write(f"Compiling {name} …\n")
     sys.stderr.flush()
 
-    subprocess.run(["make", "-C", impl, "clean"] + overrides,
-        stdout=subprocess.DEVNULL, stderr=sys.stderr, check=True)
-    subprocess.run(["make", '-j', "-C", impl, "PQCgenKAT_sign"] + overrides,
-        stdout=subprocess.DEVNULL, stderr=sys.stderr, check=True)
-
-    shutil.move(
-        os.path.join(impl, 'PQCgenKAT_sign'),
-        os.path.join(bindir, name),
-    )
+    # Build in a private directory so that several instances can be built at once
+    with tempfile.TemporaryDirectory(dir=bindir) as builddir:
+        builddir = os.path.join(builddir, impl)
+        shutil.copytree(os.path.join(BASE_DIR, impl), builddir,
+                        ignore=shutil.ignore_patterns(*BUILD_PRODUCTS))
+        subprocess.run(["make", "-C", builddir, "PQCgenKAT_sign"] + overrides,
+            stdout=subprocess.DEVNULL, stderr=sys.stderr, check=True)
+
+        # Atomic update of the cache
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        tmp = f"{cached}.{os.getpid()}.tmp"
+        shutil.copy2(os.path.join(builddir, 'PQCgenKAT_sign'), tmp)
+        os.replace(tmp, cached)
+
+        shutil.move(
+            os.path.join(builddir, 'PQCgenKAT_sign'),
+            os.path.join(bindir, name),
+        )
 
     return (name, size)
 
+# Reads the FIFO in chunks and feeds it to the hash (runs in a thread)
+def hashStream(path, h):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+
 def run(name_size, bindir):
     name, size = name_size
     rsp = f'PQCsignKAT_{size//2}.rsp'
-    req = f'PQCsignKAT_{size//2}.req'
 
     with tempfile.TemporaryDirectory() as rundir:
         sys.stderr.write(f"Running {name} …\n")
         sys.stderr.flush()
 
-        subprocess.run([os.path.join(bindir, name)],
-            stdout=subprocess.DEVNULL, stderr=sys.stderr, cwd=rundir, check=True)
-        with open(os.path.join(rundir, rsp), 'rb') as f:
-            h = hashlib.sha256(f.read()).hexdigest()
-            return f"{h} {name}"
+        # The response file is a FIFO: its content is hashed while the process
+        # writes it, without being kept in memory or on disk (only the .req
+        # file, which PQCgenKAT_sign reads back, is written to the directory)
+        fifo = os.path.join(rundir, rsp)
+        os.mkfifo(fifo)
+        h = hashlib.sha256()
+        reader = threading.Thread(target=hashStream, args=(fifo, h))
+        reader.start()
+        try:
+            process = subprocess.run([os.path.join(bindir, name)],
+                stdout=subprocess.DEVNULL, stderr=sys.stderr, cwd=rundir)
+        finally:
+            # If the process exited without opening the FIFO, the thread is still
+            # blocked in open(): open (and close) it for writing to release it
+            while reader.is_alive():
+                try:
+                    os.close(os.open(fifo, os.O_WRONLY | os.O_NONBLOCK))
+                except OSError:
+                    pass
+                reader.join(0.1)
+        process.check_returncode()
+        return f"{h.hexdigest()} {name}"
 
 def generate_sums():
     with tempfile.TemporaryDirectory() as bindir:
         with multiprocessing.Pool() as pool:
-            name_sizes = []
-            for fn in fns:
-                for opt, size, thash in itertools.product(options, sizes, thashes):
-                    name_sizes.append(make(fn, opt, size, thash, bindir, 'ref'))
+            compiler_id = compilerId(REF_IMPL)
+            instances = [(fn, opt, size, thash, bindir, REF_IMPL, compiler_id)
+                         for fn in fns
+                         for opt, size, thash in itertools.product(options, sizes, thashes)]
+            name_sizes = pool.starmap(make, instances)
 
             res = pool.starmap(run, zip(name_sizes, [bindir]*len(name_sizes)))
             res.sort()
@@ -85,7 +186,7 @@ def check_sum(name, impl):
     if not line:
         sys.stderr.write("No such instance\n")
         sys.exit(1)
-    with open('SHA256SUMS', 'r') as f:
+    with open(os.path.join(BASE_DIR, 'SHA256SUMS'), 'r') as f:
         if f.read().find(line + '\n') == -1:
             sys.stderr.write(f"Test vector mismatch: {line}\n")
             sys.exit(2)
@@ -0,0 +1,179 @@
+# Autore: Tomas Lovato
+# Data: 2024/08/30 16:00
+# Cache dei file oggetto per le compilazioni delle implementazioni (stile ccache): si usa come
+# compilatore, es. make CC="python3 build_cache.py gcc". Ogni sorgente viene compilato in un file
+# oggetto indicizzato dall'hash di compilatore, opzioni e sorgente preprocessato, conservato fuori
+# dalle cartelle dei sorgenti e riutilizzato finché sorgenti (headers compresi) e CFLAGS non cambiano.
+# I Makefile che compilano e collegano tutti i sorgenti con un unico comando (Dilithium, SPHINCS+)
+# vengono suddivisi in una compilazione per sorgente più il collegamento finale
+
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+
+# Cartella della cache (assoluta: il wrapper viene eseguito da make nelle cartelle dei sorgenti)
+CACHE_DIR = os.environ.get('BUILD_CACHE_DIR',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'objects'))
+
+# File con un carattere per ogni compilazione: 'h' oggetto trovato in cache, 'm' oggetto compilato
+STATS_FILE = os.path.join(CACHE_DIR, 'stats')
+
+# Estensioni dei sorgenti gestiti dalla cache
+SOURCE_SUFFIXES = ('.c',)
+
+# Opzioni seguite da un argomento separato (es. -o file, -I dir)
+ARG_OPTIONS = {'-o', '-I', '-D', '-U', '-include', '-imacros', '-isystem', '-iquote', '-idirafter',
+               '-MF', '-MT', '-MQ', '-L', '-l', '-Xlinker', '-Xpreprocessor', '-Xassembler'}
+
+# Opzioni che riguardano solo il collegamento e vanno escluse dalla compilazione dei singoli sorgenti
+LINK_PREFIXES = ('-l', '-L', '-Wl,')
+LINK_OPTIONS = {'-Xlinker', '-rdynamic', '-static', '-pthread'}
+LINK_SUFFIXES = ('.o', '.a', '.so')
+
+# Opzioni per cui la cache non si applica: il comando viene eseguito così com'è
+PASSTHROUGH_OPTIONS = {'-E', '-S', '-M', '-MM', '-MD', '-MMD', '-x', '-', '-v', '--version', '-dM'}
+
+# Funzione per eseguire il comando originale senza cache
+def passthrough(command):
+    os.execvp(command[0], command)
+
+# Funzione per suddividere gli argomenti: sorgenti, file di output, opzioni di compilazione
+def parse_args(args):
+    sources = []
+    output = None
+    compile_args = []
+    index = 0
+    while index < len(args):
+        arg = args[index]
+        value = args[index + 1] if arg in ARG_OPTIONS and index + 1 < len(args) else None
+        index += 2 if value is not None else 1
+        if arg == '-o':
+            output = value
+        elif arg in LINK_OPTIONS or arg.startswith(LINK_PREFIXES) or arg.endswith(LINK_SUFFIXES):
+            continue
+        elif not arg.startswith('-') and arg.endswith(SOURCE_SUFFIXES):
+            sources.append(arg)
+        elif arg != '-c':
+            compile_args.extend([arg] if value is None else [arg, value])
+    return sources, output, compile_args
+
+# Funzione per identificare il compilatore senza eseguirlo (percorso, data e dimensione dell'eseguibile)
+def compiler_id(compiler):
+    path = os.path.realpath(shutil.which(compiler) or compiler)
+    stat = os.stat(path)
+    return f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+# Funzione per calcolare la chiave di un file oggetto
+# Con -march=native il sorgente preprocessato non dipende dalla CPU: si aggiungono le macro predefinite
+# del compilatore, che riportano le estensioni disponibili (es. __AVX2__)
+def object_key(compiler, compile_args, source):
+    sha = hashlib.sha256()
+    sha.update(compiler_id(compiler).encode('utf-8'))
+    sha.update('\0'.join(compile_args).encode('utf-8'))
+    preprocessed = subprocess.run([compiler] + compile_args + ['-E', source], stdout=subprocess.PIPE,
+                                  stderr=subprocess.DEVNULL)
+    if preprocessed.returncode != 0:
+        return None
+    sha.update(preprocessed.stdout)
+    if any(arg.endswith('=native') for arg in compile_args):
+        macros = subprocess.run([compiler] + compile_args + ['-dM', '-E', '-x', 'c', os.devnull],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        sha.update(macros.stdout)
+    return sha.hexdigest()
+
+# Funzione per registrare un accesso alla cache (scrittura in append, atomica anche tra più processi)
+def record(hit):
+    with open(STATS_FILE, 'a') as file:
+        file.write('h' if hit else 'm')
+
+# Funzione per ottenere il file oggetto di un sorgente, compilandolo solo se non è già in cache
+# Ritorna il percorso dell'oggetto in cache oppure None se il sorgente non si compila
+# (l'errore viene poi riportato dal comando originale)
+def cached_object(compiler, compile_args, source):
+    key = object_key(compiler, compile_args, source)
+    if key is None:
+        return None
+    path = os.path.join(CACHE_DIR, key[:2], key + '.o')
+    if os.path.exists(path):
+        # Gli avvisi del compilatore vengono riproposti anche quando l'oggetto è in cache
+        with open(path[:-2] + '.stderr', 'rb') as file:
+            sys.stderr.buffer.write(file.read())
+        record(True)
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.' + str(os.getpid()) + '.tmp.o'
+    process = subprocess.run([compiler] + compile_args + ['-c', source, '-o', tmp_path], stderr=subprocess.PIPE)
+    sys.stderr.buffer.write(process.stderr)
+    if process.returncode != 0:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    with open(path[:-2] + '.stderr', 'wb') as file:
+        file.write(process.stderr)
+    os.replace(tmp_path, path)
+    record(False)
+    return path
+
+# Funzione per stampare le statistiche della cache
+def print_stats():
+    count = 0
+    size = 0
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            if name.endswith('.o'):
+                count += 1
+                size += os.path.getsize(os.path.join(root, name))
+    try:
+        with open(STATS_FILE, 'r') as file:
+            accesses = file.read()
+    except OSError:
+        accesses = ''
+    print(f"Cache: {CACHE_DIR}")
+    print(f"Oggetti: {count} ({size / 2**20:.1f} MiB)")
+    print(f"Trovati in cache: {accesses.count('h')}, compilati: {accesses.count('m')}")
+
+def main(argv):
+    if len(argv) < 2 or argv[1] in ('-h', '--help'):
+        print("Uso: python3 build_cache.py <compilatore> <argomenti...> | --stats | --clear")
+        return 0 if len(argv) >= 2 else 1
+    if argv[1] == '--stats':
+        print_stats()
+        return 0
+    if argv[1] == '--clear':
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        return 0
+
+    command = argv[1:]
+    compiler, args = command[0], command[1:]
+    if os.environ.get('BUILD_CACHE_DISABLE') or any(arg in PASSTHROUGH_OPTIONS for arg in args):
+        passthrough(command)
+    sources, output, compile_args = parse_args(args)
+    if not sources:
+        passthrough(command)  # solo collegamento
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    objects = {}
+    for source in sources:
+        path = cached_object(compiler, compile_args, source)
+        if path is None:
+            passthrough(command)
+        objects[source] = path
+
+    # Solo compilazione (-c): gli oggetti vengono copiati dove li attende il Makefile
+    if '-c' in args:
+        if output is not None and len(sources) == 1:
+            shutil.copyfile(objects[sources[0]], output)
+        else:
+            for source, path in objects.items():
+                shutil.copyfile(path, os.path.splitext(os.path.basename(source))[0] + '.o')
+        return 0
+
+    # Collegamento: stessi argomenti del comando originale, con gli oggetti al posto dei sorgenti
+    link_args = [objects.get(arg, arg) if not arg.startswith('-') else arg for arg in args]
+    return subprocess.run([compiler] + link_args).returncode
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,107 @@
+/*
+Author: Tomas Lovato
+Version: 1
+Date: 2024/08/31 10:00
+Description: funzioni comuni ai test delle prestazioni (campioni grezzi e campionamento adattivo)
+*/
+
+#include <math.h>
+#include <stdlib.h>
+#include <string.h>
+
+#include "bench_utils.h"
+
+FILE *open_samples(const char *filename)
+{
+    const char *raw = getenv("RAW_SAMPLES");
+    uint32_t header[2] = {SAMPLES_VERSION, (uint32_t)sizeof(sample_record)};
+    char path[1024];
+    FILE *samples;
+
+    if (raw == NULL || strcmp(raw, "1") != 0)
+        return NULL;
+    snprintf(path, sizeof(path), "%s.samples", filename);
+    samples = fopen(path, "wb");
+    if (samples == NULL) {
+        perror("Errore nell'aprire il file dei campioni");
+        return NULL;
+    }
+    if (fwrite(SAMPLES_MAGIC, 1, 8, samples) != 8 || fwrite(header, sizeof(uint32_t), 2, samples) != 2) {
+        perror("Errore nella scrittura del file dei campioni");
+        fclose(samples);
+        return NULL;
+    }
+    return samples;
+}
+
+int write_samples(FILE *samples, uint64_t msg_len, const double *kg, size_t kglen, const double *sig, size_t siglen, const double *ver, size_t verlen)
+{
+    size_t i, tlen = kglen > siglen ? kglen : siglen;
+    sample_record record;
+
+    if (samples == NULL)
+        return 0;
+    if (verlen > tlen)
+        tlen = verlen;
+    for (i = 0; i < tlen; i++) {
+        record.msg_len = msg_len;
+        record.keygen_time = i < kglen ? kg[i] : NAN;
+        record.sign_time = i < siglen ? sig[i] : NAN;
+        record.verify_time = i < verlen ? ver[i] : NAN;
+        if (fwrite(&record, sizeof(record), 1, samples) != 1) {
+            perror("Errore nella scrittura del file dei campioni");
+            return -1;
+        }
+    }
+    return 0;
+}
+
+void close_samples(FILE *samples)
+{
+    if (samples != NULL && fclose(samples) != 0)
+        perror("Errore nella chiusura del file dei campioni");
+}
+
+double target_rel_error(void)
+{
+    const char *target = getenv("TARGET_REL_ERROR");
+    return target == NULL ? 0.0 : atof(target);
+}
+
+// Funzione per calcolare la media dei tempi
+static double mean_double(const double *t, size_t tlen)
+{
+    size_t i;
+    double acc = 0;
+
+    for (i = 0; i < tlen; i++)
+        acc += t[i];
+    return acc / (double)tlen;
+}
+
+double ci_double(const double *t, size_t tlen)
+{
+    size_t i;
+    double mean, acc = 0;
+
+    if (tlen < 2)
+        return 0.0;
+    mean = mean_double(t, tlen);
+    for (i = 0; i < tlen; i++)
+        acc += (t[i] - mean) * (t[i] - mean);
+    return 1.96 * sqrt(acc / (double)(tlen - 1) / (double)tlen);
+}
+
+int converged(const double *t, size_t tlen, double target)
+{
+    return tlen >= 2 && ci_double(t, tlen) <= target * mean_double(t, tlen);
+}
+
+void append_stats(char *line, size_t size, size_t kg_n, double kg_ci, size_t sig_n, double sig_ci, size_t ver_n, double ver_ci)
+{
+    size_t len = strlen(line);
+
+    if (len >= 2 && line[len - 2] == '\r')
+        len -= 2;
+    snprintf(line + len, size - len, "%zu|%.9f|%zu|%.9f|%zu|%.9f|\r\n", kg_n, kg_ci, sig_n, sig_ci, ver_n, ver_ci);
+}
@@ -0,0 +1,57 @@
+/*
+Author: Tomas Lovato
+Version: 1
+Date: 2024/08/31 10:00
+Description: funzioni comuni ai test delle prestazioni (campioni grezzi e campionamento adattivo)
+*/
+
+#ifndef BENCH_UTILS_H
+#define BENCH_UTILS_H
+
+#include <stddef.h>
+#include <stdint.h>
+#include <stdio.h>
+
+// Campioni grezzi (opzionali, con RAW_SAMPLES=1): <file>.samples accanto al file di output,
+// intestazione "PQSAMPL1" + versione + dimensione del record, poi un record per iterazione
+// (formato letto da result_store.read_samples)
+#define SAMPLES_MAGIC "PQSAMPL1"
+#define SAMPLES_VERSION 1
+
+typedef struct {
+    uint64_t msg_len;
+    double keygen_time;
+    double sign_time;
+    double verify_time;
+} sample_record;
+
+// Campionamento adattivo (opzionale, con TARGET_REL_ERROR=<errore relativo>, es. 0.02): WARMUP_ITERATIONS
+// iterazioni di riscaldamento scartate, poi da ITERATIONS a ITERATIONS * MAX_ITERATIONS_FACTOR iterazioni,
+// fino a quando l'intervallo di confidenza al 95% della media scende sotto l'errore relativo richiesto
+#define WARMUP_ITERATIONS 5
+#define MAX_ITERATIONS_FACTOR 10
+
+// Funzione per aprire il file dei campioni (NULL se la modalità non è attiva)
+FILE *open_samples(const char *filename);
+
+// Funzione per scrivere i campioni di una dimensione del messaggio
+// (i tempi mancanti, es. keygen di RSA con meno iterazioni, vengono scritti come NaN)
+int write_samples(FILE *samples, uint64_t msg_len, const double *kg, size_t kglen, const double *sig, size_t siglen, const double *ver, size_t verlen);
+
+// Funzione per chiudere il file dei campioni
+void close_samples(FILE *samples);
+
+// Funzione per leggere l'errore relativo richiesto (0 se il campionamento adattivo non è attivo)
+double target_rel_error(void);
+
+// Funzione per calcolare la semiampiezza dell'intervallo di confidenza al 95% della media
+double ci_double(const double *t, size_t tlen);
+
+// Funzione per verificare se la media ha raggiunto l'errore relativo richiesto
+int converged(const double *t, size_t tlen, double target);
+
+// Funzione per aggiungere alla riga di output (terminata da "|\r\n") il numero di iterazioni
+// e la semiampiezza dell'intervallo di confidenza di keygen, firma e verifica
+void append_stats(char *line, size_t size, size_t kg_n, double kg_ci, size_t sig_n, double sig_ci, size_t ver_n, double ver_ci);
+
+#endif
@@ -1,12 +1,14 @@
 # SPDX-License-Identifier: MIT
 
 import functools
+import hashlib
 import os
 import os.path
 import pytest
 import re
 import subprocess
 import sys
+import tempfile
 import json
 
 kats = {}
@@ -43,120 +45,193 @@ def run_subprocess(command, working_dir='.', env=None, expected_returncode=0, in
         assert False, "Got unexpected return code {}".format(result.returncode)
     return result.stdout.decode('utf-8')
 
-def available_kems_by_name():
-    available_names = []
-    with open(os.path.join('src', 'kem', 'kem.h')) as fh:
-        for line in fh:
-            if line.startswith("#define OQS_KEM_alg_"):
-                kem_name = line.split(' ')[2]
-                kem_name = kem_name[1:-2]
-                available_names.append(kem_name)
-    return available_names
+def _read_subprocess(command, working_dir, env, chunk_size, consume):
+    """
+    Runs a shell command, passing its merged stdout/stderr to consume()
+    in chunks of at most chunk_size bytes as they are read from the pipe.
+    Returns the exit status of the command.
+    """
+    env_ = os.environ.copy()
+    if env is not None:
+        env_.update(env)
+    env = env_
 
-def is_kem_enabled_by_name(name):
-    symbol = None
-    with open(os.path.join('src', 'kem', 'kem.h')) as fh:
-        for line in fh:
-            if line.startswith("#define OQS_KEM_alg_"):
-                kem_symbol = line.split(' ')[1]
-                kem_symbol = kem_symbol[len("OQS_KEM_alg_"):]
-                kem_name = line.split(' ')[2]
-                kem_name = kem_name[1:-2]
-                if kem_name == name:
-                    symbol = kem_symbol
-                    break
-    if symbol == None: return False
-    header = os.path.join(get_current_build_dir_name(), 'include', 'oqs', 'oqsconfig.h')
+    print(working_dir + " > " + " ".join(command))
+
+    with subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            cwd=working_dir,
+            env=env,
+        ) as proc:
+        for chunk in iter(lambda: proc.stdout.read(chunk_size), b''):
+            consume(chunk)
+        return proc.wait()
+
+def run_subprocess_digest(command, working_dir='.', env=None, expected_returncode=0, chunk_size=1 << 16):
+    """
+    Helper function to run a shell command and return the SHA-256 hex digest
+    of its output, with "\r\n" line endings normalized to "\n". The output
+    is hashed chunk by chunk as it is read from the pipe, so memory use does
+    not depend on its size; only the last chunk_size bytes are kept to be
+    printed if the command fails.
+    """
+    h256 = hashlib.sha256()
+    state = {'pending': b'', 'tail': b''}
+
+    def consume(chunk):
+        # a trailing "\r" may be the first half of a "\r\n" split across chunks
+        chunk = state['pending'] + chunk
+        state['pending'] = b'\r' if chunk.endswith(b'\r') else b''
+        chunk = chunk[:len(chunk) - len(state['pending'])].replace(b'\r\n', b'\n')
+        h256.update(chunk)
+        state['tail'] = (state['tail'] + chunk)[-chunk_size:]
+
+    returncode = _read_subprocess(command, working_dir, env, chunk_size, consume)
+    h256.update(state['pending'])
+
+    if returncode != expected_returncode:
+        print(state['tail'].decode('utf-8', errors='replace'))
+        assert False, "Got unexpected return code {}".format(returncode)
+    return h256.hexdigest()
+
+class SpooledOutput:
+    """
+    Output of a command run by run_subprocess_spooled. The output is held in
+    memory up to a threshold and in a temporary file beyond it; iterating
+    yields its lines decoded as UTF-8, read() returns it as a whole. The
+    temporary file is removed by close() or at the end of a with block.
+    """
+    def __init__(self, spool, returncode, tail):
+        self.spool = spool
+        self.returncode = returncode
+        self.tail = tail
+
+    def __iter__(self):
+        self.spool.seek(0)
+        for line in self.spool:
+            yield line.decode('utf-8')
+
+    def read(self):
+        self.spool.seek(0)
+        return self.spool.read().decode('utf-8')
+
+    def close(self):
+        self.spool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def run_subprocess_spooled(command, working_dir='.', env=None, expected_returncode=0, ignore_returncode=False,
+                           max_in_memory=1 << 20, tail_size=1 << 16, chunk_size=1 << 16):
+    """
+    Variant of run_subprocess for commands with large output (Valgrind,
+    --all KAT runs): the output is spooled to a temporary file once it
+    exceeds max_in_memory bytes and returned as a SpooledOutput. If the
+    command fails, only the last tail_size bytes of the output are printed
+    (all of it if tail_size is None).
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=max_in_memory)
+    state = {'tail': b''}
+
+    def consume(chunk):
+        spool.write(chunk)
+        if tail_size is not None:
+            state['tail'] = (state['tail'] + chunk)[-tail_size:]
+
+    try:
+        returncode = _read_subprocess(command, working_dir, env, chunk_size, consume)
+    except BaseException:
+        spool.close()
+        raise
+    output = SpooledOutput(spool, returncode, state['tail'].decode('utf-8', errors='replace'))
+
+    if not(ignore_returncode) and (returncode != expected_returncode):
+        if tail_size is None:
+            for line in output:
+                print(line, end='')
+        else:
+            print(output.tail)
+        output.close()
+        assert False, "Got unexpected return code {}".format(returncode)
+    return output
+
+@functools.lru_cache()
+def _algorithm_names(header, prefix):
+    """
+    Parses the "#define <prefix><symbol> "<name>"" lines of an algorithm
+    header once per session and returns an ordered {name: symbol} map.
+    """
+    names = {}
     with open(header) as fh:
         for line in fh:
-            if line.startswith("#define OQS_ENABLE_KEM_"):
-                kem_symbol = line.split(' ')[1]
-                kem_symbol = kem_symbol[len("OQS_ENABLE_KEM_"):].rstrip()
-                if kem_symbol == symbol:
-                    return True
-    return False
+            if line.startswith("#define " + prefix):
+                fields = line.split(' ')
+                names[fields[2].strip()[1:-1]] = fields[1][len(prefix):]
+    return names
 
-def available_sigs_by_name():
-    available_names = []
-    with open(os.path.join('src', 'sig', 'sig.h')) as fh:
+@functools.lru_cache()
+def _oqsconfig_defines(build_dir):
+    """
+    Returns the macros defined in the oqsconfig.h of build_dir, in file
+    order, parsed once per session.
+    """
+    defines = {}
+    with open(os.path.join(build_dir, 'include', 'oqs', 'oqsconfig.h')) as fh:
         for line in fh:
-            if line.startswith("#define OQS_SIG_alg_"):
-                sig_name = line.split(' ')[2]
-                sig_name = sig_name[1:-2]
-                available_names.append(sig_name)
-    return available_names
+            if line.startswith("#define "):
+                defines[line.split(' ')[1].strip()] = True
+    return defines
+
+def _is_enabled_by_name(header, alg_prefix, enable_prefix, name):
+    symbol = _algorithm_names(header, alg_prefix).get(name)
+    if symbol is None: return False
+    return enable_prefix + symbol in _oqsconfig_defines(get_current_build_dir_name())
+
+def available_kems_by_name():
+    return list(_algorithm_names(os.path.join('src', 'kem', 'kem.h'), "OQS_KEM_alg_"))
+
+def is_kem_enabled_by_name(name):
+    return _is_enabled_by_name(os.path.join('src', 'kem', 'kem.h'), "OQS_KEM_alg_", "OQS_ENABLE_KEM_", name)
+
+def available_sigs_by_name():
+    return list(_algorithm_names(os.path.join('src', 'sig', 'sig.h'), "OQS_SIG_alg_"))
 
 def is_sig_enabled_by_name(name):
-    symbol = None
-    with open(os.path.join('src', 'sig', 'sig.h')) as fh:
-        for line in fh:
-            if line.startswith("#define OQS_SIG_alg_"):
-                sig_symbol = line.split(' ')[1]
-                sig_symbol = sig_symbol[len("OQS_SIG_alg_"):]
-                sig_name = line.split(' ')[2]
-                sig_name = sig_name[1:-2]
-                if sig_name == name:
-                    symbol = sig_symbol
-                    break
-    if symbol == None: return False
-    header = os.path.join(get_current_build_dir_name(), 'include', 'oqs', 'oqsconfig.h')
-    with open(header) as fh:
-        for line in fh:
-            if line.startswith("#define OQS_ENABLE_SIG_"):
-                sig_symbol = line.split(' ')[1]
-                sig_symbol = sig_symbol[len("OQS_ENABLE_SIG_"):].rstrip()
-                if sig_symbol == symbol:
-                    return True
-    return False
+    return _is_enabled_by_name(os.path.join('src', 'sig', 'sig.h'), "OQS_SIG_alg_", "OQS_ENABLE_SIG_", name)
 
 def available_sig_stfls_by_name():
-    available_names = []
-    with open(os.path.join('src', 'sig_stfl', 'sig_stfl.h')) as fh:
-        for line in fh:
-            if line.startswith("#define OQS_SIG_STFL_alg_"):
-                sig_stfl_name = line.split(' ')[2].strip()
-                sig_stfl_name = sig_stfl_name[1:-1]
-                available_names.append(sig_stfl_name)
-    return available_names
+    return list(_algorithm_names(os.path.join('src', 'sig_stfl', 'sig_stfl.h'), "OQS_SIG_STFL_alg_"))
 
 def is_sig_stfl_enabled_by_name(name):
-    symbol = None
-    with open(os.path.join('src', 'sig_stfl', 'sig_stfl.h')) as fh:
-        for line in fh:
-            if line.startswith("#define OQS_SIG_STFL_alg_"):
-                sig_stfl_symbol = line.split(' ')[1]
-                sig_stfl_symbol = sig_stfl_symbol[len("OQS_SIG_STFL_alg_"):]
-                sig_stfl_name = line.split(' ')[2].strip()
-                sig_stfl_name = sig_stfl_name[1:-1]
-                if sig_stfl_name == name:
-                    symbol = sig_stfl_symbol
-                    break
-    if symbol == None: return False
-    header = os.path.join(get_current_build_dir_name(), 'include', 'oqs', 'oqsconfig.h')
-    with open(header) as fh:
-        for line in fh:
-            if line.startswith("#define OQS_ENABLE_SIG_STFL_"):
-                sig_stfl_symbol = line.split(' ')[1]
-                sig_stfl_symbol = sig_stfl_symbol[len("OQS_ENABLE_SIG_STFL_"):].rstrip()
-                if sig_stfl_symbol == symbol:
-                    return True
-    return False
+    return _is_enabled_by_name(os.path.join('src', 'sig_stfl', 'sig_stfl.h'), "OQS_SIG_STFL_alg_", "OQS_ENABLE_SIG_STFL_", name)
+
+def is_test_skipped(funcname, *args):
+    """
+    Returns why test_<funcname> with the given arguments is disabled by the
+    SKIP_ALGS or SKIP_TESTS filters, or None if it is not.
+    """
+    if ('SKIP_ALGS' in os.environ) and len(os.environ['SKIP_ALGS'])>0:
+        for algexp in os.environ['SKIP_ALGS'].split(','):
+            for arg in args:
+                if len(re.findall(algexp, arg))>0:
+                    return "Test disabled by alg filter"
+    if ('SKIP_TESTS' in os.environ) and (funcname in os.environ['SKIP_TESTS'].lower().split(',')):
+        return "Test disabled by filter"
+    return None
 
 def filtered_test(func):
     funcname = func.__name__[len("test_"):]
 
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        if ('SKIP_ALGS' in os.environ) and len(os.environ['SKIP_ALGS'])>0:
-            for algexp in os.environ['SKIP_ALGS'].split(','):
-                for arg in args:
-                    if len(re.findall(algexp, arg))>0:
-                        pytest.skip("Test disabled by alg filter")
-                for arg in kwargs:
-                    if len(re.findall(algexp, kwargs[arg]))>0:
-                        pytest.skip("Test disabled by alg filter")
-        if ('SKIP_TESTS' in os.environ) and (funcname in os.environ['SKIP_TESTS'].lower().split(',')):
-            pytest.skip("Test disabled by filter")
+        reason = is_test_skipped(funcname, *args, *kwargs.values())
+        if reason is not None:
+            pytest.skip(reason)
         else:
             return func(*args, **kwargs)
     return wrapper
@@ -182,16 +257,11 @@ def path_to_executable(program_name):
     assert False, "Unable to find executable file {}".format(program_name)
 
 def available_use_options_by_name():
-    enabled_use_options = []
-    with open(os.path.join(get_current_build_dir_name(), 'include', 'oqs', 'oqsconfig.h')) as fh:
-        for line in fh:
-            if line.startswith("#define OQS_USE_"):
-                option_name = line.split(' ')[1][len("OQS_USE_"):].strip('\n')
-                enabled_use_options.append(option_name)
-    return enabled_use_options
+    return [define[len("OQS_USE_"):] for define in _oqsconfig_defines(get_current_build_dir_name())
+            if define.startswith("OQS_USE_")]
 
 def is_use_option_enabled_by_name(name):
-    return name in available_use_options_by_name()
+    return "OQS_USE_" + name in _oqsconfig_defines(get_current_build_dir_name())
 
 def get_kats(t):
     if kats[t] is None:
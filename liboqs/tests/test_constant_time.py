@@ -151,6 +151,17 @@ We could have written:
     }
 But this is perhaps too concise. Remember that the goal here is to help auditors.
 
+Caching and parallel runs
+-------------------------
+Valgrind runs are slow, so this script runs the tests of all selected schemes
+concurrently, one Valgrind process per available core, and caches passing
+runs in
+    <build dir>/tests/constant_time_cache/.
+A cached result is reused as long as the test_kem/test_sig binary, the liboqs
+shared library (if any), the scheme name, the suppression files and the
+Valgrind version and options are all unchanged. Failing runs are never cached.
+Delete the cache directory to force every scheme to be re-run.
+
 Further information can be found in Valgrind's manual. See
     https://www.valgrind.org/docs/manual/manual-core.html#manual-core.suppress
 and
@@ -172,12 +183,20 @@ calls from SUPERCOP.
 """
 
 
+import contextlib
+import functools
+import glob
+import hashlib
 import helpers
 import json
 import os
 import pytest
+import subprocess
 import sys
-import re
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 REQ_LIBOQS_BUILD_OPTS = ['OQS_ENABLE_TEST_CONSTANT_TIME',
                          'OQS_DEBUG_BUILD']
@@ -224,26 +243,158 @@ def get_ct_issues(t, name):
     return [os.path.join(ct_t, 'issues', f) for f in issues]
 
 
+# Passing Valgrind runs are cached in this directory of the build dir, in files
+# named after ct_cache_key() and holding the Valgrind output.
+CT_CACHE_DIR = os.path.join('tests', 'constant_time_cache')
+
+# Amount of Valgrind output printed when a run fails
+CT_TAIL_SIZE = 1 << 16
+
+def valgrind_command(t, name):
+    return VALGRIND + [
+        *(['--suppressions='+f for f in get_ct_passes(t, name)]),
+        *(['--suppressions='+f for f in get_ct_issues(t, name)]),
+        helpers.path_to_executable('test_' + t),
+        name
+    ]
+
+@functools.lru_cache()
+def valgrind_version():
+    # one `valgrind --version` per session, not one per scheme
+    return helpers.get_valgrind_version()
+
+@functools.lru_cache()
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def ct_cache_key(t, name):
+    """
+    Hashes everything that can change the outcome of a Valgrind run: the
+    command line, the Valgrind version, the test binary, the shared liboqs
+    library it may load and the contents of the suppression files.
+    """
+    command = valgrind_command(t, name)
+    h = hashlib.sha256()
+    h.update(repr((command, valgrind_version())).encode())
+    h.update(file_digest(command[-2]).encode())
+    for lib in sorted(glob.glob(os.path.join(helpers.get_current_build_dir_name(), 'lib', 'liboqs.*'))):
+        h.update(file_digest(os.path.realpath(lib)).encode())
+    for f in get_ct_passes(t, name) + get_ct_issues(t, name):
+        h.update(file_digest(f).encode())
+    return h.hexdigest()
+
+def run_valgrind(t, name, scheduler):
+    """
+    Runs test_kem/test_sig for one scheme under Valgrind unless a passing
+    run with the same cache key is recorded. Valgrind writes straight to a
+    temporary file, so its output is never held in memory; returns
+    (returncode, last CT_TAIL_SIZE bytes of the output).
+    """
+    cache_file = os.path.join(helpers.get_current_build_dir_name(), CT_CACHE_DIR, ct_cache_key(t, name))
+    if os.path.isfile(cache_file):
+        return 0, ''
+    with tempfile.TemporaryFile() as out:
+        with scheduler.process(valgrind_command(t, name), stdout=out, stderr=subprocess.STDOUT) as process:
+            returncode = process.wait()
+        if returncode == 0:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            out.seek(0)
+            with open(cache_file + '.tmp', 'wb') as fp:
+                shutil.copyfileobj(out, fp)
+            os.replace(cache_file + '.tmp', cache_file)
+            return 0, ''
+        out.seek(max(0, out.tell() - CT_TAIL_SIZE))
+        return returncode, out.read().decode('utf-8', errors='replace')
+
+def is_enabled_by_name(t, name):
+    return helpers.is_kem_enabled_by_name(name) if t == 'kem' else helpers.is_sig_enabled_by_name(name)
+
+class ValgrindScheduler:
+    """
+    Runs the Valgrind checks on a pool of worker threads, one run per
+    available core, and hands out the result of each (t, name) run once.
+    """
+    def __init__(self):
+        jobs = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+        self.executor = ThreadPoolExecutor(max_workers=jobs or 1)
+        self.runs = {}
+        self.lock = threading.Lock()
+        self.processes = set()
+        self.closed = False
+
+    def submit(self, t, name):
+        if (t, name) not in self.runs:
+            self.runs[(t, name)] = self.executor.submit(run_valgrind, t, name, self)
+        return self.runs[(t, name)]
+
+    @contextlib.contextmanager
+    def process(self, args, **kwargs):
+        """
+        Starts a child process that shutdown() kills if it is still running.
+        """
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Valgrind scheduler is shut down")
+            process = subprocess.Popen(args, **kwargs)
+            self.processes.add(process)
+        try:
+            yield process
+        finally:
+            with self.lock:
+                self.processes.discard(process)
+
+    def shutdown(self):
+        """
+        Drops the queued runs and kills the running Valgrind processes
+        (e.g. when the session is interrupted) instead of waiting for them.
+        """
+        with self.lock:
+            self.closed = True
+            for process in self.processes:
+                process.kill()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+scheduler = None
+
+@pytest.fixture(scope='module', autouse=True)
+def valgrind_scheduler(request):
+    """
+    Queues the runs of every test of this module that was selected and is
+    not filtered out, so that they proceed in parallel while pytest walks
+    through the tests in order.
+    """
+    global scheduler
+    scheduler = ValgrindScheduler()
+    for item in request.session.items:
+        if item.module is not request.module or not hasattr(item, 'callspec'):
+            continue
+        if helpers.is_test_skipped(item.originalname[len("test_"):], *item.callspec.params.values()):
+            continue
+        for t in ('kem', 'sig'):
+            name = item.callspec.params.get(t + '_name')
+            if name is not None and is_enabled_by_name(t, name):
+                scheduler.submit(t, name)
+    yield scheduler
+    scheduler.shutdown()
+
+def check_constant_time(t, name):
+    print("." + " > " + " ".join(valgrind_command(t, name)))
+    returncode, tail = scheduler.submit(t, name).result()
+    if returncode != 0:
+        print(tail)
+        assert False, "Got unexpected return code {}".format(returncode)
+
 @helpers.filtered_test
 @helpers.test_requires_build_options(*REQ_LIBOQS_BUILD_OPTS)
 @helpers.test_requires_valgrind_version_at_least(*MIN_VALGRIND_VERSION)
 @pytest.mark.parametrize('kem_name', helpers.available_kems_by_name())
 def test_constant_time_kem(kem_name):
     if not(helpers.is_kem_enabled_by_name(kem_name)): pytest.skip('Not enabled')
-    if ('SKIP_ALGS' in os.environ) and len(os.environ['SKIP_ALGS'])>0:
-        for algexp in os.environ['SKIP_ALGS'].split(','):
-            if len(re.findall(algexp, kem_name))>0:
-               pytest.skip("Test disabled by alg filter")
-    passes = get_ct_passes('kem', kem_name)
-    issues = get_ct_issues('kem', kem_name)
-    output = helpers.run_subprocess(
-             VALGRIND + [
-                *(['--suppressions='+f for f in passes]),
-                *(['--suppressions='+f for f in issues]),
-                helpers.path_to_executable('test_kem'),
-                kem_name
-             ]
-    )
+    check_constant_time('kem', kem_name)
 
 @helpers.filtered_test
 @helpers.test_requires_build_options(*REQ_LIBOQS_BUILD_OPTS)
@@ -251,20 +402,7 @@ def test_constant_time_kem(kem_name):
 @pytest.mark.parametrize('sig_name', helpers.available_sigs_by_name())
 def test_constant_time_sig(sig_name):
     if not(helpers.is_sig_enabled_by_name(sig_name)): pytest.skip('Not enabled')
-    if ('SKIP_ALGS' in os.environ) and len(os.environ['SKIP_ALGS'])>0:
-        for algexp in os.environ['SKIP_ALGS'].split(','):
-            if len(re.findall(algexp, sig_name))>0:
-               pytest.skip("Test disabled by alg filter")
-    passes = get_ct_passes('sig', sig_name)
-    issues = get_ct_issues('sig', sig_name)
-    output = helpers.run_subprocess(
-             VALGRIND + [
-                *(['--suppressions='+f for f in passes]),
-                *(['--suppressions='+f for f in issues]),
-                helpers.path_to_executable('test_sig'),
-                sig_name
-             ]
-    )
+    check_constant_time('sig', sig_name)
 
 if __name__ == '__main__':
     pytest.main(sys.argv)
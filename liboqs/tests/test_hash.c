@@ -35,6 +35,31 @@ static int read_stdin(uint8_t **msg, size_t *msg_len) {
 	return 0;
 }
 
+// Reads the next message of a batch from stdin: a line with the message
+// length in decimal followed by that many bytes. Returns 1 at end of input.
+static int read_batch_stdin(uint8_t **msg, size_t *msg_len) {
+	unsigned long len;
+	int fields = scanf("%lu", &len);
+	if (fields == EOF && !ferror(stdin)) {
+		return 1;
+	}
+	if (fields != 1 || getchar() != '\n') {
+		fprintf(stderr, "Malformed batch length prefix\n");
+		return -2;
+	}
+	*msg = malloc(len > 0 ? len : 1);
+	if (*msg == NULL) {
+		return -1;
+	}
+	if (fread(*msg, 1, len, stdin) != len) {
+		fprintf(stderr, "Batch message shorter than its length prefix (%lu)\n", len);
+		free(*msg);
+		return -3;
+	}
+	*msg_len = len;
+	return 0;
+}
+
 static void print_hex(uint8_t *s, size_t l) {
 	for (size_t i = 0; i < l; i++) {
 		printf("%02x", s[i]);
@@ -42,15 +67,7 @@ static void print_hex(uint8_t *s, size_t l) {
 	printf("\n");
 }
 
-static int do_sha256(void) {
-	// read message from stdin
-	uint8_t *msg;
-	size_t msg_len;
-	if (read_stdin(&msg, &msg_len) != 0) {
-		fprintf(stderr, "ERROR reading from stdin\n");
-		return -1;
-	}
-
+static int do_sha256(const uint8_t *msg, size_t msg_len) {
 	// run main SHA-256 API
 	uint8_t output[32];
 	OQS_SHA2_sha256(output, msg, msg_len);
@@ -79,7 +96,6 @@ static int do_sha256(void) {
 
 	if (memcmp(output, output_inc, 32) != 0) {
 		fprintf(stderr, "ERROR: Incremental API does not match main API\n");
-		free(msg);
 		return -2;
 	}
 	// hash with second state
@@ -91,7 +107,6 @@ static int do_sha256(void) {
 	}
 	if (memcmp(output, output_inc, 32) != 0) {
 		fprintf(stderr, "ERROR: Incremental API with cloned state does not match main API\n");
-		free(msg);
 		return -3;
 	}
 
@@ -103,7 +118,6 @@ static int do_sha256(void) {
 	OQS_SHA2_sha256_inc_finalize(output_inc_2, &state3, &msg[i], 0);
 	if (memcmp(output, output_inc_2, 32) != 0) {
 		fprintf(stderr, "ERROR: Non-block Incremental API with cloned state does not match main API\n");
-		free(msg);
 		return -4;
 	}
 
@@ -112,7 +126,6 @@ static int do_sha256(void) {
 	OQS_SHA2_sha256_inc_finalize(output_inc, &state6, NULL, 0);
 	if (memcmp(output, output_inc, 32) != 0) {
 		fprintf(stderr, "ERROR: Incremental API with the entire msg.\n");
-		free(msg);
 		return -3;
 	}
 
@@ -128,7 +141,6 @@ static int do_sha256(void) {
 	}
 	if (memcmp(output, output_inc_2, 32) != 0) {
 		fprintf(stderr, "ERROR: Combined block increments with non-block size failed to match main API\n");
-		free(msg);
 		return -5;
 	}
 
@@ -142,23 +154,14 @@ static int do_sha256(void) {
 	}
 	if (memcmp(output, output_inc_2, 32) != 0) {
 		fprintf(stderr, "ERROR: Combined non-block size and block increments failed to match main API\n");
-		free(msg);
 		return -5;
 	}
 	//Test inc API
 	print_hex(output, 32);
-	free(msg);
 	return 0;
 }
 
-static int do_sha384(void) {
-	// read message from stdin
-	uint8_t *msg;
-	size_t msg_len;
-	if (read_stdin(&msg, &msg_len) != 0) {
-		fprintf(stderr, "ERROR reading from stdin\n");
-		return -1;
-	}
+static int do_sha384(const uint8_t *msg, size_t msg_len) {
 	// run main SHA-384 API
 	uint8_t output[48];
 	OQS_SHA2_sha384(output, msg, msg_len);
@@ -178,7 +181,6 @@ static int do_sha384(void) {
 	}
 	if (memcmp(output, output_inc, 48) != 0) {
 		fprintf(stderr, "ERROR: Incremental API does not match main API\n");
-		free(msg);
 		return -2;
 	}
 	// hash with second state
@@ -190,22 +192,13 @@ static int do_sha384(void) {
 	}
 	if (memcmp(output, output_inc, 48) != 0) {
 		fprintf(stderr, "ERROR: Incremental API with cloned state does not match main API\n");
-		free(msg);
 		return -3;
 	}
 	print_hex(output, 48);
-	free(msg);
 	return 0;
 }
 
-static int do_sha512(void) {
-	// read message from stdin
-	uint8_t *msg;
-	size_t msg_len;
-	if (read_stdin(&msg, &msg_len) != 0) {
-		fprintf(stderr, "ERROR reading from stdin\n");
-		return -1;
-	}
+static int do_sha512(const uint8_t *msg, size_t msg_len) {
 	// run main SHA-512 API
 	uint8_t output[64];
 	OQS_SHA2_sha512(output, msg, msg_len);
@@ -225,7 +218,6 @@ static int do_sha512(void) {
 	}
 	if (memcmp(output, output_inc, 64) != 0) {
 		fprintf(stderr, "ERROR: Incremental API does not match main API\n");
-		free(msg);
 		return -2;
 	}
 	// hash with second state
@@ -237,28 +229,18 @@ static int do_sha512(void) {
 	}
 	if (memcmp(output, output_inc, 64) != 0) {
 		fprintf(stderr, "ERROR: Incremental API with cloned state does not match main API\n");
-		free(msg);
 		return -3;
 	}
 	print_hex(output, 64);
-	free(msg);
 	return 0;
 }
 
-static int do_arbitrary_hash(void (*hash)(uint8_t *, const uint8_t *, size_t), size_t hash_len) {
-	// read message from stdin
-	uint8_t *msg;
-	size_t msg_len;
-	if (read_stdin(&msg, &msg_len) != 0) {
-		fprintf(stderr, "ERROR reading from stdin\n");
-		return -1;
-	}
+static int do_arbitrary_hash(void (*hash)(uint8_t *, const uint8_t *, size_t), size_t hash_len, const uint8_t *msg, size_t msg_len) {
 	// run main SHA-256 API
 	uint8_t *output = malloc(hash_len);
 	hash(output, msg, msg_len);
 	print_hex(output, hash_len);
 	free(output);
-	free(msg);
 	return 0;
 }
 
@@ -269,19 +251,48 @@ static void override_SHA2_sha256_inc_init(OQS_SHA2_sha256_ctx *state) {
 	sha2_default_callbacks.SHA2_sha256_inc_init(state);
 }
 
+static int hash_message(const char *hash_alg, const uint8_t *msg, size_t msg_len) {
+	if (strcmp(hash_alg, "sha256inc") == 0) {
+		return do_sha256(msg, msg_len);
+	} else if (strcmp(hash_alg, "sha384inc") == 0) {
+		return do_sha384(msg, msg_len);
+	} else if (strcmp(hash_alg, "sha512inc") == 0) {
+		return do_sha512(msg, msg_len);
+	} else if (strcmp(hash_alg, "sha256") == 0) {
+		return do_arbitrary_hash(&OQS_SHA2_sha256, 32, msg, msg_len);
+	} else if (strcmp(hash_alg, "sha384") == 0) {
+		return do_arbitrary_hash(&OQS_SHA2_sha384, 48, msg, msg_len);
+	} else if (strcmp(hash_alg, "sha512") == 0) {
+		return do_arbitrary_hash(&OQS_SHA2_sha512, 64, msg, msg_len);
+	} else if (strcmp(hash_alg, "sha3_256") == 0) {
+		return do_arbitrary_hash(&OQS_SHA3_sha3_256, 32, msg, msg_len);
+	} else if (strcmp(hash_alg, "sha3_384") == 0) {
+		return do_arbitrary_hash(&OQS_SHA3_sha3_384, 48, msg, msg_len);
+	} else if (strcmp(hash_alg, "sha3_512") == 0) {
+		return do_arbitrary_hash(&OQS_SHA3_sha3_512, 64, msg, msg_len);
+	} else {
+		fprintf(stderr, "ERROR: Test not implemented\n");
+		return EXIT_FAILURE;
+	}
+}
+
 int main(int argc, char **argv) {
 	int ret;
+	uint8_t *msg;
+	size_t msg_len;
 	struct OQS_SHA2_callbacks sha2_callbacks = sha2_default_callbacks;
 
 	sha2_callbacks.SHA2_sha256_inc_init = override_SHA2_sha256_inc_init;
 	OQS_SHA2_set_callbacks(&sha2_callbacks);
 
 	OQS_init();
-	if (argc != 2) {
-		fprintf(stderr, "Usage: test_hash algname\n");
+	if (argc != 2 && !(argc == 3 && strcmp(argv[2], "--batch") == 0)) {
+		fprintf(stderr, "Usage: test_hash algname [--batch]\n");
 		fprintf(stderr, "  algname: sha256, sha384, sha512, sha256inc, sha384inc, sha512inc\n");
 		fprintf(stderr, "           sha3_256, sha3_384, sha3_512\n");
-		fprintf(stderr, "  test_hash reads input from stdin and outputs hash value as hex string to stdout");
+		fprintf(stderr, "  test_hash reads input from stdin and outputs hash value as hex string to stdout\n");
+		fprintf(stderr, "  --batch: stdin holds a sequence of messages, each preceded by a line with its\n");
+		fprintf(stderr, "           length in bytes; one hash value per message is written to stdout");
 		printf("\n");
 		print_system_info();
 		return EXIT_FAILURE;
@@ -289,27 +300,23 @@ int main(int argc, char **argv) {
 
 	char *hash_alg = argv[1];
 
-	if (strcmp(hash_alg, "sha256inc") == 0) {
-		ret = do_sha256();
-	} else if (strcmp(hash_alg, "sha384inc") == 0) {
-		ret = do_sha384();
-	} else if (strcmp(hash_alg, "sha512inc") == 0) {
-		ret = do_sha512();
-	} else if (strcmp(hash_alg, "sha256") == 0) {
-		ret = do_arbitrary_hash(&OQS_SHA2_sha256, 32);
-	} else if (strcmp(hash_alg, "sha384") == 0) {
-		ret = do_arbitrary_hash(&OQS_SHA2_sha384, 48);
-	} else if (strcmp(hash_alg, "sha512") == 0) {
-		ret = do_arbitrary_hash(&OQS_SHA2_sha512, 64);
-	} else if (strcmp(hash_alg, "sha3_256") == 0) {
-		ret = do_arbitrary_hash(&OQS_SHA3_sha3_256, 32);
-	} else if (strcmp(hash_alg, "sha3_384") == 0) {
-		ret = do_arbitrary_hash(&OQS_SHA3_sha3_384, 48);
-	} else if (strcmp(hash_alg, "sha3_512") == 0) {
-		ret = do_arbitrary_hash(&OQS_SHA3_sha3_512, 64);
+	if (argc == 3) {
+		int status = 0;
+		ret = 0;
+		while (ret == 0 && (status = read_batch_stdin(&msg, &msg_len)) == 0) {
+			ret = hash_message(hash_alg, msg, msg_len);
+			free(msg);
+		}
+		if (status < 0) {
+			fprintf(stderr, "ERROR reading from stdin\n");
+			ret = -1;
+		}
+	} else if (read_stdin(&msg, &msg_len) != 0) {
+		fprintf(stderr, "ERROR reading from stdin\n");
+		ret = -1;
 	} else {
-		fprintf(stderr, "ERROR: Test not implemented\n");
-		ret = EXIT_FAILURE;
+		ret = hash_message(hash_alg, msg, msg_len);
+		free(msg);
 	}
 
 	if (strcmp(hash_alg, "sha256inc") == 0 && !sha2_callback_called) {
@@ -27,25 +27,24 @@ def test_hash_sha2_random(algname):
     # hash every size from 0 to 1024, then every 11th size after that 
     # (why 11? it's coprime with powers of 2, so we should land in a 
     #  bunch of random-ish spots relative to block boundaries)
-    for i in list(range(0, 1024)) + list(range(1025, 20000, 11)):
-        msg = "".join("1" for j in range(i)).encode()
-        hasher = hashlib.new(algname)
-        hasher.update(msg)
+    sizes = list(range(0, 1024)) + list(range(1025, 20000, 11))
+    msgs = ["".join("1" for j in range(i)).encode() for i in sizes]
+    expected = [hashlib.new(algname, msg).hexdigest() for msg in msgs]
+    # all messages go through one test_hash process per variant, each
+    # preceded by a line with its length (see --batch in test_hash.c)
+    batch = b"".join(str(len(msg)).encode() + b"\n" + msg for msg in msgs)
+    variants = [(algname, "")]
+    if algname[0:4] != "sha3": variants.append((algname + 'inc', " (using liboqs incremental API)"))
+    for variant, api in variants:
         output = helpers.run_subprocess(
-            [helpers.path_to_executable('test_hash'), algname],
-            input = msg,
-        )
-        if output.rstrip() != hasher.hexdigest():
-            print(msg.hex())
-            assert False, algname + " hashes don't match for the above " + str(i) + "-byte hex string; liboqs output = " + output.rstrip() + "; Python output = " + hasher.hexdigest()
-        if algname[0:4] == "sha3": continue
-        output = helpers.run_subprocess(
-            [helpers.path_to_executable('test_hash'), algname + 'inc'],
-            input = msg,
-        )
-        if output.rstrip() != hasher.hexdigest():
-            print(msg.hex())
-            assert False, algname + " hashes (using liboqs incremental API) don't match for the above " + str(i) + "-byte hex string; liboqs output = " + output.rstrip() + "; Python output = " + hasher.hexdigest()
+            [helpers.path_to_executable('test_hash'), variant, '--batch'],
+            input = batch,
+        ).split()
+        assert len(output) == len(msgs), variant + " returned " + str(len(output)) + " hashes for " + str(len(msgs)) + " messages"
+        for i, msg, digest, hexdigest in zip(sizes, msgs, output, expected):
+            if digest != hexdigest:
+                print(msg.hex())
+                assert False, algname + " hashes" + api + " don't match for the above " + str(i) + "-byte hex string; liboqs output = " + digest + "; Python output = " + hexdigest
 
 if __name__ == "__main__":
     import sys
@@ -1,24 +1,193 @@
 # SPDX-License-Identifier: MIT
 
+"""
+Runs speed_kem/speed_sig for every enabled algorithm, parses the printed
+table into one record per operation (keygen/encaps/decaps for KEMs,
+keypair/sign/verify for signatures) and appends the records to a local
+SQLite benchmark history, keyed by git commit, compiler flags and CPU model.
+
+Environment variables:
+    OQS_SPEED_DB         history database (default: <build dir>/speed_history.sqlite)
+    OQS_SPEED_BASELINE   git commit (or prefix) to compare against, or "latest"
+                         for the most recent earlier run; when set, a test fails
+                         if the throughput of a compared operation dropped by
+                         more than OQS_SPEED_THRESHOLD percent (default: 10)
+Only runs with the same compiler flags and CPU model are compared.
+"""
+
 import helpers
 import os
 import os.path
-import pytest
 import platform
+import pytest
+import sqlite3
+import subprocess
+import time
+
+SPEED_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS speed (
+    timestamp REAL,
+    git_commit TEXT,
+    compiler TEXT,
+    compile_options TEXT,
+    cpu_model TEXT,
+    kind TEXT,
+    algorithm TEXT,
+    operation TEXT,
+    iterations INTEGER,
+    total_s REAL,
+    mean_us REAL,
+    stdev_us REAL,
+    cycles_mean REAL,
+    cycles_stdev REAL
+);
+CREATE INDEX IF NOT EXISTS speed_key ON speed (algorithm, operation, compile_options, cpu_model);
+"""
+
+RECORD_FIELDS = ['algorithm', 'operation', 'iterations', 'total_s', 'mean_us', 'stdev_us', 'cycles_mean', 'cycles_stdev']
+
+# Operations whose throughput is checked against the baseline
+REGRESSION_OPERATIONS = {'kem': ['keygen', 'encaps', 'decaps'],
+                         'sig': ['keypair', 'sign', 'verify']}
+
+def parse_speed_output(output):
+    """
+    Parses the output of speed_kem/speed_sig. Returns a dict with the
+    "Compiler" and "Compile options" lines of the system info and the list
+    of per-operation records (dicts with the keys of RECORD_FIELDS).
+    """
+    info = {'compiler': '', 'compile_options': ''}
+    records = []
+    algorithm = None
+    for line in output.splitlines():
+        if line.startswith('Compiler:'):
+            info['compiler'] = line[len('Compiler:'):].strip()
+        elif line.startswith('Compile options:'):
+            info['compile_options'] = line[len('Compile options:'):].strip()
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) != 7:
+            continue
+        if all(field == '' for field in fields[1:]):
+            # algorithm name row, followed by the rows of its operations
+            algorithm = fields[0]
+        elif fields[1].isdigit() and algorithm is not None:
+            values = [int(fields[1])] + [float(field) for field in fields[2:]]
+            records.append(dict(zip(RECORD_FIELDS, [algorithm, fields[0]] + values)))
+    info['records'] = records
+    return info
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, check=True).stdout.decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def cpu_model():
+    try:
+        with open('/proc/cpuinfo', 'r') as fh:
+            for line in fh:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+def speed_db_path():
+    return os.environ.get('OQS_SPEED_DB', os.path.join(helpers.get_current_build_dir_name(), 'speed_history.sqlite'))
+
+def store_speed_records(db, kind, info, timestamp):
+    with sqlite3.connect(db) as conn:
+        conn.executescript(SPEED_DB_SCHEMA)
+        conn.executemany(
+            "INSERT INTO speed VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(timestamp, git_commit(), info['compiler'], info['compile_options'], cpu_model(), kind)
+             + tuple(record[field] for field in RECORD_FIELDS) for record in info['records']])
+    conn.close()
+
+def baseline_mean_us(db, baseline, kind, info, record, timestamp):
+    """
+    Returns the mean time of the same operation in the baseline run (the
+    most recent run of the baseline commit, or the most recent earlier run
+    if baseline is "latest") with the same compiler flags and CPU model,
+    or None if there is no such run.
+    """
+    query = ("SELECT mean_us FROM speed WHERE kind = ? AND algorithm = ? AND operation = ? "
+             "AND compile_options = ? AND cpu_model = ? AND timestamp < ?")
+    params = [kind, record['algorithm'], record['operation'], info['compile_options'], cpu_model(), timestamp]
+    if baseline != 'latest':
+        query += " AND git_commit LIKE ?"
+        params.append(baseline + '%')
+    with sqlite3.connect(db) as conn:
+        row = conn.execute(query + " ORDER BY timestamp DESC LIMIT 1", params).fetchone()
+    conn.close()
+    return row[0] if row is not None else None
+
+def find_regressions(db, baseline, kind, info, timestamp, threshold):
+    """
+    Compares the records of a run with the baseline run and returns the
+    operations whose throughput dropped by more than threshold percent.
+    """
+    regressions = []
+    for record in info['records']:
+        if record['operation'] not in REGRESSION_OPERATIONS[kind]:
+            continue
+        base_mean_us = baseline_mean_us(db, baseline, kind, info, record, timestamp)
+        if base_mean_us is None or record['mean_us'] <= 0:
+            continue
+        # throughput is proportional to 1 / mean time
+        change = 100.0 * (base_mean_us / record['mean_us'] - 1.0)
+        print("{} {}: {:.3f} us (baseline {:.3f} us), throughput {:+.1f}%".format(
+            record['algorithm'], record['operation'], record['mean_us'], base_mean_us, change))
+        if change < -threshold:
+            regressions.append("{} {} {:+.1f}%".format(record['algorithm'], record['operation'], change))
+    return regressions
+
+def check_speed(kind, alg_name):
+    # without -f, speed_kem/speed_sig time each operation separately
+    output = helpers.run_subprocess([helpers.path_to_executable('speed_' + kind), alg_name])
+    info = parse_speed_output(output)
+    assert len(info['records']) > 0, "No speed records found in the output of speed_" + kind
+
+    db = speed_db_path()
+    timestamp = time.time()
+    store_speed_records(db, kind, info, timestamp)
+
+    baseline = os.environ.get('OQS_SPEED_BASELINE')
+    if not baseline:
+        return
+    threshold = float(os.environ.get('OQS_SPEED_THRESHOLD', '10'))
+    regressions = find_regressions(db, baseline, kind, info, timestamp, threshold)
+    assert not regressions, "Throughput regressed by more than {}% against {}: {}".format(
+        threshold, baseline, ', '.join(regressions))
 
 @helpers.filtered_test
 @pytest.mark.parametrize('kem_name', helpers.available_kems_by_name())
 def test_kem(kem_name):
     kats = helpers.get_kats("kem")
     if not(helpers.is_kem_enabled_by_name(kem_name)): pytest.skip('Not enabled')
-    helpers.run_subprocess( [helpers.path_to_executable('speed_kem'), kem_name, "-f"] )
+    check_speed('kem', kem_name)
 
 @helpers.filtered_test
 @pytest.mark.parametrize('sig_name', helpers.available_sigs_by_name())
 def test_sig(sig_name):
     kats = helpers.get_kats("sig")
     if not(helpers.is_sig_enabled_by_name(sig_name)): pytest.skip('Not enabled')
-    helpers.run_subprocess( [helpers.path_to_executable('speed_sig'), sig_name, "-f"])
+    check_speed('sig', sig_name)
+
+def test_speed_regression(tmp_path):
+    db = str(tmp_path / 'speed_history.sqlite')
+    def run(sign_mean_us):
+        records = [dict(zip(RECORD_FIELDS, ['Dilithium2', operation, 1000, 1.0, mean_us, 0.0, 0.0, 0.0]))
+                   for operation, mean_us in [('keypair', 50.0), ('sign', sign_mean_us), ('verify', 30.0)]]
+        return {'compiler': 'gcc', 'compile_options': '-O3', 'records': records}
+    store_speed_records(db, 'sig', run(100.0), 1.0)
+    # 10% slower sign is within the threshold, 50% slower is not
+    store_speed_records(db, 'sig', run(110.0), 2.0)
+    assert find_regressions(db, 'latest', 'sig', run(110.0), 2.0, 10.0) == []
+    store_speed_records(db, 'sig', run(165.0), 3.0)
+    regressions = find_regressions(db, 'latest', 'sig', run(165.0), 3.0, 10.0)
+    assert len(regressions) == 1 and regressions[0].startswith('Dilithium2 sign ')
 
 if __name__ == "__main__":
     import sys
@@ -1,22 +1,26 @@
 #
 #Author: Tomas Lovato
-#Version: 2
-#Date: 2024/07/28 15:30
-#Description: standardizzati i metodi di valutazione e output
+#Version: 9
+#Date: 2024/08/30 10:00
+#Description: log con livelli, barre di avanzamento per schema e log degli eventi in JSONL
 #
 
+import argparse
 import ctypes
+import json
+import logging
+import math
 import os
+import queue
+import threading
 import time
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import Manager
+from tqdm import tqdm
+from tqdm.contrib.logging import logging_redirect_tqdm
 
-# Prova a caricare la libreria dalle directory standard
-try:
-    liboqs = ctypes.CDLL("liboqs.so")
-    print("liboqs.so caricato correttamente.")
-except OSError:
-    print("liboqs.so non trovata. Assicurati di aver installato correttamente liboqs.")
-    exit(1)
+logger = logging.getLogger("double_check")
 
 # Definisce la struttura OQS_SIG senza le funzioni
 class OQS_SIG(ctypes.Structure):
@@ -39,20 +43,25 @@ class OQS_SIG_Functions:
 
 OQS_SIG._fields_ = OQS_SIG_Functions._fields_
 
-# Definisce le funzioni C dalla libreria liboqs (che a loro volta richiamano quelle delle librerie sottostanti)
-liboqs.OQS_SIG_new.restype = ctypes.POINTER(OQS_SIG)
-liboqs.OQS_SIG_free.argtypes = [ctypes.POINTER(OQS_SIG)]
-liboqs.OQS_SIG_alg_identifier.restype = ctypes.c_char_p
-liboqs.OQS_SIG_alg_count.restype = ctypes.c_size_t
-liboqs.OQS_SIG_keypair.argtypes = [ctypes.POINTER(OQS_SIG), ctypes.POINTER(ctypes.c_ubyte), ctypes.POINTER(ctypes.c_ubyte)]
-liboqs.OQS_SIG_sign.argtypes = [ctypes.POINTER(OQS_SIG), ctypes.POINTER(ctypes.c_ubyte), ctypes.POINTER(ctypes.c_size_t), ctypes.POINTER(ctypes.c_ubyte), ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte)]
-liboqs.OQS_SIG_verify.argtypes = [ctypes.POINTER(OQS_SIG), ctypes.POINTER(ctypes.c_ubyte), ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte), ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte)]
+# Funzione per caricare liboqs dalle directory standard e definire le funzioni C usate
+# (che a loro volta richiamano quelle delle librerie sottostanti)
+def load_liboqs():
+    try:
+        lib = ctypes.CDLL("liboqs.so")
+    except OSError:
+        logger.error("liboqs.so non trovata. Assicurati di aver installato correttamente liboqs.")
+        exit(1)
+    lib.OQS_SIG_new.restype = ctypes.POINTER(OQS_SIG)
+    lib.OQS_SIG_free.argtypes = [ctypes.POINTER(OQS_SIG)]
+    lib.OQS_SIG_alg_identifier.restype = ctypes.c_char_p
+    lib.OQS_SIG_alg_count.restype = ctypes.c_size_t
+    lib.OQS_SIG_keypair.argtypes = [ctypes.POINTER(OQS_SIG), ctypes.POINTER(ctypes.c_ubyte), ctypes.POINTER(ctypes.c_ubyte)]
+    lib.OQS_SIG_sign.argtypes = [ctypes.POINTER(OQS_SIG), ctypes.POINTER(ctypes.c_ubyte), ctypes.POINTER(ctypes.c_size_t), ctypes.POINTER(ctypes.c_ubyte), ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte)]
+    lib.OQS_SIG_verify.argtypes = [ctypes.POINTER(OQS_SIG), ctypes.POINTER(ctypes.c_ubyte), ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte), ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte)]
 
-# Verifica gli algoritmi disponibili nell'installazione
-num_algs = liboqs.OQS_SIG_alg_count()
-available_algs = [liboqs.OQS_SIG_alg_identifier(i).decode('utf-8') for i in range(num_algs)]
-
-print("Algoritmi disponibili:", available_algs)
+    # Verifica gli algoritmi disponibili nell'installazione
+    algs = [lib.OQS_SIG_alg_identifier(i).decode('utf-8') for i in range(lib.OQS_SIG_alg_count())]
+    return lib, algs
 
 # Schemi di firma da testare, si testano solo gli AVX2 degli schemi già provati
 schemes = [
@@ -66,117 +75,536 @@ schemes = [
 # Dimensioni dei messaggi da testare (32 byte a circa 16 MB, con fattore 2)
 message_sizes = [2**i for i in range(5, 25)]
 
-# Numero di iterazioni per ogni test, su cui fare la media dei tempi
-iterations = 100
+# Parametri del campionamento adattivo: dopo il riscaldamento si continua a misurare finché l'intervallo
+# di confidenza al 95% della media scende sotto l'errore relativo richiesto o finisce il tempo a disposizione
+sampling = {
+    'warmup_batch': 5,          # Iterazioni (scartate) per ogni lotto di riscaldamento
+    'warmup_tolerance': 0.05,   # Variazione relativa della mediana tra due lotti sotto cui il riscaldamento termina
+    'warmup_budget': 1.0,       # Secondi massimi di riscaldamento per cella
+    'min_iterations': 10,       # Iterazioni minime su cui fare la media dei tempi
+    'max_iterations': 1000,     # Iterazioni massime su cui fare la media dei tempi
+    'target_rel_error': 0.02,   # Semiampiezza relativa dell'intervallo di confidenza da raggiungere
+    'time_budget': 30.0         # Secondi massimi di campionamento per cella
+}
 
 # Dizionario per associare i nomi dei file di output a ciascun algoritmo
 output_files = {scheme: f"risultati_{scheme}_avx2" for scheme in schemes}
 
-# Funzione per misurare i tempi di keygen, firma e verifica per ogni schema e lunghezza del messaggio.
-def measure_times(scheme_name, message_size):
-    print(f"Iniziando i test per l'algoritmo {scheme_name} con messaggio di dimensione {message_size} byte.")
-    if scheme_name not in available_algs:
-        raise ValueError(f"=== ERR: Algoritmo {scheme_name} non trovato ===")
-    
-    # Instanziare l'algoritmo a partire dal nome
-    alg_index = available_algs.index(scheme_name)
-    alg = liboqs.OQS_SIG_alg_identifier(alg_index)
-    if alg is None:
-        raise ValueError(f"=== ERR: Algoritmo {scheme_name} non trovato ===")
-    
-    # Creare un'istanza della struttura (contiene tutte le caratteristiche)
-    print(f"--- Creazione della struttura per {scheme_name}. ---")
-    sig = liboqs.OQS_SIG_new(alg)
-    if not sig:
-        raise ValueError(f"=== ERR: Creazione della struttura SIG fallita per {scheme_name} ===")
-
-    # Generazione chiavi - Calcolo del tempo
-    pubkey = (ctypes.c_ubyte * sig.contents.length_public_key)()
-    privkey = (ctypes.c_ubyte * sig.contents.length_secret_key)()
-    print(f"--- Generazione delle chiavi per {scheme_name}. ---")
-    start_time = time.time()
-    if liboqs.OQS_SIG_keypair(sig, pubkey, privkey) != 0:
-        raise ValueError(f"=== ERR: Generazione delle chiavi fallita per {scheme_name} ===")
-    keygen_time = time.time() - start_time
-    print(f"--- Tempo di generazione delle chiavi: {keygen_time:.6f} secondi. ---")
-
-    # Generazione del messaggio abbastanza "stupida"
-    message = (ctypes.c_ubyte * message_size)(*b'a' * message_size)
-
-    # Firma del messaggio - Calcolo del tempo
-    signature = (ctypes.c_ubyte * sig.contents.length_signature)()
-    sig_len = ctypes.c_size_t()
-    print(f"--- Firma del messaggio per {scheme_name}. ---")
-    start_time = time.time()
-    if liboqs.OQS_SIG_sign(sig, signature, ctypes.byref(sig_len), message, len(message), privkey) != 0:
-        raise ValueError(f"Firma fallita per {scheme_name}")
-    sign_time = time.time() - start_time
-    print(f"--- Tempo di firma: {sign_time:.6f} secondi. ---")
-
-    # Verifica del messaggio - Calcolo del tempo
-    print(f"--- Verifica della firma per {scheme_name}. ---")
-    start_time = time.time()
-    if liboqs.OQS_SIG_verify(sig, message, len(message), signature, sig_len.value, pubkey) != 0:
-        raise ValueError(f"=== ERR: Verifica fallita per {scheme_name} ===")
-    verify_time = time.time() - start_time
-    print(f"--- Tempo di verifica: {verify_time:.6f} secondi. ---")
-
-    # Liberazione della memoria occupata dalla struttura
-    liboqs.OQS_SIG_free(sig)
-    print(f"--- Test per {scheme_name} completati. ---")
-
-    # Ritorna i risultati insieme ai metadati delle chiavi e della firma
-    return {
-        'message_size': message_size,
-        'total_message_size': message_size + sig_len.value,
-        'pubkey_size': sig.contents.length_public_key,
-        'privkey_size': sig.contents.length_secret_key,
-        'sig_size': sig.contents.length_signature,
-        'avg_keygen_time': keygen_time,
-        'avg_sign_time': sign_time,
-        'avg_verify_time': verify_time
+# Checkpoint delle celle completate, per riprendere una prova interrotta (viene rimosso a fine prova)
+CHECKPOINT_FILE = "double_check_checkpoint.json"
+
+# Log degli eventi della prova (un oggetto JSON per riga, in append)
+EVENT_LOG_FILE = "double_check_events.jsonl"
+
+# Orologio per il tempo CPU: 'process' (equivalente a clock() dei test C) oppure 'thread'
+# Il tempo reale viene sempre misurato con time.perf_counter_ns (monotono, ad alta risoluzione)
+cpu_clock = 'process'
+CPU_CLOCKS = {'process': time.process_time_ns, 'thread': time.thread_time_ns}
+
+# Numero di misure a vuoto per la calibrazione dell'overhead dei timer
+calibration_rounds = 10000
+
+# Funzione vuota usata per la calibrazione
+def _noop():
+    return 0
+
+# Classe per la misura dei tempi: ogni misura riporta sia il tempo reale che il tempo CPU,
+# al netto dell'overhead dei timer stimato durante la calibrazione
+class Timer:
+    def __init__(self, cpu_clock_name=cpu_clock, rounds=calibration_rounds):
+        self.wall_clock = time.perf_counter_ns
+        self.cpu_clock = CPU_CLOCKS[cpu_clock_name]
+        self.wall_overhead_ns = 0
+        self.cpu_overhead_ns = 0
+        self.calibrate(rounds)
+
+    # Funzione per stimare l'overhead di una misura: mediana dei tempi di una misura a vuoto
+    def calibrate(self, rounds):
+        wall = np.empty(rounds, dtype=np.int64)
+        cpu = np.empty(rounds, dtype=np.int64)
+        for i in range(rounds):
+            _, wall[i], cpu[i] = self._measure_ns(_noop)
+        self.wall_overhead_ns = int(np.median(wall))
+        self.cpu_overhead_ns = int(np.median(cpu))
+
+    # Funzione per misurare func(*args) in nanosecondi, senza correzioni
+    def _measure_ns(self, func, *args):
+        wall_clock, cpu_clock = self.wall_clock, self.cpu_clock
+        wall_start = wall_clock()
+        cpu_start = cpu_clock()
+        ret = func(*args)
+        cpu_end = cpu_clock()
+        wall_end = wall_clock()
+        return ret, wall_end - wall_start, cpu_end - cpu_start
+
+    # Funzione per misurare func(*args): ritorna (valore di ritorno, tempo reale, tempo CPU) in secondi
+    def measure(self, func, *args):
+        ret, wall_ns, cpu_ns = self._measure_ns(func, *args)
+        wall_time = max(wall_ns - self.wall_overhead_ns, 0) / 1e9
+        cpu_time = max(cpu_ns - self.cpu_overhead_ns, 0) / 1e9
+        return ret, wall_time, cpu_time
+
+# Statistiche incrementali (algoritmo di Welford) di una serie di tempi
+class RunningStats:
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value):
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    # Funzione per calcolare la semiampiezza dell'intervallo di confidenza al 95% della media
+    def ci(self):
+        if self.n < 2:
+            return math.inf
+        return 1.96 * math.sqrt(self.m2 / (self.n - 1) / self.n)
+
+    # Funzione per calcolare la semiampiezza relativa alla media
+    def relative_ci(self):
+        ci = self.ci()
+        if self.mean > 0:
+            return ci / self.mean
+        return 0.0 if ci == 0 else math.inf
+
+# Campionatore adattivo: step() esegue un'iterazione e ritorna un dizionario nome -> tempo,
+# i tempi reali indicati in keys decidono la fine del riscaldamento e del campionamento
+class AdaptiveSampler:
+    def __init__(self, config):
+        self.config = config
+
+    # Funzione per il riscaldamento: lotti di iterazioni scartate finché la mediana si stabilizza
+    def warm_up(self, step, keys):
+        config = self.config
+        start = time.perf_counter()
+        previous = None
+        while time.perf_counter() - start < config['warmup_budget']:
+            batch = []
+            for _ in range(config['warmup_batch']):
+                times = step()
+                batch.append(sum(times[key] for key in keys))
+            median = float(np.median(batch))
+            if previous is not None and abs(median - previous) <= config['warmup_tolerance'] * previous:
+                break
+            previous = median
+
+    # Funzione per il campionamento: ritorna le liste dei tempi e le statistiche dei tempi in keys
+    def run(self, step, keys):
+        config = self.config
+        self.warm_up(step, keys)
+        samples = {}
+        stats = {key: RunningStats() for key in keys}
+        start = time.perf_counter()
+        while True:
+            for name, value in step().items():
+                samples.setdefault(name, []).append(value)
+            for key in keys:
+                stats[key].add(samples[key][-1])
+            n = stats[keys[0]].n
+            if n >= config['max_iterations']:
+                break
+            if n >= config['min_iterations']:
+                if all(stats[key].relative_ci() <= config['target_rel_error'] for key in keys):
+                    break
+                if time.perf_counter() - start >= config['time_budget']:
+                    break
+        return samples, stats
+
+# Sessione di benchmark per uno schema: possiede un'unica struttura OQS_SIG e i buffer
+# pre-allocati per chiavi e firma, riusati in tutte le iterazioni e per tutte le dimensioni del messaggio.
+# Il keygen viene misurato in un ciclo dedicato, firma e verifica usano una coppia di chiavi persistente
+class BenchmarkSession:
+    def __init__(self, scheme_name):
+        if scheme_name not in available_algs:
+            raise ValueError(f"=== ERR: Algoritmo {scheme_name} non trovato ===")
+        self.scheme_name = scheme_name
+
+        # Instanziare l'algoritmo a partire dal nome
+        alg = liboqs.OQS_SIG_alg_identifier(available_algs.index(scheme_name))
+        if alg is None:
+            raise ValueError(f"=== ERR: Algoritmo {scheme_name} non trovato ===")
+
+        # Creare un'istanza della struttura (contiene tutte le caratteristiche)
+        self.sig = liboqs.OQS_SIG_new(alg)
+        if not self.sig:
+            raise ValueError(f"=== ERR: Creazione della struttura SIG fallita per {scheme_name} ===")
+        self.pubkey_size = self.sig.contents.length_public_key
+        self.privkey_size = self.sig.contents.length_secret_key
+        self.sig_size = self.sig.contents.length_signature
+
+        # Buffer pre-allocati
+        self.pubkey = (ctypes.c_ubyte * self.pubkey_size)()
+        self.privkey = (ctypes.c_ubyte * self.privkey_size)()
+        self.signature = (ctypes.c_ubyte * self.sig_size)()
+        self.sig_len = ctypes.c_size_t()
+        self.has_keypair = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Funzione per liberare la memoria occupata dalla struttura
+    def close(self):
+        if self.sig:
+            liboqs.OQS_SIG_free(self.sig)
+            self.sig = None
+
+    # Funzione per generare (senza misurarla) la coppia di chiavi usata per firma e verifica
+    def generate_keypair(self):
+        if liboqs.OQS_SIG_keypair(self.sig, self.pubkey, self.privkey) != 0:
+            raise ValueError(f"=== ERR: Generazione delle chiavi fallita per {self.scheme_name} ===")
+        self.has_keypair = True
+
+    # Funzione per misurare il keygen: ritorna le liste dei tempi reali e CPU e le statistiche
+    # L'ultima coppia di chiavi generata resta disponibile per firma e verifica
+    def measure_keygen(self, sampler):
+        sig, pubkey, privkey = self.sig, self.pubkey, self.privkey
+
+        def step():
+            ret, wall_time, cpu_time = timer.measure(liboqs.OQS_SIG_keypair, sig, pubkey, privkey)
+            if ret != 0:
+                raise ValueError(f"=== ERR: Generazione delle chiavi fallita per {self.scheme_name} ===")
+            return {'keygen_time': wall_time, 'keygen_cpu_time': cpu_time}
+
+        samples, stats = sampler.run(step, ['keygen_time'])
+        self.has_keypair = True
+        return samples, stats
+
+    # Funzione per misurare firma e verifica di un messaggio con la coppia di chiavi della sessione
+    # Ritorna le liste dei tempi reali e CPU delle due operazioni e le statistiche
+    def measure_sign_verify(self, message, sampler):
+        if not self.has_keypair:
+            self.generate_keypair()
+        sig, signature, sig_len, privkey, pubkey = self.sig, self.signature, self.sig_len, self.privkey, self.pubkey
+        sig_len_ref = ctypes.byref(sig_len)
+        message_len = len(message)
+
+        def step():
+            # Firma del messaggio - Calcolo del tempo
+            ret, sign_time, sign_cpu_time = timer.measure(liboqs.OQS_SIG_sign, sig, signature, sig_len_ref, message, message_len, privkey)
+            if ret != 0:
+                raise ValueError(f"Firma fallita per {self.scheme_name}")
+
+            # Verifica del messaggio - Calcolo del tempo
+            ret, verify_time, verify_cpu_time = timer.measure(liboqs.OQS_SIG_verify, sig, message, message_len, signature, sig_len.value, pubkey)
+            if ret != 0:
+                raise ValueError(f"=== ERR: Verifica fallita per {self.scheme_name} ===")
+            return {'sign_time': sign_time, 'sign_cpu_time': sign_cpu_time,
+                    'verify_time': verify_time, 'verify_cpu_time': verify_cpu_time}
+
+        return sampler.run(step, ['sign_time', 'verify_time'])
+
+# Pool dei messaggi: un unico buffer della dimensione massima, riempito una sola volta con byte casuali.
+# I messaggi di ogni dimensione sono viste ctypes sui primi byte del buffer (nessuna copia)
+class MessagePool:
+    def __init__(self, max_size, seed=None):
+        self.buffer = bytearray(np.random.default_rng(seed).bytes(max_size))
+        self.views = {}
+
+    # Funzione per ottenere il messaggio di una data dimensione
+    def message(self, size):
+        if size > len(self.buffer):
+            raise ValueError(f"=== ERR: Messaggio di {size} byte oltre la dimensione del pool ({len(self.buffer)} byte) ===")
+        if size not in self.views:
+            self.views[size] = (ctypes.c_ubyte * size).from_buffer(self.buffer)
+        return self.views[size]
+
+# Stato del processo che esegue le misure (il processo principale oppure un worker del pool):
+# libreria, timer, campionatore, pool dei messaggi e una sessione per ogni schema già incontrato
+liboqs = None
+available_algs = []
+timer = None
+sampler = None
+message_pool = None
+sessions = {}
+
+# Funzione per inizializzare lo stato delle misure nel processo corrente
+# Con un core indicato il processo viene vincolato a quel core prima della calibrazione dei timer
+def init_worker(cores=None, config=None):
+    global liboqs, available_algs, timer, sampler, message_pool
+    if cores is not None and hasattr(os, 'sched_setaffinity'):
+        core = cores.get()
+        os.sched_setaffinity(0, {core})
+    if config is not None:
+        sampling.update(config)
+    liboqs, available_algs = load_liboqs()
+    timer = Timer()
+    sampler = AdaptiveSampler(sampling)
+    message_pool = MessagePool(max(message_sizes))
+
+# Funzione per ottenere la sessione di uno schema (creata una sola volta per processo)
+def get_session(scheme):
+    if scheme not in sessions:
+        sessions[scheme] = BenchmarkSession(scheme)
+    return sessions[scheme]
+
+# Funzione per eseguire una cella della matrice di test
+# - size None: keygen dello schema
+# - size intero: firma e verifica del messaggio di quella dimensione
+def run_cell(scheme, size):
+    session = get_session(scheme)
+    if size is None:
+        times, stats = session.measure_keygen(sampler)
+        return scheme, size, {
+            'pubkey_size': session.pubkey_size,
+            'privkey_size': session.privkey_size,
+            'sig_size': session.sig_size,
+            'avg_keygen_time': float(np.mean(times['keygen_time'])),
+            'avg_keygen_cpu_time': float(np.mean(times['keygen_cpu_time'])),
+            'keygen_iterations': stats['keygen_time'].n,
+            'keygen_ci': stats['keygen_time'].ci()
+        }
+    times, stats = session.measure_sign_verify(message_pool.message(size), sampler)
+    return scheme, size, {
+        'message_size': size,
+        'total_message_size': size + session.sig_len.value,
+        'avg_sign_time': float(np.mean(times['sign_time'])),
+        'avg_verify_time': float(np.mean(times['verify_time'])),
+        'hash_size': size,  # Per questo algoritmo, la hashsize coincide con la lunghezza del messagio perchè NON si fa hashing
+        'avg_sign_cpu_time': float(np.mean(times['sign_cpu_time'])),
+        'avg_verify_cpu_time': float(np.mean(times['verify_cpu_time'])),
+        'sign_iterations': stats['sign_time'].n,
+        'sign_ci': stats['sign_time'].ci(),
+        'verify_iterations': stats['verify_time'].n,
+        'verify_ci': stats['verify_time'].ci()
     }
 
-# Esegue i test: per ogni schema e lunghezza del messaggio esegue 100 volte il test, calcola la media e memorizza i risultati
-for scheme in schemes:
-    if scheme not in available_algs:
-        print(f"=== ERRORE: Algoritmo {scheme} non disponibile. SKIP ===")
-        continue
-
-    # Struttura dati per i risultati di ognuno dei 100 tentativi
-    results = []
-    for size in message_sizes:
-        keygen_times = [] # struttura dati dedicata ai tempi di keygen
-        sign_times = [] # struttura dati dedicata ai tempi di firma
-        verify_times = [] # struttura dati dedicata ai tempi di verifica
-        for i in range(iterations):
-            print(f"Iterazione {i+1}/{iterations} per {scheme} con messaggio di dimensione {size} byte.")
-            times = measure_times(scheme, size)
-            keygen_times.append(times['avg_keygen_time'])
-            sign_times.append(times['avg_sign_time'])
-            verify_times.append(times['avg_verify_time'])
-        
-        # Calcolo delle medie
-        avg_keygen_time = np.mean(keygen_times)
-        avg_sign_time = np.mean(sign_times)
-        avg_verify_time = np.mean(verify_times)
-        
-        results.append({
-            'message_size': size,
-            'total_message_size': size + times['sig_size'],
-            'pubkey_size': times['pubkey_size'],
-            'privkey_size': times['privkey_size'],
-            'sig_size': times['sig_size'],
-            'avg_keygen_time': avg_keygen_time,
-            'avg_sign_time': avg_sign_time,
-            'avg_verify_time': avg_verify_time,
-            'hash_size': size  # Per questo algoritmo, la hashsize coincide con la lunghezza del messagio perchè NON si fa hashing
-        })
-
-    # Scrittura risultati su file
+# Checkpoint: risultati di tutte le celle completate, riscritto in modo atomico dopo ogni cella.
+# Viene usato solo se è stato prodotto con la stessa configurazione (dimensioni dei messaggi e campionamento)
+class Checkpoint:
+    def __init__(self, filename, config, restart=False):
+        self.filename = filename
+        self.state = {'config': config, 'schemes': {}}
+        if restart or not os.path.exists(filename):
+            return
+        try:
+            with open(filename, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            logger.warning(f"Checkpoint {filename} illeggibile, la prova riparte da zero")
+            return
+        if state.get('config') != config:
+            logger.warning(f"Checkpoint {filename} prodotto con un'altra configurazione, la prova riparte da zero")
+            return
+        self.state = state
+
+    # Funzione per ottenere keygen e risultati (dimensione -> risultato) già salvati di uno schema
+    def scheme(self, scheme):
+        saved = self.state['schemes'].get(scheme, {})
+        return saved.get('keygen'), {int(size): result for size, result in saved.get('sizes', {}).items()}
+
+    # Funzione per salvare il risultato di una cella
+    def record(self, scheme, size, result):
+        saved = self.state['schemes'].setdefault(scheme, {'keygen': None, 'sizes': {}})
+        if size is None:
+            saved['keygen'] = result
+        else:
+            saved['sizes'][str(size)] = result
+        tmp_file = self.filename + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.filename)
+
+    # Funzione per rimuovere il checkpoint a prova completata
+    def clear(self):
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+# Log degli eventi in formato JSONL: gli eventi vengono accodati e scritti su file da un thread dedicato.
+# Nell'esecuzione seriale wait() attende che la coda sia vuota prima di iniziare una nuova cella,
+# così durante le misure il thread resta fermo
+class EventLog:
+    def __init__(self, filename):
+        self.queue = queue.Queue()
+        self.file = open(filename, 'a') if filename else None
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+
+    # Funzione per registrare un evento (non esegue I/O)
+    def emit(self, event, **fields):
+        self.queue.put({'time': time.time(), 'event': event, **fields})
+
+    # Funzione eseguita dal thread di scrittura
+    def _writer(self):
+        while True:
+            record = self.queue.get()
+            if record is not None and self.file is not None:
+                self.file.write(json.dumps(record) + '\n')
+                if self.queue.empty():
+                    self.file.flush()
+            self.queue.task_done()
+            if record is None:
+                return
+
+    # Funzione per attendere la scrittura di tutti gli eventi accodati
+    def wait(self):
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        if self.file is not None:
+            self.file.close()
+
+# Funzione per descrivere una cella nei messaggi di log
+def describe_cell(scheme, size):
+    return f"{scheme} (keygen)" if size is None else f"{scheme} con messaggio di {size} byte"
+
+# Funzione per formattare una riga del file di output: le prime 9 colonne seguono il formato dei test C
+# (tempi reali), le 3 successive riportano i tempi CPU, confrontabili con quelli misurati tramite clock(),
+# le ultime 6 il numero di iterazioni e la semiampiezza dell'intervallo di confidenza al 95% di keygen, firma e verifica
+def format_result(keygen, result):
+    result = {**keygen, **result}
+    return f"|{result['message_size']}|{result['total_message_size']}|{result['pubkey_size']}|{result['privkey_size']}|{result['sig_size']}|{result['avg_keygen_time']:.9f}|{result['avg_sign_time']:.9f}|{result['avg_verify_time']:.9f}|{result['hash_size']}|{result['avg_keygen_cpu_time']:.9f}|{result['avg_sign_cpu_time']:.9f}|{result['avg_verify_cpu_time']:.9f}|{result['keygen_iterations']}|{result['keygen_ci']:.9f}|{result['sign_iterations']}|{result['sign_ci']:.9f}|{result['verify_iterations']}|{result['verify_ci']:.9f}|\n"
+
+# Funzione per aggiungere una riga al file di output di uno schema, forzandone la scrittura su disco
+def append_result(scheme, line):
+    with open(output_files[scheme], "a") as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+
+# Funzione per riscrivere (in modo atomico) il file di output di uno schema con i risultati ordinati per dimensione
+def write_results(scheme, keygen, results):
     output_file = output_files[scheme]
-    with open(output_file, "w") as f:
-        for result in results:
-            f.write(f"|{result['message_size']}|{result['total_message_size']}|{result['pubkey_size']}|{result['privkey_size']}|{result['sig_size']}|{result['avg_keygen_time']:.6f}|{result['avg_sign_time']:.6f}|{result['avg_verify_time']:.6f}|{result['hash_size']}|\n")
+    tmp_file = output_file + '.tmp'
+    with open(tmp_file, "w") as f:
+        if keygen is not None:
+            for size in sorted(results):
+                f.write(format_result(keygen, results[size]))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, output_file)
+
+# Esegue i test: per ogni schema una cella di keygen e una cella di firma e verifica per ogni lunghezza del messaggio.
+# Ogni cella completata viene salvata nel checkpoint e aggiunta subito al file di output (se il keygen dello schema
+# è già noto); quando tutte le celle di uno schema sono completate il file viene riordinato per dimensione
+def main(jobs, restart=False, event_log_file=EVENT_LOG_FILE):
+    init_worker()
+    events = EventLog(event_log_file)
+    logger.info(f"Campionamento: {sampling['min_iterations']}-{sampling['max_iterations']} iterazioni, errore relativo {sampling['target_rel_error']:.1%}, {sampling['time_budget']} s per cella.")
+    logger.info("liboqs.so caricato correttamente.")
+    logger.debug(f"Algoritmi disponibili: {available_algs}")
+    logger.info(f"Overhead dei timer: {timer.wall_overhead_ns} ns (reale), {timer.cpu_overhead_ns} ns (CPU {cpu_clock}).")
+
+    active_schemes = []
+    for scheme in schemes:
+        if scheme not in available_algs:
+            logger.error(f"Algoritmo {scheme} non disponibile. SKIP")
+            events.emit('scheme_skipped', scheme=scheme)
+            continue
+        active_schemes.append(scheme)
+
+    # Ripresa delle celle già completate: i file di output vengono riallineati al checkpoint
+    checkpoint = Checkpoint(CHECKPOINT_FILE, {'message_sizes': message_sizes, 'sampling': sampling, 'cpu_clock': cpu_clock}, restart)
+    keygens = {}
+    results = {}
+    for scheme in active_schemes:
+        keygens[scheme], results[scheme] = checkpoint.scheme(scheme)
+        write_results(scheme, keygens[scheme], results[scheme])
+    cells = [(scheme, size) for scheme in active_schemes for size in [None] + message_sizes
+             if (keygens[scheme] is None if size is None else size not in results[scheme])]
+    skipped = len(active_schemes) * (len(message_sizes) + 1) - len(cells)
+    if skipped:
+        logger.info(f"Ripresa dal checkpoint {CHECKPOINT_FILE}: {skipped} celle già completate, {len(cells)} da eseguire.")
+    events.emit('run_start', schemes=active_schemes, message_sizes=message_sizes, sampling=sampling,
+                cpu_clock=cpu_clock, jobs=jobs, cells=len(cells), resumed_cells=skipped,
+                wall_overhead_ns=timer.wall_overhead_ns, cpu_overhead_ns=timer.cpu_overhead_ns)
+
+    # Barre di avanzamento (una per schema, in celle completate); aggiornate solo tra una cella e l'altra
+    tqdm.monitor_interval = 0
+    bars = {scheme: tqdm(total=len(message_sizes) + 1, initial=(keygens[scheme] is not None) + len(results[scheme]),
+                         desc=scheme, unit="cella", position=position, leave=True,
+                         disable=not logger.isEnabledFor(logging.INFO))
+            for position, scheme in enumerate(active_schemes)}
+
+    # Funzione per raccogliere il risultato di una cella
+    def collect(scheme, size, result):
+        checkpoint.record(scheme, size, result)
+        if size is None:
+            keygens[scheme] = result
+            write_results(scheme, keygens[scheme], results[scheme])
+        else:
+            results[scheme][size] = result
+            if keygens[scheme] is not None:
+                append_result(scheme, format_result(keygens[scheme], result))
+        events.emit('cell_done', scheme=scheme, size=size, result=result)
+        logger.debug(f"Completata la cella {describe_cell(scheme, size)}.")
+        bars[scheme].update(1)
+        if keygens[scheme] is not None and len(results[scheme]) == len(message_sizes):
+            write_results(scheme, keygens[scheme], results[scheme])
+            events.emit('scheme_done', scheme=scheme, output_file=output_files[scheme])
+            logger.info(f"Risultati per {scheme} scritti su {output_files[scheme]}")
+
+    try:
+        with logging_redirect_tqdm(loggers=[logger]):
+            if jobs <= 1:
+                for scheme, size in cells:
+                    # Nessun I/O durante le misure: eventi e log vengono scritti prima di iniziare la cella
+                    logger.debug(f"Iniziando i test per {describe_cell(scheme, size)}.")
+                    events.emit('cell_start', scheme=scheme, size=size)
+                    events.wait()
+                    collect(*run_cell(scheme, size))
+                for session in sessions.values():
+                    session.close()
+            else:
+                # Un worker per core: ogni worker carica la propria istanza di liboqs e si vincola a un core dedicato
+                cores = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else list(range(os.cpu_count() or 1))
+                workers = min(jobs, len(cores))
+                logger.info(f"Esecuzione parallela su {workers} processi, core: {cores[:workers]}")
+                with Manager() as manager:
+                    core_queue = manager.Queue()
+                    for core in cores[:workers]:
+                        core_queue.put(core)
+                    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(core_queue, sampling)) as executor:
+                        futures = [executor.submit(run_cell, scheme, size) for scheme, size in cells]
+                        try:
+                            for future in as_completed(futures):
+                                collect(*future.result())
+                        except BaseException:
+                            executor.shutdown(wait=False, cancel_futures=True)
+                            raise
+    except KeyboardInterrupt:
+        for bar in bars.values():
+            bar.close()
+        logger.warning(f"Prova interrotta: le celle completate sono salvate in {CHECKPOINT_FILE}, rieseguire lo script per riprendere")
+        events.emit('run_interrupted')
+        events.close()
+        exit(1)
+    for bar in bars.values():
+        bar.close()
+    checkpoint.clear()
+    events.emit('run_done')
+    events.close()
 
-    print(f"Risultati per {scheme} scritti su {output_file}")
\ No newline at end of file
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Verifica dei tempi degli schemi di firma tramite liboqs")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="Numero di processi paralleli, ognuno vincolato a un core dedicato (default: 1, esecuzione seriale)")
+    parser.add_argument('-e', '--rel-error', type=float, default=sampling['target_rel_error'],
+                        help="Semiampiezza relativa dell'intervallo di confidenza al 95%% della media da raggiungere")
+    parser.add_argument('-b', '--budget', type=float, default=sampling['time_budget'],
+                        help="Secondi massimi di campionamento per cella")
+    parser.add_argument('-n', '--iterations', type=int, default=None,
+                        help="Numero fisso di iterazioni, senza riscaldamento né campionamento adattivo (es. 100 come nei test C)")
+    parser.add_argument('-r', '--restart', action='store_true',
+                        help=f"Ignora il checkpoint di una prova interrotta ({CHECKPOINT_FILE}) e riparte da zero")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Log dettagliato (una riga per cella)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="Solo avvisi ed errori")
+    parser.add_argument('--events', default=EVENT_LOG_FILE,
+                        help=f"File JSONL del log degli eventi (default: {EVENT_LOG_FILE}, stringa vuota per disattivarlo)")
+    args = parser.parse_args()
+    logging.basicConfig(format="%(levelname)s: %(message)s",
+                        level=logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO)
+    sampling['target_rel_error'] = args.rel_error
+    sampling['time_budget'] = args.budget
+    if args.iterations is not None:
+        sampling.update({'warmup_budget': 0.0, 'min_iterations': args.iterations, 'max_iterations': args.iterations})
+    main(args.jobs, args.restart, args.events)
@@ -0,0 +1,128 @@
+# Autore: Tomas Lovato
+# Data: 2024/08/26 10:00
+# Motore comune agli script dei grafici: lettura del manifest dichiarativo (plot_manifest.json),
+# piano di lettura globale dei file di input e rendering (parallelo e incrementale) dei grafici
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tqdm import tqdm
+import result_store
+
+# Manifest con algoritmi, varianti e grafici da generare
+MANIFEST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plot_manifest.json')
+
+# Funzione per leggere la sezione del manifest dedicata a uno script ('performance' o 'comparison')
+def load_manifest(section, filename=MANIFEST_FILE):
+    with open(filename, 'r') as file:
+        manifest = json.load(file)
+    if section not in manifest:
+        raise ValueError(f"Sezione {section} non presente nel manifest {filename}")
+    return {'algorithms': manifest['algorithms'], **manifest[section]}
+
+# Funzione per risolvere un riferimento a un file di input nel suo percorso
+# Formato: [cartella:]algoritmo/variante, es. 'dilithium2/ref', 'i9:falcon2/sha256_avx2'
+# Senza cartella esplicita si usa la cartella con lo stesso nome della variante (es. 'liboqs'),
+# altrimenti quella di default
+def resolve_input(manifest, reference):
+    directory, _, name = reference.rpartition(':')
+    algorithm, _, variant = name.partition('/')
+    try:
+        filename = manifest['algorithms'][algorithm][variant]
+    except KeyError:
+        raise ValueError(f"Riferimento {reference} non valido: algoritmo o variante non dichiarati") from None
+    if not directory:
+        directory = variant if variant in manifest['directories'] else 'default'
+    return manifest['directories'][directory] + '/' + filename
+
+# Funzione per costruire la lista dei job dal manifest: ogni coppia (tipo di grafico, gruppo) è indipendente
+# Il gruppo mantiene il formato [files, nome del grafico, titolo, larghezza, altezza]
+def build_jobs(manifest, kinds=None):
+    jobs = []
+    for kind, plot_kind in manifest['plot_kinds'].items():
+        if kinds is not None and kind not in kinds:
+            continue
+        for figure in plot_kind['figures']:
+            file_paths = [[resolve_input(manifest, reference) for reference in figure['inputs']],
+                          figure['output'], figure['title'], figure['size'][0], figure['size'][1]]
+            jobs.append((kind, file_paths))
+    return jobs
+
+# Funzione per selezionare i soli job i cui file di input esistono già (es. durante le misure)
+def available_jobs(jobs):
+    return [job for job in jobs if all(os.path.exists(file) for file in job[1][0])]
+
+# Funzione per costruire il piano di lettura: ogni file distinto compare una sola volta
+def build_load_plan(jobs):
+    return sorted({file for _, file_paths in jobs for file in file_paths[0]})
+
+# Funzione per calcolare l'impronta di un job: hash dei file in input, definizione del
+# gruppo, parametri del grafico e codice dello script che lo disegna
+def job_fingerprint(job, params, script_digest):
+    _, file_paths = job
+    payload = {
+        'group': file_paths,
+        'inputs': [result_store.file_digest(file) for file in file_paths[0]],
+        'params': params,
+        'script': script_digest
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+# Funzioni per leggere e scrivere (in modo atomico) lo stato della build
+def load_build_state(state_file):
+    try:
+        with open(state_file, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+def save_build_state(state_file, state):
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    tmp_file = state_file + '.tmp'
+    with open(tmp_file, 'w') as file:
+        json.dump(state, file, indent=1, sort_keys=True)
+    os.replace(tmp_file, state_file)
+
+# Funzione per eseguire tutti i job, in serie oppure con un pool di processi
+# - render_job(job) disegna il grafico e ne ritorna il percorso (deve essere definita a livello di modulo)
+# - describe_job(job) ritorna (percorso del grafico, parametri che ne determinano il contenuto)
+# Con incremental=True vengono saltati i grafici già presenti i cui input non sono cambiati
+def render_all(jobs, render_job, describe_job, state_file, script_file, workers=1, incremental=True, show_plots=False):
+    incremental = incremental and not show_plots
+    state = load_build_state(state_file) if incremental else {}
+    script_digest = result_store.file_digest(script_file)
+    fingerprints = {}
+    pending = []
+    for job in jobs:
+        output_file, params = describe_job(job)
+        fingerprints[output_file] = job_fingerprint(job, params, script_digest)
+        if incremental and state.get(output_file) == fingerprints[output_file] and os.path.exists(output_file):
+            continue
+        pending.append(job)
+    if incremental:
+        print(f"Grafici aggiornati: {len(jobs) - len(pending)}, da generare: {len(pending)}")
+
+    # Piano di lettura globale: ogni file in input viene letto una sola volta e finisce
+    # nella cache (in memoria e su disco) da cui leggono tutti i grafici che lo usano
+    for filename in build_load_plan(pending):
+        result_store.load_columns(filename)
+
+    # Lo stato viene salvato anche in caso di errore, con i soli grafici completati
+    try:
+        with tqdm(total=len(pending), desc="Generating Plots", unit="plot") as pbar:
+            if workers <= 1 or show_plots:
+                for job in pending:
+                    output_file = render_job(job)
+                    state[output_file] = fingerprints[output_file]
+                    pbar.update(1)
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(render_job, job) for job in pending]
+                    for future in as_completed(futures):
+                        output_file = future.result()
+                        state[output_file] = fingerprints[output_file]
+                        pbar.update(1)
+    finally:
+        if not show_plots:
+            save_build_state(state_file, state)
@@ -0,0 +1,190 @@
+# Autore: Tomas Lovato
+# Data: 2024/08/25 10:00
+# Archivio dei risultati: ogni file di output viene letto una sola volta e
+# conservato in forma colonnare (array NumPy), in memoria e su disco
+
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+
+# Colonne dei file di output (nell'ordine in cui vengono scritte dai test C)
+COLUMNS = ['msg_len', 'signed_msg_len', 'pub_key_size', 'priv_key_size', 'signature_size', 'keygen_time', 'sign_time', 'verify_time', 'hash_len']
+DTYPES = {
+    'msg_len': np.int64,
+    'signed_msg_len': np.int64,
+    'pub_key_size': np.int64,
+    'priv_key_size': np.int64,
+    'signature_size': np.int64,
+    'keygen_time': np.float64,
+    'sign_time': np.float64,
+    'verify_time': np.float64,
+    'hash_len': np.int64
+}
+
+# Colonne del file dei benchmark di SPHINCS+ (scritto da SPHINCS+/benchmark.py): una riga per set di
+# parametri e per esecuzione, identificata dall'istante di avvio (run), così da conservare lo storico
+SPHINCS_BENCHMARK_FILE = './output/sphincs_benchmark'
+SPHINCS_BENCHMARK_COLUMNS = ['run', 'impl', 'paramset', 'hash', 'size', 'option', 'thash',
+                             'keygen_cycles', 'sign_cycles', 'verify_cycles', 'keygen_us', 'sign_us', 'verify_us',
+                             'signature_size', 'pub_key_size', 'priv_key_size']
+SPHINCS_BENCHMARK_DTYPES = {
+    'run': np.int64,
+    'impl': np.str_,
+    'paramset': np.str_,
+    'hash': np.str_,
+    'size': np.int64,
+    'option': np.str_,
+    'thash': np.str_,
+    'keygen_cycles': np.int64,
+    'sign_cycles': np.int64,
+    'verify_cycles': np.int64,
+    'keygen_us': np.float64,
+    'sign_us': np.float64,
+    'verify_us': np.float64,
+    'signature_size': np.int64,
+    'pub_key_size': np.int64,
+    'priv_key_size': np.int64
+}
+
+# Cartella della cache su disco (un file .npz per ogni file di output)
+CACHE_DIR = './.cache/results'
+
+# Cache in memoria: chiave -> dizionario colonna -> array
+_memory_cache = {}
+
+# Funzione per calcolare la chiave di un file: percorso assoluto + mtime + dimensione
+def cache_key(filename):
+    stat = os.stat(filename)
+    return (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+
+# Funzione per ottenere il percorso del file di cache associato a una chiave
+def _cache_path(key):
+    digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, digest + '.npz')
+
+# Funzione per calcolare l'hash SHA-256 del contenuto di un file (memorizzato per chiave)
+_digest_cache = {}
+def file_digest(filename):
+    key = cache_key(filename)
+    if key not in _digest_cache:
+        sha = hashlib.sha256()
+        with open(filename, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                sha.update(chunk)
+        _digest_cache[key] = sha.hexdigest()
+    return _digest_cache[key]
+
+# Funzione per leggere un file di output nel formato |campo|campo|...|
+# Il file viene letto in un'unica chiamata: il primo e l'ultimo campo (vuoti, dovuti
+# ai '|' iniziale e finale) vengono scartati, le righe vuote e i '\r\n' scritti da
+# test_rsa.c sono gestiti direttamente dal parser C di pandas
+# Eventuali colonne aggiuntive in coda (es. i tempi CPU di double_check.py) vengono ignorate
+# Con columns/dtypes si leggono file con altre colonne (es. i benchmark di SPHINCS+)
+def parse_file(filename, columns=COLUMNS, dtypes=DTYPES):
+    try:
+        df = pd.read_csv(filename, sep='|', header=None, usecols=range(1, len(columns) + 1),
+                         dtype={i + 1: dtypes[column] for i, column in enumerate(columns)},
+                         skip_blank_lines=True, skipinitialspace=True, engine='c')
+    except pd.errors.EmptyDataError:
+        return {column: np.empty(0, dtype=dtypes[column]) for column in columns}
+
+    # Conversione in forma colonnare
+    return {column: df[i + 1].to_numpy(dtype=dtypes[column]) for i, column in enumerate(columns)}
+
+# Funzione per ottenere le colonne di un file, leggendolo solo se non è già in cache
+def load_columns(filename, columns=COLUMNS, dtypes=DTYPES):
+    key = cache_key(filename)
+    if columns != COLUMNS:
+        key += (tuple(columns),)
+    if key in _memory_cache:
+        return _memory_cache[key]
+
+    # Tentativo di lettura dalla cache su disco
+    path = _cache_path(key)
+    if os.path.exists(path):
+        try:
+            with np.load(path) as archive:
+                data = {column: archive[column] for column in columns}
+            _memory_cache[key] = data
+            return data
+        except (OSError, KeyError, ValueError):
+            pass  # cache corrotta o incompleta: si rilegge il file
+
+    data = parse_file(filename, columns, dtypes)
+    _memory_cache[key] = data
+
+    # Scrittura atomica della cache su disco
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = path + '.' + str(os.getpid()) + '.tmp.npz'
+    np.savez(tmp_path, **data)
+    os.replace(tmp_path, path)
+    return data
+
+# Funzione per leggere i dati dal file come DataFrame (una copia, modificabile dal chiamante)
+def read_data(filename, columns=COLUMNS, dtypes=DTYPES):
+    data = load_columns(filename, columns, dtypes)
+    return pd.DataFrame({column: data[column].copy() for column in columns}, columns=columns)
+
+# Funzione per aggiungere righe (dizionari colonna -> valore) a un file nel formato |campo|campo|...|
+def append_rows(filename, rows, columns):
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(filename, 'a') as file:
+        for row in rows:
+            file.write('|' + '|'.join(str(row[column]) for column in columns) + '|\n')
+
+# Funzione per leggere lo storico dei benchmark di SPHINCS+ come DataFrame
+def read_sphincs_benchmarks(filename=SPHINCS_BENCHMARK_FILE):
+    return read_data(filename, SPHINCS_BENCHMARK_COLUMNS, SPHINCS_BENCHMARK_DTYPES)
+
+# Funzione per svuotare la cache in memoria
+def clear_memory_cache():
+    _memory_cache.clear()
+    _digest_cache.clear()
+
+# Campioni grezzi scritti dai test C con RAW_SAMPLES=1 nel file <output>.samples:
+# intestazione di 16 byte (magic, versione e dimensione del record come uint32)
+# seguita da un record little-endian per ogni iterazione
+SAMPLES_SUFFIX = '.samples'
+SAMPLES_MAGIC = b'PQSAMPL1'
+SAMPLES_VERSION = 1
+SAMPLES_HEADER = np.dtype([('magic', 'S8'), ('version', '<u4'), ('record_size', '<u4')])
+SAMPLES_DTYPE = np.dtype([('msg_len', '<u8'), ('keygen_time', '<f8'), ('sign_time', '<f8'), ('verify_time', '<f8')])
+
+# Funzione per ottenere il file dei campioni associato a un file di output
+def samples_path(filename):
+    return filename + SAMPLES_SUFFIX
+
+# Funzione per leggere i campioni grezzi di un file di output tramite memory-map (nessuna copia in memoria)
+# I tempi mancanti (es. keygen di RSA, con meno iterazioni, o campionamento adattivo) valgono NaN
+def read_samples(filename):
+    path = samples_path(filename)
+    header = np.fromfile(path, dtype=SAMPLES_HEADER, count=1)
+    if len(header) != 1 or header['magic'][0] != SAMPLES_MAGIC:
+        raise ValueError(f"File dei campioni {path} non valido")
+    if header['version'][0] != SAMPLES_VERSION or header['record_size'][0] != SAMPLES_DTYPE.itemsize:
+        raise ValueError(f"File dei campioni {path}: versione {header['version'][0]} non supportata")
+
+    # Un eventuale record incompleto in coda (test interrotto) viene ignorato
+    count = (os.path.getsize(path) - SAMPLES_HEADER.itemsize) // SAMPLES_DTYPE.itemsize
+    if count == 0:
+        return np.empty(0, dtype=SAMPLES_DTYPE)
+    return np.memmap(path, dtype=SAMPLES_DTYPE, mode='r', offset=SAMPLES_HEADER.itemsize, shape=(count,))
+
+# Funzione per calcolare i percentili dei tempi per ogni dimensione del messaggio
+# Ritorna un DataFrame con le colonne msg_len, samples e <tempo>_p<percentile> (es. sign_time_p95)
+def sample_percentiles(filename, percentiles=(50, 95, 99)):
+    samples = read_samples(filename)
+    msg_lens, inverse = np.unique(samples['msg_len'], return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.searchsorted(inverse[order], np.arange(len(msg_lens) + 1))
+    result = {'msg_len': msg_lens.astype(np.int64), 'samples': np.diff(bounds)}
+    for column in ('keygen_time', 'sign_time', 'verify_time'):
+        values = samples[column][order]
+        groups = [values[bounds[i]:bounds[i + 1]] for i in range(len(msg_lens))]
+        for p in percentiles:
+            result[f'{column}_p{p}'] = np.array([np.nanpercentile(group, p) if not np.isnan(group).all() else np.nan
+                                                 for group in groups], dtype=np.float64)
+    return pd.DataFrame(result)
@@ -86,7 +86,7 @@ int main(int argc, char **argv)
     if(rsa_do)
     {
         // CLASSIC RSA
-        system("gcc ./RSA/test_rsa.c -o ./RSA/test_rsa -lcrypto");
+        system("gcc -I./common ./RSA/test_rsa.c ./common/bench_utils.c -o ./RSA/test_rsa -lcrypto -lm");
         // SCRIPT + RSA80SHA256 + RSA80SHA512 + RSA112SHA256 + RSA112SHA512 + RSA128SHA256 + RSA128SHA512 + RSA192SHA256 + RSA192SHA512 + RSA256SHA256 + RSA256SHA512 + NUM ITER + INCREMENT
         system("./RSA/test_rsa ./output/rsa_80_sha256 ./output/rsa_80_sha512 ./output/rsa_112_sha256 ./output/rsa_112_sha512 ./output/rsa_128_sha256 ./output/rsa_128_sha512 ./output/rsa_192_sha256 ./output/rsa_192_sha512 ./output/rsa_256_sha256 ./output/rsa_256_sha512 100 2");
     }
@@ -0,0 +1,413 @@
+# Autore: Tomas Lovato
+# Data: 2024/08/30 12:00
+# Raccoglie i dati di tutti gli algoritmi eseguendo i comandi di commands_analytics.txt come un grafo
+# di dipendenze (compilazione -> misura -> grafici): le compilazioni indipendenti sono eseguite in
+# parallelo, le misure una alla volta (o ognuna su un core dedicato) e i grafici di ogni algoritmo
+# vengono generati appena i suoi file di output sono pronti, sui core non usati dalle misure.
+# Le compilazioni condividono un jobserver di make e la cache dei file oggetto di build_cache.py
+
+import argparse
+import json
+import os
+import shlex
+import re
+import select
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# File con i comandi da eseguire
+COMMANDS_FILE = './commands_analytics.txt'
+
+# Cartella dei log dei singoli passi e resoconto dell'esecuzione (tempi e codici di uscita)
+LOG_DIR = './output/logs'
+REPORT_FILE = './output/analytics_report.json'
+
+# Parti attivabili, nello stesso ordine dei parametri di start_analytics.c
+PARTS = ['dilithium', 'falcon', 'sphincs', 'rsa', 'python']
+
+# Opzione aggiunta al comando dei grafici per generare solo quelli i cui input esistono già
+PARTIAL_PLOT_OPTION = '--available'
+
+# Wrapper del compilatore con la cache dei file oggetto
+BUILD_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'build_cache.py')
+
+# Passo del grafo: nome, tipo ('build', 'measure' o 'plot'), comando, passi da cui dipende (deve
+# attenderne il completamento con successo), passi che devono solo essere terminati prima dell'avvio
+# e core a cui vincolare il processo (None: nessun vincolo; le misure ricevono un core all'avvio)
+class Step:
+    def __init__(self, name, kind, command, deps=(), after=(), cores=None):
+        self.name = name
+        self.kind = kind
+        self.command = command
+        self.deps = list(deps)
+        self.after = list(after)
+        self.cores = set(cores) if cores else None
+        self.status = 'pending'
+        self.returncode = None
+        self.start = None
+        self.wall_time = None
+        self.core = None
+        self.token = None
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'command': self.command,
+            'deps': [dep.name for dep in self.deps],
+            'after': [step.name for step in self.after],
+            'status': self.status,
+            'returncode': self.returncode,
+            'start': self.start,
+            'wall_time': self.wall_time,
+            'core': self.core,
+            'cores': sorted(self.cores) if self.cores else None
+        }
+
+# Funzione per classificare un comando in base al programma eseguito
+def command_kind(command):
+    program = os.path.basename(shlex.split(command)[0])
+    if program in ('make', 'gcc', 'cc'):
+        return 'build'
+    if program.startswith('python'):
+        return 'plot'
+    return 'measure'
+
+# Funzione per leggere il file dei comandi: una lista di blocchi, ognuno una lista di comandi
+# I blocchi sono separati da righe vuote, le righe che iniziano con '#' sono commenti
+def read_blocks(filename):
+    blocks = [[]]
+    with open(filename, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if line.startswith('#'):
+                continue
+            if not line:
+                if blocks[-1]:
+                    blocks.append([])
+                continue
+            blocks[-1].append(line)
+    return [block for block in blocks if block]
+
+# Funzione per ricavare la cartella compilata da un comando di build (es. 'CRYSTALS-dilithium/ref'),
+# None se non è possibile
+def build_dir(command):
+    args = shlex.split(command)
+    if '-C' in args:
+        return os.path.normpath(args[args.index('-C') + 1])
+    sources = [arg for arg in args[1:] if arg.endswith('.c')]
+    if sources:
+        return os.path.dirname(os.path.normpath(sources[0]))
+    return None
+
+# Funzione per ricavare le cartelle compilate da un blocco, nell'ordine dei comandi
+def block_dirs(block):
+    dirs = []
+    for command in block:
+        if command_kind(command) == 'build':
+            directory = build_dir(command)
+            if directory is not None and directory not in dirs:
+                dirs.append(directory)
+    return dirs
+
+# Funzione per dare un nome a un blocco: le cartelle compilate dai suoi comandi di build
+# (es. 'SPHINCS+/ref-sha2-128, SPHINCS+/ref-sha2-192, ...'), altrimenti il programma del primo comando
+def block_name(block):
+    dirs = block_dirs(block)
+    if dirs:
+        return ', '.join(dirs)
+    return os.path.basename(shlex.split(block[0])[0])
+
+# Funzione per dare un nome a un comando di un blocco: la cartella che compila (build) o che contiene
+# il programma eseguito (misura), altrimenti il nome del blocco
+def command_name(command, block):
+    if command_kind(command) == 'build':
+        directory = build_dir(command)
+        if directory is not None:
+            return directory
+    program = os.path.normpath(shlex.split(command)[0])
+    for directory in block_dirs(block):
+        if program.startswith(directory + os.sep):
+            return directory
+    return block_name(block)
+
+# Funzione per rendere univoco un nome (es. blocchi che compilano nella stessa cartella)
+def unique_name(name, names):
+    unique = name
+    suffix = 2
+    while unique in names:
+        unique = f"{name}#{suffix}"
+        suffix += 1
+    names.add(unique)
+    return unique
+
+# Funzione per costruire il grafo dei passi a partire dai blocchi
+# - le misure di un blocco dipendono dalle sue compilazioni, e partono solo quando tutte le
+#   compilazioni sono terminate (una compilazione in corso altererebbe i tempi misurati),
+#   anche se quelle degli altri blocchi sono fallite
+# - se plot_cores contiene dei core, per ogni blocco con misure viene aggiunto un passo che genera i
+#   grafici i cui input esistono già: dipende solo dalle misure del blocco e viene vincolato ai core
+#   plot_cores, non usati dalle misure, così da non alterare i tempi misurati degli altri blocchi
+# - i comandi dei grafici presenti nel file dipendono da tutte le misure e partono dopo i grafici parziali
+def build_graph(blocks, plot_cores=None):
+    builds = []
+    measures_by_block = []
+    plot_commands = []
+    names = set()
+    step_names = set()
+    for block in blocks:
+        name = unique_name(block_name(block), names)
+        block_builds = []
+        block_measures = []
+        for index, command in enumerate(block):
+            kind = command_kind(command)
+            step_name = unique_name(f"{command_name(command, block)} [{index + 1}]", step_names)
+            if kind == 'build':
+                block_builds.append(Step(step_name, kind, command))
+            elif kind == 'measure':
+                block_measures.append(Step(step_name, kind, command, block_builds))
+            else:
+                plot_commands.append(command)
+        builds.extend(block_builds)
+        if block_measures:
+            measures_by_block.append((name, block_measures))
+
+    steps = list(builds)
+    measures = []
+    for name, block_measures in measures_by_block:
+        for step in block_measures:
+            step.after = builds
+        steps.extend(block_measures)
+        measures.extend(block_measures)
+    for command in plot_commands:
+        script = os.path.basename(shlex.split(command)[-1])
+        partial = []
+        if plot_cores:
+            partial = [Step(f"{name} [{script}]", 'plot', command + ' ' + PARTIAL_PLOT_OPTION, block_measures, cores=plot_cores)
+                       for name, block_measures in measures_by_block]
+        steps.extend(partial)
+        steps.append(Step(script, 'plot', command, measures, partial))
+    return steps
+
+# Funzione per selezionare i blocchi delle parti attive (stessa semantica di start_analytics.c)
+def select_blocks(blocks, enabled):
+    selected = []
+    for block in blocks:
+        name = block_name(block).lower()
+        if all(command_kind(command) == 'plot' for command in block):
+            part = 'python'
+        else:
+            part = next((part for part in PARTS if part in name), None)
+        if part is None or enabled[part]:
+            selected.append(block)
+    return selected
+
+# Jobserver condiviso da tutte le compilazioni (protocollo di GNU make: una pipe con un token per ogni
+# job oltre al primo). Ogni make lanciato oltre al primo occupa un token per il proprio job implicito,
+# così i job contemporanei di tutte le cartelle non superano mai il numero indicato
+class Jobserver:
+    def __init__(self, jobs):
+        self.jobs = max(1, jobs)
+        self.read_fd, self.write_fd = os.pipe()
+        os.write(self.write_fd, b'+' * (self.jobs - 1))
+
+    # Funzione per ottenere un token senza attendere (None se non ce ne sono di liberi)
+    def try_acquire(self):
+        if not select.select([self.read_fd], [], [], 0)[0]:
+            return None
+        return os.read(self.read_fd, 1)
+
+    def release(self, token):
+        os.write(self.write_fd, token)
+
+    # Variabili d'ambiente e descrittori da passare ai processi make
+    def env(self):
+        return {**os.environ, 'MAKEFLAGS': f"-j{self.jobs} --jobserver-auth={self.read_fd},{self.write_fd}"}
+
+    def fds(self):
+        return (self.read_fd, self.write_fd)
+
+# Funzione per leggere il compilatore (e il linker, se definito) usati da un Makefile
+# Dal comando vengono tolti i target, mantenendo opzioni e assegnamenti di variabili
+def make_tools(args):
+    query_args = args[:1]
+    for index, arg in enumerate(args[1:], 1):
+        if arg.startswith('-') or '=' in arg or args[index - 1] in ('-C', '-f', '--directory', '--file', '--makefile'):
+            query_args.append(arg)
+    query = 'print-build-tools: ; @echo "$(CC)|$(origin LD)|$(LD)"'
+    env = {key: value for key, value in os.environ.items() if key not in ('MAKEFLAGS', 'MFLAGS')}
+    output = subprocess.run(query_args + ['-s', '--no-print-directory', '--eval', query, 'print-build-tools'],
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, env=env).stdout.strip()
+    cc, ld_origin, ld = (output.split('|') + ['', '', ''])[:3]
+    return cc, ld if ld_origin in ('file', 'command line', 'environment') else None
+
+# Funzione per far passare un comando di compilazione dalla cache dei file oggetto: a make vengono
+# passati CC (e LD) con il wrapper davanti al compilatore del Makefile, che resta lo stesso
+def cached_build_command(args):
+    wrapper = [sys.executable, BUILD_CACHE]
+    if os.path.basename(args[0]) != 'make':
+        return wrapper + args
+    cc, ld = make_tools(args)
+    if not cc:
+        return args
+    args = args + ['CC=' + ' '.join(wrapper + [cc])]
+    if ld:
+        args.append('LD=' + ' '.join(wrapper + [ld]))
+    return args
+
+# Esecutore del grafo
+# - build_jobs: numero massimo di job di compilazione contemporanei (jobserver condiviso)
+# - cores: se indicati, le misure vengono eseguite in parallelo, ognuna vincolata a un core libero;
+#   altrimenti vengono eseguite una alla volta
+# - build_cache: se attivo le compilazioni usano la cache dei file oggetto
+class Orchestrator:
+    def __init__(self, steps, build_jobs, cores=None, build_cache=True, log_dir=LOG_DIR):
+        self.steps = steps
+        self.log_dir = log_dir
+        self.build_cache = build_cache
+        self.jobserver = Jobserver(build_jobs)
+        self.limits = {'build': self.jobserver.jobs, 'measure': len(cores) if cores else 1, 'plot': 1}
+        self.free_cores = list(cores) if cores else []
+
+    # Funzione per eseguire un passo (in un thread), con stdout e stderr salvati nel suo file di log
+    def run_step(self, step):
+        log_file = os.path.join(self.log_dir, re.sub(r'[^A-Za-z0-9+.-]+', '_', step.name).strip('_') + '.log')
+        args = shlex.split(step.command)
+        options = {}
+        cores = {step.core} if step.core is not None else step.cores
+        if cores:
+            options['preexec_fn'] = lambda: os.sched_setaffinity(0, cores)
+        if step.kind == 'build':
+            if self.build_cache:
+                args = cached_build_command(args)
+            options['env'] = self.jobserver.env()
+            options['pass_fds'] = self.jobserver.fds()
+        step.start = time.time()
+        start = time.perf_counter()
+        try:
+            with open(log_file, 'w') as log:
+                process = subprocess.run(args, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, **options)
+            step.returncode = process.returncode
+        except OSError as error:
+            with open(log_file, 'a') as log:
+                log.write(f"{error}\n")
+            step.returncode = -1
+        step.wall_time = time.perf_counter() - start
+        return step
+
+    # Funzione per eseguire tutti i passi rispettando dipendenze e limiti di parallelismo
+    # Un passo fallito non ferma gli altri rami del grafo: vengono saltati solo i passi che ne dipendono
+    def run(self):
+        os.makedirs(self.log_dir, exist_ok=True)
+        running = {}
+        counts = {kind: 0 for kind in self.limits}
+        with ThreadPoolExecutor(max_workers=sum(self.limits.values())) as executor:
+            while True:
+                waiting_token = False
+                for step in self.steps:
+                    if step.status != 'pending':
+                        continue
+                    if any(dep.status in ('failed', 'skipped') for dep in step.deps):
+                        step.status = 'skipped'
+                        print(f"=== SKIP: {step.name} (dipendenze fallite) ===")
+                        continue
+                    if any(dep.status != 'ok' for dep in step.deps) or any(other.status in ('pending', 'running') for other in step.after):
+                        continue
+                    if counts[step.kind] >= self.limits[step.kind]:
+                        continue
+                    # La prima compilazione usa il job implicito, le altre un token del jobserver
+                    if step.kind == 'build' and counts['build'] > 0:
+                        step.token = self.jobserver.try_acquire()
+                        if step.token is None:
+                            waiting_token = True
+                            continue
+                    if step.kind == 'measure' and self.free_cores:
+                        step.core = self.free_cores.pop(0)
+                    step.status = 'running'
+                    counts[step.kind] += 1
+                    print(f"Avvio di {step.name}: {step.command}" + (f" (core {step.core})" if step.core is not None else ""))
+                    running[executor.submit(self.run_step, step)] = step
+                if not running:
+                    break
+                # I token liberati dai processi make non vengono notificati: se una compilazione ne
+                # attende uno si riprova periodicamente
+                done, _ = wait(running, timeout=0.5 if waiting_token else None, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    future.result()
+                    step.status = 'ok' if step.returncode == 0 else 'failed'
+                    counts[step.kind] -= 1
+                    if step.token is not None:
+                        self.jobserver.release(step.token)
+                        step.token = None
+                    if step.core is not None:
+                        self.free_cores.append(step.core)
+                    if step.status == 'ok':
+                        print(f"Completato {step.name} in {step.wall_time:.1f} s")
+                    else:
+                        print(f"=== ERRORE: {step.name} terminato con codice {step.returncode} (log in {self.log_dir}) ===")
+        return all(step.status == 'ok' for step in self.steps)
+
+# Funzione per salvare il resoconto dell'esecuzione
+def write_report(steps, filename, wall_time):
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    tmp_file = filename + '.tmp'
+    with open(tmp_file, 'w') as file:
+        json.dump({'wall_time': wall_time, 'steps': [step.to_dict() for step in steps]}, file, indent=1)
+    os.replace(tmp_file, filename)
+
+# Funzione per stampare il riepilogo dei passi
+def print_summary(steps):
+    print("\n=== RIEPILOGO ===")
+    for step in steps:
+        wall_time = f"{step.wall_time:8.1f} s" if step.wall_time is not None else " " * 10
+        print(f"{step.status:8} {wall_time}  {step.kind:8} {step.name}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Raccolta dei dati di tutti gli algoritmi e generazione dei grafici')
+    parser.add_argument('parts', nargs='*', type=int,
+                        help='5 flag 0/1 come per start_analytics.c: dilithium, falcon, sphincs, rsa, python (default: tutti attivi)')
+    parser.add_argument('-f', '--file', default=COMMANDS_FILE, help=f'file dei comandi (default: {COMMANDS_FILE})')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='numero massimo di job di compilazione in parallelo')
+    parser.add_argument('--no-cache', action='store_true', help='compila senza la cache dei file oggetto (build_cache.py)')
+    parser.add_argument('-c', '--cores', help="core su cui eseguire le misure in parallelo, es. 2,3 (default: misure in serie sull'ultimo core)")
+    parser.add_argument('--no-partial-plots', action='store_true', help='genera i grafici solo al termine di tutte le misure')
+    parser.add_argument('-n', '--dry-run', action='store_true', help='mostra il grafo dei passi senza eseguirlo')
+    args = parser.parse_args()
+
+    if args.parts and len(args.parts) != len(PARTS):
+        parser.error(f"servono {len(PARTS)} flag ({' '.join(PARTS)})")
+    enabled = dict(zip(PARTS, args.parts)) if args.parts else {part: 1 for part in PARTS}
+    if args.parts:
+        print(f"=== PARAMETERS: {' '.join(str(flag) for flag in args.parts)} ===")
+    # Le misure sono vincolate ai core indicati (default: l'ultimo core disponibile), i grafici parziali ai
+    # core rimanenti; se non ne rimane nessuno i grafici vengono generati solo al termine delle misure
+    available = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else []
+    cores = [int(core) for core in args.cores.split(',')] if args.cores else available[-1:]
+    plot_cores = None if args.no_partial_plots else set(available) - set(cores)
+    if not args.no_partial_plots and not plot_cores:
+        print("Nessun core libero per i grafici parziali: i grafici verranno generati al termine delle misure")
+
+    steps = build_graph(select_blocks(read_blocks(args.file), enabled), plot_cores)
+    if args.dry_run:
+        for step in steps:
+            print(f"{step.kind:8} {step.name}: {step.command}")
+            if step.deps:
+                print(f"{'':8} dipende da: {', '.join(dep.name for dep in step.deps)}")
+            if step.after:
+                print(f"{'':8} dopo: {', '.join(other.name for other in step.after)}")
+            if step.cores:
+                print(f"{'':8} core: {', '.join(str(core) for core in sorted(step.cores))}")
+        exit(0)
+
+    start = time.perf_counter()
+    orchestrator = Orchestrator(steps, args.jobs, cores, build_cache=not args.no_cache)
+    try:
+        success = orchestrator.run()
+    finally:
+        write_report(steps, REPORT_FILE, time.perf_counter() - start)
+    print_summary(steps)
+    print(f"Resoconto salvato in {REPORT_FILE}")
+    exit(0 if success else 1)
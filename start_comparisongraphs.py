@@ -2,31 +2,26 @@
 # Data: 2024/08/22 14:00
 # Grafici di comparazione tra gli output dei PC#1 e PC#2
 
+import argparse
+import os
+import matplotlib
 import pandas as pd
-import matplotlib.pyplot as plt
 import seaborn as sns
-import os
-from tqdm import tqdm
+import plot_engine
+import result_store
 
 # Variabile globale per decidere se mostrare o salvare i grafici
 SHOW_PLOTS = False
 
-# Funzione per leggere i dati dal file
-def read_data(filename):
-    with open(filename, 'r') as file:
-        lines = file.readlines()
-
-    data = []
-    for line in lines:
-        line = line.strip()
-        if line:
-            fields = line.split('|')
-            data.append([int(fields[1]), int(fields[2]), int(fields[3]), int(fields[4]), int(fields[5]), float(fields[6]), float(fields[7]), float(fields[8]), int(fields[9])])
-
-    columns = ['msg_len', 'signed_msg_len', 'pub_key_size', 'priv_key_size', 'signature_size', 'keygen_time', 'sign_time', 'verify_time', 'hash_len']
+# Se i grafici vengono solo salvati si usa il backend Agg (senza finestre), necessario
+# anche per il rendering nei processi worker
+if not SHOW_PLOTS:
+    matplotlib.use('Agg')
+import matplotlib.pyplot as plt
 
-    df = pd.DataFrame(data, columns=columns)
-    return df
+# Funzione per leggere i dati dal file (parser vettoriale e cache, vedi result_store.py)
+def read_data(filename):
+    return result_store.read_data(filename)
 
 # Funzione per salvare o mostrare il grafico
 def save_or_show_plot(filename):
@@ -116,8 +111,8 @@ plot_colors = {
 ### ================================================
 
 # Funzione per creare il grafico con la media dei tempi di keygen
-def create_keygen_time_histogram(df_all, output_file, title):
-    plt.figure(figsize=(file_paths[3], file_paths[4]))
+def create_keygen_time_histogram(df_all, output_file, title, figsize):
+    plt.figure(figsize=figsize)
 
     # Calcola la media dei tempi di keygen per ogni algoritmo e versione
     df_mean_keygen_time = df_all.groupby(['algorithm', 'device'])['keygen_time'].mean().reset_index()
@@ -138,36 +133,16 @@ def create_keygen_time_histogram(df_all, output_file, title):
     
     save_or_show_plot(output_file)
     plt.close()
-    # Aggiorna la progress bar
-    pbar.update(1)
 
-# Gruppi di file da confrontare + nome di salvataggio grafo
-file_groups = [
-    [['./output/20240822_i9/dilithium2_avx2',   './output/20240822_i9/dilithium3_avx2', './output/20240822_i9/dilithium5_avx2', './output/20240822_i7/dilithium2_avx2',   './output/20240822_i7/dilithium3_avx2', './output/20240822_i7/dilithium5_avx2'], 'TM_KG_dilithium.png', 'Dilithium Versions',12,4],
-    [['./output/20240822_i9/falcon2_avx2',      './output/20240822_i9/falcon5_avx2', './output/20240822_i7/falcon2_avx2',      './output/20240822_i7/falcon5_avx2'],   'TM_KG_falcon.png', 'Falcon Versions',12,4],
-    [['./output/20240822_i9/sphincs128_avx2',   './output/20240822_i9/sphincs192_avx2', './output/20240822_i9/sphincs256_avx2','./output/20240822_i7/sphincs128_avx2',   './output/20240822_i7/sphincs192_avx2', './output/20240822_i7/sphincs256_avx2'], 'TM_KG_sphincs.png', 'Sphincs+ Versions',12,4],
-    [['./output/20240822_i9/rsa_80_sha256',    './output/20240822_i9/rsa_112_sha256',  './output/20240822_i9/rsa_128_sha256',    './output/20240822_i9/rsa_192_sha256',  './output/20240822_i9/rsa_256_sha256', './output/20240822_i7/rsa_80_sha256',    './output/20240822_i7/rsa_112_sha256',  './output/20240822_i7/rsa_128_sha256', './output/20240822_i7/rsa_192_sha256',  './output/20240822_i7/rsa_256_sha256'], 'TM_KG_rsa.png', 'RSA Versions',12,4],
-    [['./output/20240822_i9/dilithium2_avx2',   './output/20240822_i9/falcon2_avx2',    './output/20240822_i9/sphincs128_avx2', './output/20240822_i9/rsa_112_sha256', './output/20240822_i7/dilithium2_avx2',   './output/20240822_i7/falcon2_avx2',    './output/20240822_i7/sphincs128_avx2', './output/20240822_i7/rsa_112_sha256'], 'TM_KG_128bit_security_level.png', 'Security Level 1 & 2',12,4],
-    [['./output/20240822_i9/dilithium3_avx2',   './output/20240822_i9/sphincs192_avx2', './output/20240822_i9/rsa_128_sha256', './output/20240822_i7/dilithium3_avx2',   './output/20240822_i7/sphincs192_avx2', './output/20240822_i7/rsa_128_sha256'], 'TM_KG_192bit_security_level.png', 'Security Level 3',12,4],
-    [['./output/20240822_i9/dilithium5_avx2',   './output/20240822_i9/falcon5_avx2',    './output/20240822_i9/sphincs256_avx2', './output/20240822_i9/rsa_256_sha256', './output/20240822_i7/dilithium5_avx2',   './output/20240822_i7/falcon5_avx2',    './output/20240822_i7/sphincs256_avx2', './output/20240822_i7/rsa_256_sha256'], 'TM_KG_256bit_security_level.png', 'Security Level 5',12,4],
-]
 
-# Aggiungi una progress bar
-with tqdm(total=len(file_groups), desc="Generating KeyGen Time Plots", unit="plot") as pbar:
-    for file_paths in file_groups:
-        # Lettura del gruppo di files
-        df_all = read_multiple_files(file_paths[0])
-        # Applicazione del mapping ai nomi degli algoritmi
-        df_all['algorithm'] = df_all['algorithm'].map(algorithm_name_mapping)
-        # Creazione del grafico con la media dei tempi di keygen
-        create_keygen_time_histogram(df_all, './plot/comparison/Time_Keygen/' + file_paths[1], file_paths[2])
+
 
 
 
 
 
 # Dizionario per mappare i nomi degli algoritmi ai nuovi nomi
-algorithm_name_mapping = {
+algorithm_name_mapping_time = {
     'dilithium2_avx2': 'Dilithium 2',
     'dilithium3_avx2': 'Dilithium 3',
     'dilithium5_avx2': 'Dilithium 5',
@@ -221,8 +196,8 @@ algorithm_name_mapping = {
 ### ================================================
 
 # Funzione per creare il grafico con simboli diversi per REF e AVX2
-def create_sign_time_plot(df_all, output_file, title):
-    plt.figure(figsize=(file_paths[3], file_paths[4]))
+def create_sign_time_plot(df_all, output_file, title, figsize):
+    plt.figure(figsize=figsize)
     
     # Definisci la palette di colori per gli algoritmi
     palette = sns.color_palette("tab10", n_colors=len(df_all['algorithm'].unique()))
@@ -247,59 +222,9 @@ def create_sign_time_plot(df_all, output_file, title):
     plt.yscale('log')
     save_or_show_plot(output_file)
     plt.close()
-    # Aggiorna la progress bar
-    pbar.update(1)
-
-# Gruppi di file da confrontare + nome di salvataggio grafo
-file_groups = [# NORMAL VERSIONS
-    [['./output/20240822_i9/dilithium2_avx2', './output/20240822_i9/dilithium3_avx2', './output/20240822_i9/dilithium5_avx2', './output/20240822_i7/dilithium2_avx2', './output/20240822_i7/dilithium3_avx2', './output/20240822_i7/dilithium5_avx2'], 'TM_SG_dilithium.png', 'Dilithium Versions',10,6],
-    [['./output/20240822_i9/falcon2_avx2', './output/20240822_i9/falcon5_avx2', './output/20240822_i7/falcon2_avx2', './output/20240822_i7/falcon5_avx2'], 'TM_SG_falcon.png', 'Falcon Versions',10,6],
-    [['./output/20240822_i9/sphincs128_avx2', './output/20240822_i9/sphincs192_avx2', './output/20240822_i9/sphincs256_avx2', './output/20240822_i7/sphincs128_avx2', './output/20240822_i7/sphincs192_avx2', './output/20240822_i7/sphincs256_avx2'], 'TM_SG_sphincs.png', 'Sphincs+ Versions',10,6],
-    [['./output/20240822_i9/rsa_80_sha256', './output/20240822_i9/rsa_80_sha512', './output/20240822_i9/rsa_112_sha256',  './output/20240822_i9/rsa_112_sha512',  './output/20240822_i9/rsa_128_sha256', './output/20240822_i9/rsa_128_sha512', './output/20240822_i9/rsa_192_sha256', './output/20240822_i9/rsa_192_sha512', './output/20240822_i9/rsa_256_sha256', './output/20240822_i9/rsa_256_sha512', './output/20240822_i7/rsa_80_sha256', './output/20240822_i7/rsa_80_sha512', './output/20240822_i7/rsa_112_sha256',  './output/20240822_i7/rsa_112_sha512',  './output/20240822_i7/rsa_128_sha256', './output/20240822_i7/rsa_128_sha512', './output/20240822_i7/rsa_192_sha256', './output/20240822_i7/rsa_192_sha512', './output/20240822_i7/rsa_256_sha256', './output/20240822_i7/rsa_256_sha512'], 'TM_SG_rsa.png', 'RSA Versions',20,12],
-    # WITH SHA-256
-    [['./output/20240822_i9/dilithium2_sha256_avx2', './output/20240822_i9/dilithium3_sha256_avx2', './output/20240822_i9/dilithium5_sha256_avx2', './output/20240822_i7/dilithium2_sha256_avx2', './output/20240822_i7/dilithium3_sha256_avx2', './output/20240822_i7/dilithium5_sha256_avx2'], 'deprecated/TM_SG_dilithium_sha256.png', 'Dilithium Versions with SHA-256',10,6],
-    [['./output/20240822_i9/falcon2_avx2_sha256', './output/20240822_i9/falcon5_avx2_sha256', './output/20240822_i7/falcon2_avx2_sha256', './output/20240822_i7/falcon5_avx2_sha256'], 'deprecated/TM_SG_falcon_sha256.png', 'Falcon Versions with SHA-256',10,6],
-    [['./output/20240822_i9/sphincs128_sha256_avx2', './output/20240822_i9/sphincs192_sha256_avx2', './output/20240822_i9/sphincs256_sha256_avx2', './output/20240822_i7/sphincs128_sha256_avx2', './output/20240822_i7/sphincs192_sha256_avx2', './output/20240822_i7/sphincs256_sha256_avx2'], 'deprecated/TM_SG_sphincs_sha256.png', 'Sphincs+ Versions with SHA-256',10,6],
-    [['./output/20240822_i9/rsa_80_sha256', './output/20240822_i9/rsa_112_sha256',  './output/20240822_i9/rsa_128_sha256', './output/20240822_i9/rsa_192_sha256', './output/20240822_i9/rsa_256_sha256', './output/20240822_i7/rsa_80_sha256',    './output/20240822_i7/rsa_112_sha256',  './output/20240822_i7/rsa_128_sha256', './output/20240822_i7/rsa_192_sha256', './output/20240822_i7/rsa_256_sha256'], 'deprecated/TM_SG_rsa_sha256.png', 'RSA Versions with SHA-256',10,6],
-    # WITH SHA-512
-    [['./output/20240822_i9/dilithium2_sha512_avx2', './output/20240822_i9/dilithium3_sha512_avx2', './output/20240822_i9/dilithium5_sha512_avx2', './output/20240822_i7/dilithium2_sha512_avx2', './output/20240822_i7/dilithium3_sha512_avx2', './output/20240822_i7/dilithium5_sha512_avx2'], 'deprecated/TM_SG_dilithium_sha512.png', 'Dilithium Versions with SHA-512',10,6],
-    [['./output/20240822_i9/falcon2_avx2_sha512', './output/20240822_i9/falcon5_avx2_sha512', './output/20240822_i7/falcon2_avx2_sha512', './output/20240822_i7/falcon5_avx2_sha512'], 'deprecated/TM_SG_falcon_sha512.png', 'Falcon Versions with SHA-512',10,6],
-    [['./output/20240822_i9/sphincs128_sha512_avx2', './output/20240822_i9/sphincs192_sha512_avx2', './output/20240822_i9/sphincs256_sha512_avx2', './output/20240822_i7/sphincs128_sha512_avx2', './output/20240822_i7/sphincs192_sha512_avx2', './output/20240822_i7/sphincs256_sha512_avx2'], 'deprecated/TM_SG_sphincs_sha512.png', 'Sphincs+ Versions with SHA-512',10,6],
-    [['./output/20240822_i9/rsa_80_sha512', './output/20240822_i9/rsa_112_sha512',  './output/20240822_i9/rsa_128_sha512', './output/20240822_i9/rsa_192_sha512', './output/20240822_i9/rsa_256_sha512', './output/20240822_i7/rsa_80_sha512', './output/20240822_i7/rsa_112_sha512',  './output/20240822_i7/rsa_128_sha512', './output/20240822_i7/rsa_192_sha512', './output/20240822_i7/rsa_256_sha512'], 'deprecated/TM_SG_rsa_sha512.png', 'RSA Versions with SHA-512',10,6],
-    # ONLY DILITHIUM 2,3,5
-    [['./output/20240822_i9/dilithium2_avx2', './output/20240822_i9/dilithium2_sha256_avx2', './output/20240822_i9/dilithium2_sha512_avx2', './output/20240822_i7/dilithium2_avx2', './output/20240822_i7/dilithium2_sha256_avx2', './output/20240822_i7/dilithium2_sha512_avx2'], 'TM_SG_dilithium_2_All.png', 'Dilithium 2',10,6],
-    [['./output/20240822_i9/dilithium3_avx2', './output/20240822_i9/dilithium3_sha256_avx2', './output/20240822_i9/dilithium3_sha512_avx2', './output/20240822_i7/dilithium3_avx2', './output/20240822_i7/dilithium3_sha256_avx2', './output/20240822_i7/dilithium3_sha512_avx2'], 'TM_SG_dilithium_3_All.png', 'Dilithium 3',10,6],
-    [['./output/20240822_i9/dilithium5_avx2', './output/20240822_i9/dilithium5_sha256_avx2', './output/20240822_i9/dilithium5_sha512_avx2', './output/20240822_i7/dilithium5_avx2', './output/20240822_i7/dilithium5_sha256_avx2', './output/20240822_i7/dilithium5_sha512_avx2'], 'TM_SG_dilithium_5_All.png', 'Dilithium 5',10,6],
-    # ONLY FALCON 512 and 1024
-    [['./output/20240822_i9/falcon2_avx2', './output/20240822_i9/falcon2_avx2_sha256', './output/20240822_i9/falcon2_avx2_sha512', './output/20240822_i7/falcon2_avx2', './output/20240822_i7/falcon2_avx2_sha256', './output/20240822_i7/falcon2_avx2_sha512'], 'TM_SG_falcon_2_All.png', 'Falcon 2',10,6],
-    [['./output/20240822_i9/falcon5_avx2', './output/20240822_i9/falcon5_avx2_sha256', './output/20240822_i9/falcon5_avx2_sha512', './output/20240822_i7/falcon5_avx2', './output/20240822_i7/falcon5_avx2_sha256', './output/20240822_i7/falcon5_avx2_sha512'], 'TM_SG_falcon_5_All.png', 'Falcon 5',10,6],
-    # ONLY SPHINCS+ 128,192,256
-    [['./output/20240822_i9/sphincs128_avx2', './output/20240822_i9/sphincs128_sha256_avx2', './output/20240822_i9/sphincs128_sha512_avx2', './output/20240822_i7/sphincs128_avx2', './output/20240822_i7/sphincs128_sha256_avx2', './output/20240822_i7/sphincs128_sha512_avx2'], 'TM_SG_sphincs_128_All.png', 'SPHINCS+ 128 Versions',10,6],
-    [['./output/20240822_i9/sphincs192_avx2', './output/20240822_i9/sphincs192_sha256_avx2', './output/20240822_i9/sphincs192_sha512_avx2', './output/20240822_i7/sphincs192_avx2', './output/20240822_i7/sphincs192_sha256_avx2', './output/20240822_i7/sphincs192_sha512_avx2'], 'TM_SG_sphincs_192_All.png', 'SPHINCS+ 192 Versions',10,6],
-    [['./output/20240822_i9/sphincs256_avx2', './output/20240822_i9/sphincs256_sha256_avx2', './output/20240822_i9/sphincs256_sha512_avx2', './output/20240822_i7/sphincs256_avx2', './output/20240822_i7/sphincs256_sha256_avx2', './output/20240822_i7/sphincs256_sha512_avx2'], 'TM_SG_sphincs_256_All.png', 'SPHINCS+ 256 Versions',10,6],
-    # DIFFERENT SECURITY LEVELS WITH NO SHA
-    [['./output/20240822_i9/dilithium2_avx2', './output/20240822_i9/falcon2_avx2', './output/20240822_i9/sphincs128_avx2', './output/20240822_i7/dilithium2_avx2', './output/20240822_i7/falcon2_avx2', './output/20240822_i7/sphincs128_avx2'], 'TM_SG_128bit_security_level.png', 'Security Level 1 & 2',10,6],
-    [['./output/20240822_i9/dilithium3_avx2', './output/20240822_i9/sphincs192_avx2', './output/20240822_i7/dilithium3_avx2', './output/20240822_i7/sphincs192_avx2'], 'TM_SG_192bit_security_level.png', 'Security Level 3',10,6],
-    [['./output/20240822_i9/dilithium5_avx2', './output/20240822_i9/falcon5_avx2', './output/20240822_i9/sphincs256_avx2', './output/20240822_i7/dilithium5_avx2', './output/20240822_i7/falcon5_avx2', './output/20240822_i7/sphincs256_avx2'], 'TM_SG_256bit_security_level.png', 'Security Level 5',10,6],
-    # DIFFERENT SECURITY LEVELS WITH SHA-256
-    [['./output/20240822_i9/dilithium2_sha256_avx2', './output/20240822_i9/falcon2_avx2_sha256', './output/20240822_i9/sphincs128_sha256_avx2', './output/20240822_i9/rsa_128_sha256', './output/20240822_i7/dilithium2_sha256_avx2', './output/20240822_i7/falcon2_avx2_sha256', './output/20240822_i7/sphincs128_sha256_avx2', './output/20240822_i7/rsa_112_sha256'], 'deprecated/TM_SG_128bit_security_level_sha256.png', 'Security Level 1 & 2 with SHA-256',10,6],
-    [['./output/20240822_i9/dilithium3_sha256_avx2', './output/20240822_i9/sphincs192_sha256_avx2', './output/20240822_i9/rsa_192_sha256', './output/20240822_i7/dilithium3_sha256_avx2', './output/20240822_i7/sphincs192_sha256_avx2', './output/20240822_i7/rsa_128_sha256'], 'deprecated/TM_SG_192bit_security_level_sha256.png', 'Security Level 3 with SHA-256',10,6],
-    [['./output/20240822_i9/dilithium5_sha256_avx2', './output/20240822_i9/falcon5_avx2_sha256', './output/20240822_i9/sphincs256_sha256_avx2', './output/20240822_i9/rsa_256_sha256', './output/20240822_i7/dilithium5_sha256_avx2', './output/20240822_i7/falcon5_avx2_sha256', './output/20240822_i7/sphincs256_sha256_avx2', './output/20240822_i7/rsa_256_sha256'], 'deprecated/TM_SG_256bit_security_level_sha256.png', 'Security Level 5 with SHA-256',10,6],
-    # DIFFERENT SECURITY LEVELS WITH SHA-512
-    [['./output/20240822_i9/dilithium2_sha512_avx2', './output/20240822_i9/falcon2_avx2_sha512', './output/20240822_i9/sphincs128_sha512_avx2', './output/20240822_i9/rsa_128_sha512', './output/20240822_i7/dilithium2_sha512_avx2', './output/20240822_i7/falcon2_avx2_sha512', './output/20240822_i7/sphincs128_sha512_avx2', './output/20240822_i7/rsa_112_sha512'], 'deprecated/TM_SG_128bit_security_level_sha512.png', 'Security Level 1 & 2 with SHA-512',10,6],
-    [['./output/20240822_i9/dilithium3_sha512_avx2', './output/20240822_i9/sphincs192_sha512_avx2', './output/20240822_i9/rsa_192_sha512', './output/20240822_i7/dilithium3_sha512_avx2', './output/20240822_i7/sphincs192_sha512_avx2', './output/20240822_i7/rsa_128_sha512'], 'deprecated/TM_SG_192bit_security_level_sha512.png', 'Security Level 3 with SHA-512',10,6],
-    [['./output/20240822_i9/dilithium5_sha512_avx2', './output/20240822_i9/falcon5_avx2_sha512', './output/20240822_i9/sphincs256_sha512_avx2', './output/20240822_i9/rsa_256_sha512', './output/20240822_i7/dilithium5_sha512_avx2', './output/20240822_i7/falcon5_avx2_sha512', './output/20240822_i7/sphincs256_sha512_avx2', './output/20240822_i7/rsa_256_sha512'], 'deprecated/TM_SG_256bit_security_level_sha512.png', 'Security Level 5 with SHA-512',10,6],
-]
-
-# Aggiungi una progress bar
-with tqdm(total=len(file_groups), desc="Generating Sign Time Plots", unit="plot") as pbar:
-    for file_paths in file_groups:
-        # Lettura del gruppo di files
-        df_all = read_multiple_files(file_paths[0])
-        # Applicazione del mapping ai nomi degli algoritmi
-        df_all['algorithm'] = df_all['algorithm'].map(algorithm_name_mapping)
-        # Creazione del grafico con simboli diversi per REF e AVX2
-        create_sign_time_plot(df_all, './plot/comparison/Time_Sign/' + file_paths[1], file_paths[2])
+
+
+
 
 
 
@@ -309,8 +234,8 @@ with tqdm(total=len(file_groups), desc="Generating Sign Time Plots", unit="plot"
 ### ================================================
 
 # Funzione per creare il grafico con simboli diversi per REF e AVX2
-def create_verify_time_plot(df_all, output_file, title):
-    plt.figure(figsize=(file_paths[3], file_paths[4]))
+def create_verify_time_plot(df_all, output_file, title, figsize):
+    plt.figure(figsize=figsize)
     
     # Definisci la palette di colori per gli algoritmi
     palette = sns.color_palette("tab10", n_colors=len(df_all['algorithm'].unique()))
@@ -335,59 +260,9 @@ def create_verify_time_plot(df_all, output_file, title):
     plt.yscale('log')
     save_or_show_plot(output_file)
     plt.close()
-    # Aggiorna la progress bar
-    pbar.update(1)
-
-# Gruppi di file da confrontare + nome di salvataggio grafo
-file_groups = [# NORMAL VERSIONS
-    [['./output/20240822_i9/dilithium2_avx2', './output/20240822_i9/dilithium3_avx2', './output/20240822_i9/dilithium5_avx2', './output/20240822_i7/dilithium2_avx2', './output/20240822_i7/dilithium3_avx2', './output/20240822_i7/dilithium5_avx2'], 'TM_VF_dilithium.png', 'Dilithium Versions',10,6],
-    [['./output/20240822_i9/falcon2_avx2', './output/20240822_i9/falcon5_avx2', './output/20240822_i7/falcon2_avx2', './output/20240822_i7/falcon5_avx2'], 'TM_VF_falcon.png', 'Falcon Versions',10,6],
-    [['./output/20240822_i9/sphincs128_avx2', './output/20240822_i9/sphincs192_avx2', './output/20240822_i9/sphincs256_avx2', './output/20240822_i7/sphincs128_avx2', './output/20240822_i7/sphincs192_avx2', './output/20240822_i7/sphincs256_avx2'], 'TM_VF_sphincs.png', 'Sphincs+ Versions',10,6],
-    [['./output/20240822_i9/rsa_80_sha256', './output/20240822_i9/rsa_80_sha512', './output/20240822_i9/rsa_112_sha256',  './output/20240822_i9/rsa_112_sha512',  './output/20240822_i9/rsa_128_sha256', './output/20240822_i9/rsa_128_sha512', './output/20240822_i9/rsa_192_sha256', './output/20240822_i9/rsa_192_sha512', './output/20240822_i9/rsa_256_sha256', './output/20240822_i9/rsa_256_sha512', './output/20240822_i7/rsa_80_sha256', './output/20240822_i7/rsa_80_sha512', './output/20240822_i7/rsa_112_sha256',  './output/20240822_i7/rsa_112_sha512',  './output/20240822_i7/rsa_128_sha256', './output/20240822_i7/rsa_128_sha512', './output/20240822_i7/rsa_192_sha256', './output/20240822_i7/rsa_192_sha512', './output/20240822_i7/rsa_256_sha256', './output/20240822_i7/rsa_256_sha512'], 'TM_VF_rsa.png', 'RSA Versions',20,12],
-    # WITH SHA-256
-    [['./output/20240822_i9/dilithium2_sha256_avx2', './output/20240822_i9/dilithium3_sha256_avx2', './output/20240822_i9/dilithium5_sha256_avx2', './output/20240822_i7/dilithium2_sha256_avx2', './output/20240822_i7/dilithium3_sha256_avx2', './output/20240822_i7/dilithium5_sha256_avx2'], 'deprecated/TM_VF_dilithium_sha256.png', 'Dilithium Versions with SHA-256',10,6],
-    [['./output/20240822_i9/falcon2_avx2_sha256', './output/20240822_i9/falcon5_avx2_sha256', './output/20240822_i7/falcon2_avx2_sha256', './output/20240822_i7/falcon5_avx2_sha256'], 'deprecated/TM_VF_falcon_sha256.png', 'Falcon Versions with SHA-256',10,6],
-    [['./output/20240822_i9/sphincs128_sha256_avx2', './output/20240822_i9/sphincs192_sha256_avx2', './output/20240822_i9/sphincs256_sha256_avx2', './output/20240822_i7/sphincs128_sha256_avx2', './output/20240822_i7/sphincs192_sha256_avx2', './output/20240822_i7/sphincs256_sha256_avx2'], 'deprecated/TM_VF_sphincs_sha256.png', 'Sphincs+ Versions with SHA-256',10,6],
-    [['./output/20240822_i9/rsa_80_sha256', './output/20240822_i9/rsa_112_sha256',  './output/20240822_i9/rsa_128_sha256', './output/20240822_i9/rsa_192_sha256', './output/20240822_i9/rsa_256_sha256', './output/20240822_i7/rsa_80_sha256',    './output/20240822_i7/rsa_112_sha256',  './output/20240822_i7/rsa_128_sha256', './output/20240822_i7/rsa_192_sha256', './output/20240822_i7/rsa_256_sha256'], 'deprecated/TM_VF_rsa_sha256.png', 'RSA Versions with SHA-256',10,6],
-    # WITH SHA-512
-    [['./output/20240822_i9/dilithium2_sha512_avx2', './output/20240822_i9/dilithium3_sha512_avx2', './output/20240822_i9/dilithium5_sha512_avx2', './output/20240822_i7/dilithium2_sha512_avx2', './output/20240822_i7/dilithium3_sha512_avx2', './output/20240822_i7/dilithium5_sha512_avx2'], 'deprecated/TM_VF_dilithium_sha512.png', 'Dilithium Versions with SHA-512',10,6],
-    [['./output/20240822_i9/falcon2_avx2_sha512', './output/20240822_i9/falcon5_avx2_sha512', './output/20240822_i7/falcon2_avx2_sha512', './output/20240822_i7/falcon5_avx2_sha512'], 'deprecated/TM_VF_falcon_sha512.png', 'Falcon Versions with SHA-512',10,6],
-    [['./output/20240822_i9/sphincs128_sha512_avx2', './output/20240822_i9/sphincs192_sha512_avx2', './output/20240822_i9/sphincs256_sha512_avx2', './output/20240822_i7/sphincs128_sha512_avx2', './output/20240822_i7/sphincs192_sha512_avx2', './output/20240822_i7/sphincs256_sha512_avx2'], 'deprecated/TM_VF_sphincs_sha512.png', 'Sphincs+ Versions with SHA-512',10,6],
-    [['./output/20240822_i9/rsa_80_sha512', './output/20240822_i9/rsa_112_sha512',  './output/20240822_i9/rsa_128_sha512', './output/20240822_i9/rsa_192_sha512', './output/20240822_i9/rsa_256_sha512', './output/20240822_i7/rsa_80_sha512', './output/20240822_i7/rsa_112_sha512',  './output/20240822_i7/rsa_128_sha512', './output/20240822_i7/rsa_192_sha512', './output/20240822_i7/rsa_256_sha512'], 'deprecated/TM_VF_rsa_sha512.png', 'RSA Versions with SHA-512',10,6],
-    # ONLY DILITHIUM 2,3,5
-    [['./output/20240822_i9/dilithium2_avx2', './output/20240822_i9/dilithium2_sha256_avx2', './output/20240822_i9/dilithium2_sha512_avx2', './output/20240822_i7/dilithium2_avx2', './output/20240822_i7/dilithium2_sha256_avx2', './output/20240822_i7/dilithium2_sha512_avx2'], 'TM_VF_dilithium_2_All.png', 'Dilithium 2 Versions vs SHA',10,6],
-    [['./output/20240822_i9/dilithium3_avx2', './output/20240822_i9/dilithium3_sha256_avx2', './output/20240822_i9/dilithium3_sha512_avx2', './output/20240822_i7/dilithium3_avx2', './output/20240822_i7/dilithium3_sha256_avx2', './output/20240822_i7/dilithium3_sha512_avx2'], 'TM_VF_dilithium_3_All.png', 'Dilithium 3 Versions vs SHA',10,6],
-    [['./output/20240822_i9/dilithium5_avx2', './output/20240822_i9/dilithium5_sha256_avx2', './output/20240822_i9/dilithium5_sha512_avx2', './output/20240822_i7/dilithium5_avx2', './output/20240822_i7/dilithium5_sha256_avx2', './output/20240822_i7/dilithium5_sha512_avx2'], 'TM_VF_dilithium_5_All.png', 'Dilithium 5 Versions vs SHA',10,6],
-    # ONLY FALCON 512 and 1024
-    [['./output/20240822_i9/falcon2_avx2', './output/20240822_i9/falcon2_avx2_sha256', './output/20240822_i9/falcon2_avx2_sha512', './output/20240822_i7/falcon2_avx2', './output/20240822_i7/falcon2_avx2_sha256', './output/20240822_i7/falcon2_avx2_sha512'], 'TM_VF_falcon_2_All.png', 'Falcon 2 Versions vs SHA',10,6],
-    [['./output/20240822_i9/falcon5_avx2', './output/20240822_i9/falcon5_avx2_sha256', './output/20240822_i9/falcon5_avx2_sha512', './output/20240822_i7/falcon5_avx2', './output/20240822_i7/falcon5_avx2_sha256', './output/20240822_i7/falcon5_avx2_sha512'], 'TM_VF_falcon_5_All.png', 'Falcon 5 Versions vs SHA',10,6],
-    # ONLY SPHINCS+ 128,192,256
-    [['./output/20240822_i9/sphincs128_avx2', './output/20240822_i9/sphincs128_sha256_avx2', './output/20240822_i9/sphincs128_sha512_avx2', './output/20240822_i7/sphincs128_avx2', './output/20240822_i7/sphincs128_sha256_avx2', './output/20240822_i7/sphincs128_sha512_avx2'], 'TM_VF_sphincs_128_All.png', 'SPHINCS+ 128 Versions vs SHA',10,6],
-    [['./output/20240822_i9/sphincs192_avx2', './output/20240822_i9/sphincs192_sha256_avx2', './output/20240822_i9/sphincs192_sha512_avx2', './output/20240822_i7/sphincs192_avx2', './output/20240822_i7/sphincs192_sha256_avx2', './output/20240822_i7/sphincs192_sha512_avx2'], 'TM_VF_sphincs_192_All.png', 'SPHINCS+ 192 Versions vs SHA',10,6],
-    [['./output/20240822_i9/sphincs256_avx2', './output/20240822_i9/sphincs256_sha256_avx2', './output/20240822_i9/sphincs256_sha512_avx2', './output/20240822_i7/sphincs256_avx2', './output/20240822_i7/sphincs256_sha256_avx2', './output/20240822_i7/sphincs256_sha512_avx2'], 'TM_VF_sphincs_256_All.png', 'SPHINCS+ 256 Versions vs SHA',10,6],
-    # DIFFERENT SECURITY LEVELS WITH NO SHA
-    [['./output/20240822_i9/dilithium2_avx2', './output/20240822_i9/falcon2_avx2', './output/20240822_i9/sphincs128_avx2', './output/20240822_i7/dilithium2_avx2', './output/20240822_i7/falcon2_avx2', './output/20240822_i7/sphincs128_avx2'], 'TM_VF_128bit_security_level.png', 'Security Level 1 & 2',10,6],
-    [['./output/20240822_i9/dilithium3_avx2', './output/20240822_i9/sphincs192_avx2', './output/20240822_i7/dilithium3_avx2', './output/20240822_i7/sphincs192_avx2'], 'TM_VF_192bit_security_level.png', 'Security Level 3',10,6],
-    [['./output/20240822_i9/dilithium5_avx2', './output/20240822_i9/falcon5_avx2', './output/20240822_i9/sphincs256_avx2', './output/20240822_i7/dilithium5_avx2', './output/20240822_i7/falcon5_avx2', './output/20240822_i7/sphincs256_avx2'], 'TM_VF_256bit_security_level.png', 'Security Level 5',10,6],
-    # DIFFERENT SECURITY LEVELS WITH SHA-256
-    [['./output/20240822_i9/dilithium2_sha256_avx2', './output/20240822_i9/falcon2_avx2_sha256', './output/20240822_i9/sphincs128_sha256_avx2', './output/20240822_i9/rsa_128_sha256', './output/20240822_i7/dilithium2_sha256_avx2', './output/20240822_i7/falcon2_avx2_sha256', './output/20240822_i7/sphincs128_sha256_avx2', './output/20240822_i7/rsa_112_sha256'], 'deprecated/TM_VF_128bit_security_level_sha256.png', 'Security Level 1 & 2 with SHA-256',10,6],
-    [['./output/20240822_i9/dilithium3_sha256_avx2', './output/20240822_i9/sphincs192_sha256_avx2', './output/20240822_i9/rsa_192_sha256', './output/20240822_i7/dilithium3_sha256_avx2', './output/20240822_i7/sphincs192_sha256_avx2', './output/20240822_i7/rsa_128_sha256'], 'deprecated/TM_VF_192bit_security_level_sha256.png', 'Security Level 3 with SHA-256',10,6],
-    [['./output/20240822_i9/dilithium5_sha256_avx2', './output/20240822_i9/falcon5_avx2_sha256', './output/20240822_i9/sphincs256_sha256_avx2', './output/20240822_i9/rsa_256_sha256', './output/20240822_i7/dilithium5_sha256_avx2', './output/20240822_i7/falcon5_avx2_sha256', './output/20240822_i7/sphincs256_sha256_avx2', './output/20240822_i7/rsa_256_sha256'], 'deprecated/TM_VF_256bit_security_level_sha256.png', 'Security Level 5 with SHA-256',10,6],
-    # DIFFERENT SECURITY LEVELS WITH SHA-512
-    [['./output/20240822_i9/dilithium2_sha512_avx2', './output/20240822_i9/falcon2_avx2_sha512', './output/20240822_i9/sphincs128_sha512_avx2', './output/20240822_i9/rsa_128_sha512', './output/20240822_i7/dilithium2_sha512_avx2', './output/20240822_i7/falcon2_avx2_sha512', './output/20240822_i7/sphincs128_sha512_avx2', './output/20240822_i7/rsa_112_sha512'], 'deprecated/TM_VF_128bit_security_level_sha512.png', 'Security Level 1 & 2 with SHA-512',10,6],
-    [['./output/20240822_i9/dilithium3_sha512_avx2', './output/20240822_i9/sphincs192_sha512_avx2', './output/20240822_i9/rsa_192_sha512', './output/20240822_i7/dilithium3_sha512_avx2', './output/20240822_i7/sphincs192_sha512_avx2', './output/20240822_i7/rsa_128_sha512'], 'deprecated/TM_VF_192bit_security_level_sha512.png', 'Security Level 3 with SHA-512',10,6],
-    [['./output/20240822_i9/dilithium5_sha512_avx2', './output/20240822_i9/falcon5_avx2_sha512', './output/20240822_i9/sphincs256_sha512_avx2', './output/20240822_i9/rsa_256_sha512', './output/20240822_i7/dilithium5_sha512_avx2', './output/20240822_i7/falcon5_avx2_sha512', './output/20240822_i7/sphincs256_sha512_avx2', './output/20240822_i7/rsa_256_sha512'], 'deprecated/TM_VF_256bit_security_level_sha512.png', 'Security Level 5 with SHA-512',10,6],
-]
-
-# Aggiungi una progress bar
-with tqdm(total=len(file_groups), desc="Generating Verify Time Plots", unit="plot") as pbar:
-    for file_paths in file_groups:
-        # Lettura del gruppo di files
-        df_all = read_multiple_files(file_paths[0])
-        # Applicazione del mapping ai nomi degli algoritmi
-        df_all['algorithm'] = df_all['algorithm'].map(algorithm_name_mapping)
-        # Creazione del grafico con simboli diversi per REF e AVX2
-        create_verify_time_plot(df_all, './plot/comparison/Time_Verify/' + file_paths[1], file_paths[2])
+
+
+
 
 
 
@@ -395,7 +270,7 @@ with tqdm(total=len(file_groups), desc="Generating Verify Time Plots", unit="plo
 
 
 # Dizionario per mappare i nomi degli algoritmi ai nuovi nomi
-algorithm_name_mapping = {
+algorithm_name_mapping_histogram = {
     'dilithium2_avx2': 'Dilithium 2',
     'dilithium3_avx2': 'Dilithium 3',
     'dilithium5_avx2': 'Dilithium 5',
@@ -447,8 +322,8 @@ algorithm_name_mapping = {
 ### =========================================================
 
 # Funzione per creare il grafico a barre con il tempo medio di firma
-def create_sign_time_histogram_plot(df_all, output_file, title):
-    plt.figure(figsize=(file_paths[3], file_paths[4]))
+def create_sign_time_histogram_plot(df_all, output_file, title, figsize):
+    plt.figure(figsize=figsize)
     
     # Calcola il tempo medio di firma per ogni combinazione di algoritmo e versione
     avg_sign_times = df_all.groupby(['algorithm', 'device'])['sign_time'].mean().reset_index()
@@ -468,41 +343,11 @@ def create_sign_time_histogram_plot(df_all, output_file, title):
     plt.yscale('log')
     save_or_show_plot(output_file)
     plt.close()
-    # Aggiorna la progress bar
-    pbar.update(1)
-
-# Gruppi di file da confrontare + nome di salvataggio grafo
-file_groups = [ # WITH SHA-256
-    [['./output/20240822_i9/dilithium2_sha256_avx2', './output/20240822_i9/dilithium3_sha256_avx2', './output/20240822_i9/dilithium5_sha256_avx2', './output/20240822_i7/dilithium2_sha256_avx2', './output/20240822_i7/dilithium3_sha256_avx2', './output/20240822_i7/dilithium5_sha256_avx2'], 'TM_SG_H_dilithium_sha256.png', 'Dilithium Versions SHA-256',9,3],
-    [['./output/20240822_i9/falcon2_avx2_sha256', './output/20240822_i9/falcon5_avx2_sha256', './output/20240822_i7/falcon2_avx2_sha256', './output/20240822_i7/falcon5_avx2_sha256'], 'TM_SG_H_falcon_sha256.png', 'Falcon Versions with SHA-256',9,3],
-    [['./output/20240822_i9/sphincs128_sha256_avx2', './output/20240822_i9/sphincs192_sha256_avx2', './output/20240822_i9/sphincs256_sha256_avx2', './output/20240822_i7/sphincs128_sha256_avx2', './output/20240822_i7/sphincs192_sha256_avx2', './output/20240822_i7/sphincs256_sha256_avx2'], 'TM_SG_H_sphincs_sha256.png', 'Sphincs+ Versions SHA-256',9,3],
-    [['./output/20240822_i9/rsa_80_sha256', './output/20240822_i9/rsa_112_sha256',  './output/20240822_i9/rsa_128_sha256', './output/20240822_i9/rsa_192_sha256', './output/20240822_i9/rsa_256_sha256', './output/20240822_i7/rsa_80_sha256',    './output/20240822_i7/rsa_112_sha256',  './output/20240822_i7/rsa_128_sha256', './output/20240822_i7/rsa_192_sha256', './output/20240822_i7/rsa_256_sha256'], 'deprecated/TM_SG_rsa_sha256.png', 'RSA Versions SHA-256',9,3],
-    # WITH SHA-512
-    [['./output/20240822_i9/dilithium2_sha512_avx2', './output/20240822_i9/dilithium3_sha512_avx2', './output/20240822_i9/dilithium5_sha512_avx2', './output/20240822_i7/dilithium2_sha512_avx2', './output/20240822_i7/dilithium3_sha512_avx2', './output/20240822_i7/dilithium5_sha512_avx2'], 'TM_SG_H_dilithium_sha512.png', 'Dilithium Versions SHA-512',9,3],
-    [['./output/20240822_i9/falcon2_avx2_sha512', './output/20240822_i9/falcon5_avx2_sha512', './output/20240822_i7/falcon2_avx2_sha512', './output/20240822_i7/falcon5_avx2_sha512'], 'TM_SG_H_falcon_sha512.png', 'Falcon Versions with SHA-512',9,3],
-    [['./output/20240822_i9/sphincs128_sha512_avx2', './output/20240822_i9/sphincs192_sha512_avx2', './output/20240822_i9/sphincs256_sha512_avx2', './output/20240822_i7/sphincs128_sha512_avx2', './output/20240822_i7/sphincs192_sha512_avx2', './output/20240822_i7/sphincs256_sha512_avx2'], 'TM_SG_H_sphincs_sha512.png', 'Sphincs+ Versions SHA-512',9,3],
-    [['./output/20240822_i9/rsa_80_sha512', './output/20240822_i9/rsa_112_sha512',  './output/20240822_i9/rsa_128_sha512', './output/20240822_i9/rsa_192_sha512', './output/20240822_i9/rsa_256_sha512', './output/20240822_i7/rsa_80_sha512', './output/20240822_i7/rsa_112_sha512',  './output/20240822_i7/rsa_128_sha512', './output/20240822_i7/rsa_192_sha512', './output/20240822_i7/rsa_256_sha512'], 'deprecated/TM_SG_rsa_sha512.png', 'RSA Versions SHA-512',9,3],
-    # DIFFERENT SECURITY LEVELS WITH SHA-256
-    [['./output/20240822_i9/dilithium2_sha256_avx2', './output/20240822_i9/falcon2_avx2_sha256', './output/20240822_i9/sphincs128_sha256_avx2', './output/20240822_i9/rsa_112_sha256', './output/20240822_i7/dilithium2_sha256_avx2', './output/20240822_i7/falcon2_avx2_sha256', './output/20240822_i7/sphincs128_sha256_avx2', './output/20240822_i7/rsa_112_sha256'], 'TM_SG_H_128bit_security_level_sha256.png', 'Security Level 1 & 2 SHA-256',9,3],
-    [['./output/20240822_i9/dilithium3_sha256_avx2', './output/20240822_i9/sphincs192_sha256_avx2', './output/20240822_i9/rsa_128_sha256', './output/20240822_i7/dilithium3_sha256_avx2', './output/20240822_i7/sphincs192_sha256_avx2', './output/20240822_i7/rsa_128_sha256'], 'TM_SG_H_192bit_security_level_sha256.png', 'Security Level 3 SHA-256',9,3],
-    [['./output/20240822_i9/dilithium5_sha256_avx2', './output/20240822_i9/falcon5_avx2_sha256', './output/20240822_i9/sphincs256_sha256_avx2', './output/20240822_i9/rsa_256_sha256', './output/20240822_i7/dilithium5_sha256_avx2', './output/20240822_i7/falcon5_avx2_sha256', './output/20240822_i7/sphincs256_sha256_avx2', './output/20240822_i7/rsa_256_sha256'], 'TM_SG_H_256bit_security_level_sha256.png', 'Security Level 5 SHA-256',9,3],
-    # DIFFERENT SECURITY LEVELS WITH SHA-512
-    [['./output/20240822_i9/dilithium2_sha512_avx2', './output/20240822_i9/falcon2_avx2_sha512', './output/20240822_i9/sphincs128_sha512_avx2', './output/20240822_i9/rsa_112_sha512', './output/20240822_i7/dilithium2_sha512_avx2', './output/20240822_i7/falcon2_avx2_sha512', './output/20240822_i7/sphincs128_sha512_avx2', './output/20240822_i7/rsa_112_sha512'], 'TM_SG_H_128bit_security_level_sha512.png', 'Security Level 1 & 2 SHA-512',9,3],
-    [['./output/20240822_i9/dilithium3_sha512_avx2', './output/20240822_i9/sphincs192_sha512_avx2', './output/20240822_i9/rsa_128_sha512', './output/20240822_i7/dilithium3_sha512_avx2', './output/20240822_i7/sphincs192_sha512_avx2', './output/20240822_i7/rsa_128_sha512'], 'TM_SG_H_192bit_security_level_sha512.png', 'Security Level 3 SHA-512',9,3],
-    [['./output/20240822_i9/dilithium5_sha512_avx2', './output/20240822_i9/falcon5_avx2_sha512', './output/20240822_i9/sphincs256_sha512_avx2', './output/20240822_i9/rsa_256_sha512', './output/20240822_i7/dilithium5_sha512_avx2', './output/20240822_i7/falcon5_avx2_sha512', './output/20240822_i7/sphincs256_sha512_avx2', './output/20240822_i7/rsa_256_sha512'], 'TM_SG_H_256bit_security_level_sha512.png', 'Security Level 5 SHA-512',9,3]
-]
-
-
-
-# Aggiungi una progress bar
-with tqdm(total=len(file_groups), desc="Generating Sign Time H-Plots", unit="plot") as pbar:
-    for file_paths in file_groups:
-        # Lettura del gruppo di files
-        df_all = read_multiple_files(file_paths[0])
-        # Applicazione del mapping ai nomi degli algoritmi
-        df_all['algorithm'] = df_all['algorithm'].map(algorithm_name_mapping)
-        # Creazione del grafico con simboli diversi per REF e AVX2
-        create_sign_time_histogram_plot(df_all, './plot/comparison/Time_Sign/' + file_paths[1], file_paths[2])
+
+
+
+
+
 
 
 ### ============================================================
@@ -510,8 +355,8 @@ with tqdm(total=len(file_groups), desc="Generating Sign Time H-Plots", unit="plo
 ### ============================================================
 
 # Funzione per creare il grafico a barre con il tempo medio di firma
-def create_verify_time_histogram_plot(df_all, output_file, title):
-    plt.figure(figsize=(file_paths[3], file_paths[4]))
+def create_verify_time_histogram_plot(df_all, output_file, title, figsize):
+    plt.figure(figsize=figsize)
     
     # Calcola il tempo medio di firma per ogni combinazione di algoritmo e versione
     avg_verify_times = df_all.groupby(['algorithm', 'device'])['verify_time'].mean().reset_index()
@@ -531,36 +376,69 @@ def create_verify_time_histogram_plot(df_all, output_file, title):
     plt.yscale('log')
     save_or_show_plot(output_file)
     plt.close()
-    # Aggiorna la progress bar
-    pbar.update(1)
-
-# Gruppi di file da confrontare + nome di salvataggio grafo
-file_groups = [ # WITH SHA-256
-    [['./output/20240822_i9/dilithium2_sha256_avx2', './output/20240822_i9/dilithium3_sha256_avx2', './output/20240822_i9/dilithium5_sha256_avx2', './output/20240822_i7/dilithium2_sha256_avx2', './output/20240822_i7/dilithium3_sha256_avx2', './output/20240822_i7/dilithium5_sha256_avx2'], 'TM_VF_H_dilithium_sha256.png', 'Dilithium Versions SHA-256',9,3],
-    [['./output/20240822_i9/falcon2_avx2_sha256', './output/20240822_i9/falcon5_avx2_sha256', './output/20240822_i7/falcon2_avx2_sha256', './output/20240822_i7/falcon5_avx2_sha256'], 'TM_VF_H_falcon_sha256.png', 'Falcon Versions with SHA-256',9,3],
-    [['./output/20240822_i9/sphincs128_sha256_avx2', './output/20240822_i9/sphincs192_sha256_avx2', './output/20240822_i9/sphincs256_sha256_avx2', './output/20240822_i7/sphincs128_sha256_avx2', './output/20240822_i7/sphincs192_sha256_avx2', './output/20240822_i7/sphincs256_sha256_avx2'], 'TM_VF_H_sphincs_sha256.png', 'Sphincs+ Versions SHA-256',9,3],
-    [['./output/20240822_i9/rsa_80_sha256', './output/20240822_i9/rsa_112_sha256',  './output/20240822_i9/rsa_128_sha256', './output/20240822_i9/rsa_192_sha256', './output/20240822_i9/rsa_256_sha256', './output/20240822_i7/rsa_80_sha256',    './output/20240822_i7/rsa_112_sha256',  './output/20240822_i7/rsa_128_sha256', './output/20240822_i7/rsa_192_sha256', './output/20240822_i7/rsa_256_sha256'], 'deprecated/TM_VF_rsa_sha256.png', 'RSA Versions SHA-256',9,3],
-    # WITH SHA-512
-    [['./output/20240822_i9/dilithium2_sha512_avx2', './output/20240822_i9/dilithium3_sha512_avx2', './output/20240822_i9/dilithium5_sha512_avx2', './output/20240822_i7/dilithium2_sha512_avx2', './output/20240822_i7/dilithium3_sha512_avx2', './output/20240822_i7/dilithium5_sha512_avx2'], 'TM_VF_H_dilithium_sha512.png', 'Dilithium Versions SHA-512',9,3],
-    [['./output/20240822_i9/falcon2_avx2_sha512', './output/20240822_i9/falcon5_avx2_sha512', './output/20240822_i7/falcon2_avx2_sha512', './output/20240822_i7/falcon5_avx2_sha512'], 'TM_VF_H_falcon_sha512.png', 'Falcon Versions with SHA-512',9,3],
-    [['./output/20240822_i9/sphincs128_sha512_avx2', './output/20240822_i9/sphincs192_sha512_avx2', './output/20240822_i9/sphincs256_sha512_avx2', './output/20240822_i7/sphincs128_sha512_avx2', './output/20240822_i7/sphincs192_sha512_avx2', './output/20240822_i7/sphincs256_sha512_avx2'], 'TM_VF_H_sphincs_sha512.png', 'Sphincs+ Versions SHA-512',9,3],
-    [['./output/20240822_i9/rsa_80_sha512', './output/20240822_i9/rsa_112_sha512',  './output/20240822_i9/rsa_128_sha512', './output/20240822_i9/rsa_192_sha512', './output/20240822_i9/rsa_256_sha512', './output/20240822_i7/rsa_80_sha512', './output/20240822_i7/rsa_112_sha512',  './output/20240822_i7/rsa_128_sha512', './output/20240822_i7/rsa_192_sha512', './output/20240822_i7/rsa_256_sha512'], 'deprecated/TM_VF_rsa_sha512.png', 'RSA Versions SHA-512',9,3],
-    # DIFFERENT SECURITY LEVELS WITH SHA-256
-    [['./output/20240822_i9/dilithium2_sha256_avx2', './output/20240822_i9/falcon2_avx2_sha256', './output/20240822_i9/sphincs128_sha256_avx2', './output/20240822_i9/rsa_112_sha256', './output/20240822_i7/dilithium2_sha256_avx2', './output/20240822_i7/falcon2_avx2_sha256', './output/20240822_i7/sphincs128_sha256_avx2', './output/20240822_i7/rsa_112_sha256'], 'TM_VF_H_128bit_security_level_sha256.png', 'Security Level 1 & 2 SHA-256',9,3],
-    [['./output/20240822_i9/dilithium3_sha256_avx2', './output/20240822_i9/sphincs192_sha256_avx2', './output/20240822_i9/rsa_128_sha256', './output/20240822_i7/dilithium3_sha256_avx2', './output/20240822_i7/sphincs192_sha256_avx2', './output/20240822_i7/rsa_128_sha256'], 'TM_VF_H_192bit_security_level_sha256.png', 'Security Level 3 SHA-256',9,3],
-    [['./output/20240822_i9/dilithium5_sha256_avx2', './output/20240822_i9/falcon5_avx2_sha256', './output/20240822_i9/sphincs256_sha256_avx2', './output/20240822_i9/rsa_256_sha256', './output/20240822_i7/dilithium5_sha256_avx2', './output/20240822_i7/falcon5_avx2_sha256', './output/20240822_i7/sphincs256_sha256_avx2', './output/20240822_i7/rsa_256_sha256'], 'TM_VF_H_256bit_security_level_sha256.png', 'Security Level 5 SHA-256',9,3],
-    # DIFFERENT SECURITY LEVELS WITH SHA-512
-    [['./output/20240822_i9/dilithium2_sha512_avx2', './output/20240822_i9/falcon2_avx2_sha512', './output/20240822_i9/sphincs128_sha512_avx2', './output/20240822_i9/rsa_112_sha512', './output/20240822_i7/dilithium2_sha512_avx2', './output/20240822_i7/falcon2_avx2_sha512', './output/20240822_i7/sphincs128_sha512_avx2', './output/20240822_i7/rsa_112_sha512'], 'TM_VF_H_128bit_security_level_sha512.png', 'Security Level 1 & 2 SHA-512',9,3],
-    [['./output/20240822_i9/dilithium3_sha512_avx2', './output/20240822_i9/sphincs192_sha512_avx2', './output/20240822_i9/rsa_128_sha512', './output/20240822_i7/dilithium3_sha512_avx2', './output/20240822_i7/sphincs192_sha512_avx2', './output/20240822_i7/rsa_128_sha512'], 'TM_VF_H_192bit_security_level_sha512.png', 'Security Level 3 SHA-512',9,3],
-    [['./output/20240822_i9/dilithium5_sha512_avx2', './output/20240822_i9/falcon5_avx2_sha512', './output/20240822_i9/sphincs256_sha512_avx2', './output/20240822_i9/rsa_256_sha512', './output/20240822_i7/dilithium5_sha512_avx2', './output/20240822_i7/falcon5_avx2_sha512', './output/20240822_i7/sphincs256_sha512_avx2', './output/20240822_i7/rsa_256_sha512'], 'TM_VF_H_256bit_security_level_sha512.png', 'Security Level 5 SHA-512',9,3]
-]
-
-# Aggiungi una progress bar
-with tqdm(total=len(file_groups), desc="Generating Verify Time H-Plots", unit="plot") as pbar:
-    for file_paths in file_groups:
-        # Lettura del gruppo di files
-        df_all = read_multiple_files(file_paths[0])
-        # Applicazione del mapping ai nomi degli algoritmi
-        df_all['algorithm'] = df_all['algorithm'].map(algorithm_name_mapping)
-        # Creazione del grafico con simboli diversi per REF e AVX2
-        create_verify_time_histogram_plot(df_all, './plot/comparison/Time_Verify/' + file_paths[1], file_paths[2])
\ No newline at end of file
+
+
+
+
+### ================================================
+### ========= RENDERING PARALLELO DEI GRAFICI =======
+### ================================================
+
+# Funzioni di disegno per ogni tipo di grafico dichiarato nel manifest
+plot_functions = {
+    'keygen_time': create_keygen_time_histogram,
+    'sign_time': create_sign_time_plot,
+    'verify_time': create_verify_time_plot,
+    'sign_time_histogram': create_sign_time_histogram_plot,
+    'verify_time_histogram': create_verify_time_histogram_plot
+}
+
+# Mapping dei nomi degli algoritmi utilizzabili dai tipi di grafico del manifest
+name_mappings = {
+    'default': algorithm_name_mapping,
+    'time': algorithm_name_mapping_time,
+    'histogram': algorithm_name_mapping_histogram
+}
+
+# Gruppi di file da confrontare, nomi e dimensioni dei grafici: vedi plot_manifest.json
+manifest = plot_engine.load_manifest('comparison')
+
+# File con lo stato della build incrementale: grafico -> impronta dei suoi input
+BUILD_STATE_FILE = './plot/comparison/.build_state.json'
+
+# Funzione eseguita da ogni job (nel processo principale o in un worker)
+# I dati non vengono passati al worker: vengono letti dalla cache su disco di result_store
+def render_job(job):
+    kind, file_paths = job
+    plot_kind = manifest['plot_kinds'][kind]
+    # Lettura del gruppo di files
+    df_all = read_multiple_files(file_paths[0])
+    # Applicazione del mapping ai nomi degli algoritmi
+    df_all['algorithm'] = df_all['algorithm'].map(name_mappings[plot_kind['name_mapping']])
+    # Creazione del grafico
+    output_file = plot_kind['output_dir'] + file_paths[1]
+    plot_functions[kind](df_all, output_file, file_paths[2], (file_paths[3], file_paths[4]))
+    return output_file
+
+# Funzione per descrivere un job: percorso del grafico e parametri che ne determinano il contenuto
+def describe_job(job):
+    kind, file_paths = job
+    plot_kind = manifest['plot_kinds'][kind]
+    params = {
+        'kind': kind,
+        'output_dir': plot_kind['output_dir'],
+        'name_mapping': name_mappings[plot_kind['name_mapping']],
+        'rcparams': {'font.size': plt.rcParams['font.size']}
+    }
+    return plot_kind['output_dir'] + file_paths[1], params
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generazione dei grafici di comparazione tra dispositivi')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='numero di processi per il rendering (1 = seriale)')
+    parser.add_argument('-f', '--force', action='store_true', help='rigenera tutti i grafici, anche quelli i cui input non sono cambiati')
+    parser.add_argument('-k', '--kind', action='append', choices=sorted(plot_functions), help='genera solo i grafici del tipo indicato (ripetibile)')
+    args = parser.parse_args()
+
+    jobs = plot_engine.build_jobs(manifest, args.kind)
+    plot_engine.render_all(jobs, render_job, describe_job, BUILD_STATE_FILE, os.path.abspath(__file__),
+                           workers=args.jobs, incremental=not args.force, show_plots=SHOW_PLOTS)
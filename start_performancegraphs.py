@@ -2,31 +2,26 @@
 # Data: 2024/07/13 18:00
 # Analisi dei dati raccolti dagli algoritmi
 
+import argparse
+import os
+import matplotlib
 import pandas as pd
-import matplotlib.pyplot as plt
 import seaborn as sns
-import os
-from tqdm import tqdm
+import plot_engine
+import result_store
 
 # Variabile globale per decidere se mostrare o salvare i grafici
 SHOW_PLOTS = False
 
-# Funzione per leggere i dati dal file
-def read_data(filename):
-    with open(filename, 'r') as file:
-        lines = file.readlines()
-
-    data = []
-    for line in lines:
-        line = line.strip()
-        if line:
-            fields = line.split('|')
-            data.append([int(fields[1]), int(fields[2]), int(fields[3]), int(fields[4]), int(fields[5]), float(fields[6]), float(fields[7]), float(fields[8]), int(fields[9])])
-
-    columns = ['msg_len', 'signed_msg_len', 'pub_key_size', 'priv_key_size', 'signature_size', 'keygen_time', 'sign_time', 'verify_time', 'hash_len']
+# Se i grafici vengono solo salvati si usa il backend Agg (senza finestre), necessario
+# anche per il rendering nei processi worker
+if not SHOW_PLOTS:
+    matplotlib.use('Agg')
+import matplotlib.pyplot as plt
 
-    df = pd.DataFrame(data, columns=columns)
-    return df
+# Funzione per leggere i dati dal file (ogni file viene letto una sola volta, vedi result_store.py)
+def read_data(filename):
+    return result_store.read_data(filename)
 
 # Funzione per salvare o mostrare il grafico
 def save_or_show_plot(filename):
@@ -134,62 +129,39 @@ plot_colors = {
 ### ====== CONFRONTO TRA DIMENSIONI DI CHIAVI ======
 ### ================================================
 
-# Gruppi di file da confrontare + nome di salvataggio grafo
-file_groups = [
-    [['./output/dilithium2_ref', './output/dilithium3_ref', './output/dilithium5_ref'], 'KC_dilithium.png', 'Dilithium Versions',12, 4],
-    [['./output/falcon2_ref', './output/falcon5_ref'], 'KC_falcon.png', 'Falcon Versions',12, 4],
-    [['./output/sphincs128_ref', './output/sphincs192_ref', './output/sphincs256_ref'], 'KC_sphincs.png', 'Sphincs+ Versions',12, 4],
-    [['./output/rsa_80_sha256', './output/rsa_112_sha256', './output/rsa_128_sha256', './output/rsa_192_sha256', './output/rsa_256_sha256'], 'KC_rsa.png', 'RSA Versions',12, 4],
-    [['./output/dilithium2_ref', './output/falcon2_ref', './output/sphincs128_ref', './output/rsa_112_sha256'], 'KC_128bit_security_level.png', 'Security Level 1 & 2',12, 4],
-    [['./output/dilithium3_ref', './output/sphincs192_ref', './output/rsa_128_sha256'], 'KC_192bit_security_level.png', 'Security Level 3',12, 4],
-    [['./output/dilithium5_ref', './output/falcon5_ref', './output/sphincs256_ref', './output/rsa_256_sha256'], 'KC_256bit_security_level.png', 'Security Level 5',12, 4],
-    [['./output/dilithium2_avx2', './liboqs_double_check/risultati_Dilithium2_avx2', './output/dilithium3_avx2', './liboqs_double_check/risultati_Dilithium3_avx2', './output/dilithium5_avx2', './liboqs_double_check/risultati_Dilithium5_avx2'], 'double_check/KC_dilithium.png', 'Dilithium Version - Double Check',12, 4],
-    [['./output/falcon2_avx2', './liboqs_double_check/risultati_Falcon-512_avx2', './output/falcon5_avx2', './liboqs_double_check/risultati_Falcon-1024_avx2'], 'double_check/KC_falcon.png', 'Falcon Version - Double Check',12, 4],
-     [['./output/sphincs128_avx2', './liboqs_double_check/risultati_SPHINCS+-SHA2-128f-simple_avx2', './output/sphincs192_avx2', './liboqs_double_check/risultati_SPHINCS+-SHA2-192f-simple_avx2', './output/sphincs256_avx2', './liboqs_double_check/risultati_SPHINCS+-SHA2-256f-simple_avx2'], 'double_check/KC_sphincs.png', 'Sphincs+ Version - Double Check',12, 4]
-]
-
-# Aggiungi una progress bar
-with tqdm(total=len(file_groups), desc="Generating Key Sizes Plots", unit="plot") as pbar:
-    for file_paths in file_groups:
-        # Lettura del gruppo di files
-        df_all = read_multiple_files(file_paths[0])
-        # Applicazione del mapping ai nomi degli algoritmi
-        df_all['algorithm'] = df_all['algorithm'].map(algorithm_name_mapping)
-        # Calcola le dimensioni medie delle chiavi pubbliche e private per ogni algoritmo
-        avg_key_sizes = df_all.groupby('algorithm')[['pub_key_size', 'priv_key_size']].mean().reset_index()
-        # Trasformazione dei dati per il grafico a barre
-        avg_key_sizes = pd.melt(avg_key_sizes, id_vars=['algorithm'], value_vars=['pub_key_size', 'priv_key_size'],
-                                var_name='Key Type', value_name='Key Size')
-        # Aggiornamento dei nomi dei tipi di chiave per la legenda
-        avg_key_sizes['Key Type'] = avg_key_sizes['Key Type'].replace({
-            'pub_key_size': 'Public Key Size',
-            'priv_key_size': 'Private Key Size'
-        })
-        # Forzare l'ordine degli algoritmi come appare nell'elenco di input
-        avg_key_sizes['algorithm'] = pd.Categorical(avg_key_sizes['algorithm'], 
-                                                    categories=df_all['algorithm'].unique(), 
-                                                    ordered=True)
-        # Creazione del grafico a barre
-        plt.figure(figsize=(file_paths[3], file_paths[4]))
-        sns.barplot(x='algorithm', y='Key Size', hue='Key Type', data=avg_key_sizes, palette=plot_colors)
-        plt.xlabel('Algorithm')
-        plt.ylabel('Key Size (bytes)')
-        plt.title('Key Sizes per Algorithm - ' + file_paths[2])
-        plt.legend(title='Key Type', loc='upper center')
-        plt.grid(True)
-        # Imposta i tick dell'asse Y con intervalli di 256 o 512
-        if int(avg_key_sizes['Key Size'].max()) < 256:
-            plt.yticks(range(0, int(avg_key_sizes['Key Size'].max()) + 128, 64))  # Intervalli di 64
-        elif int(avg_key_sizes['Key Size'].max()) < 4096:
-            plt.yticks(range(0, int(avg_key_sizes['Key Size'].max()) + 512, 256))  # Intervalli di 256
-        else:   
-            plt.yticks(range(0, int(avg_key_sizes['Key Size'].max()) + 512, 512))  # Intervalli di 512
-        save_or_show_plot('./plot/Key_Sizes/' + file_paths[1])
-        plt.close()
-        # Aggiorna la progress bar
-        pbar.update(1)
-
-
+# Funzione per creare il grafico a barre con le dimensioni medie delle chiavi
+def create_key_sizes_plot(df_all, output_file, title, figsize):
+    # Calcola le dimensioni medie delle chiavi pubbliche e private per ogni algoritmo
+    avg_key_sizes = df_all.groupby('algorithm')[['pub_key_size', 'priv_key_size']].mean().reset_index()
+    # Trasformazione dei dati per il grafico a barre
+    avg_key_sizes = pd.melt(avg_key_sizes, id_vars=['algorithm'], value_vars=['pub_key_size', 'priv_key_size'],
+                            var_name='Key Type', value_name='Key Size')
+    # Aggiornamento dei nomi dei tipi di chiave per la legenda
+    avg_key_sizes['Key Type'] = avg_key_sizes['Key Type'].replace({
+        'pub_key_size': 'Public Key Size',
+        'priv_key_size': 'Private Key Size'
+    })
+    # Forzare l'ordine degli algoritmi come appare nell'elenco di input
+    avg_key_sizes['algorithm'] = pd.Categorical(avg_key_sizes['algorithm'], 
+                                                categories=df_all['algorithm'].unique(), 
+                                                ordered=True)
+    # Creazione del grafico a barre
+    plt.figure(figsize=figsize)
+    sns.barplot(x='algorithm', y='Key Size', hue='Key Type', data=avg_key_sizes, palette=plot_colors)
+    plt.xlabel('Algorithm')
+    plt.ylabel('Key Size (bytes)')
+    plt.title('Key Sizes per Algorithm - ' + title)
+    plt.legend(title='Key Type', loc='upper center')
+    plt.grid(True)
+    # Imposta i tick dell'asse Y con intervalli di 256 o 512
+    if int(avg_key_sizes['Key Size'].max()) < 256:
+        plt.yticks(range(0, int(avg_key_sizes['Key Size'].max()) + 128, 64))  # Intervalli di 64
+    elif int(avg_key_sizes['Key Size'].max()) < 4096:
+        plt.yticks(range(0, int(avg_key_sizes['Key Size'].max()) + 512, 256))  # Intervalli di 256
+    else:   
+        plt.yticks(range(0, int(avg_key_sizes['Key Size'].max()) + 512, 512))  # Intervalli di 512
+    save_or_show_plot(output_file)
+    plt.close()
 
 
 ### ================================================
@@ -220,45 +192,21 @@ algorithm_colors = {
     'SPHINCS+ 256\nLIBOQS': '#6666ff'
 }
 
-# Gruppi di file da confrontare + nome di salvataggio grafo
-file_groups = [
-    [['./output/dilithium2_ref', './output/dilithium3_ref', './output/dilithium5_ref'], 'IO_dilithium.png', 'Dilithium Versions',12, 4],
-    [['./output/falcon2_ref', './output/falcon5_ref'], 'KC_falcon.png', 'Falcon Versions',12, 4],
-    [['./output/sphincs128_ref', './output/sphincs192_ref', './output/sphincs256_ref'], 'IO_sphincs.png', 'Sphincs+ Versions',12, 4],
-    [['./output/rsa_80_sha256', './output/rsa_112_sha256', './output/rsa_128_sha256', './output/rsa_192_sha256', './output/rsa_256_sha256'], 'IO_rsa.png', 'RSA Versions',12, 4],
-    [['./output/dilithium2_ref', './output/falcon2_ref', './output/sphincs128_ref', './output/rsa_112_sha256'], 'IO_128bit_security_level.png', 'Security Level 1 & 2',12, 4],
-    [['./output/dilithium3_ref', './output/sphincs192_ref', './output/rsa_128_sha256'], 'IO_192bit_security_level.png', 'Security Level 3',12, 4],
-    [['./output/dilithium5_ref', './output/falcon5_ref', './output/sphincs256_ref', './output/rsa_256_sha256'], 'IO_256bit_security_level.png', 'Security Level 5',12, 4],
-    [['./output/dilithium2_avx2', './liboqs_double_check/risultati_Dilithium2_avx2', './output/dilithium3_avx2', './liboqs_double_check/risultati_Dilithium3_avx2', './output/dilithium5_avx2', './liboqs_double_check/risultati_Dilithium5_avx2'], 'double_check/IO_dilithium.png', 'Dilithium Version - Double Check',12, 4],
-    [['./output/falcon2_avx2', './liboqs_double_check/risultati_Falcon-512_avx2', './output/falcon5_avx2', './liboqs_double_check/risultati_Falcon-1024_avx2'], 'double_check/IO_falcon.png', 'Falcon Version - Double Check',12, 4],
-     [['./output/sphincs128_avx2', './liboqs_double_check/risultati_SPHINCS+-SHA2-128f-simple_avx2', './output/sphincs192_avx2', './liboqs_double_check/risultati_SPHINCS+-SHA2-192f-simple_avx2', './output/sphincs256_avx2', './liboqs_double_check/risultati_SPHINCS+-SHA2-256f-simple_avx2'], 'double_check/IO_sphincs.png', 'Sphincs+ Version - Double Check',12, 4]
-]
-
-# Aggiungi una progress bar
-with tqdm(total=len(file_groups), desc="Generating Signature Size Plots", unit="plot") as pbar:
-    for file_paths in file_groups:
-        # Lettura del gruppo di files
-        df_all = read_multiple_files(file_paths[0])
-        # Applicazione del mapping ai nomi degli algoritmi
-        df_all['algorithm'] = df_all['algorithm'].map(algorithm_name_mapping)
-        # Creazione del grafico a barre
-        plt.figure(figsize=(file_paths[3], file_paths[4]))
-        
-        # Grafico a istogrammi per le dimensioni delle firme
-        sns.barplot(x='algorithm', y='signature_size', hue="algorithm", data=df_all, palette=algorithm_colors)
-        
-        plt.xlabel('Algorithms and Versions')
-        plt.ylabel('Signature Size (bytes)')
-        plt.title('Comparison of Signature Sizes - ' + file_paths[2])
-        plt.yscale('linear')
-        plt.grid(True)
-        
-        save_or_show_plot('./plot/Message_IO/' + file_paths[1])
-        plt.close()
-        # Aggiorna la progress bar
-        pbar.update(1)
-
-
+# Funzione per creare il grafico a barre con le dimensioni delle firme
+def create_signature_size_plot(df_all, output_file, title, figsize):
+    plt.figure(figsize=figsize)
+    
+    # Grafico a istogrammi per le dimensioni delle firme
+    sns.barplot(x='algorithm', y='signature_size', hue="algorithm", data=df_all, palette=algorithm_colors)
+    
+    plt.xlabel('Algorithms and Versions')
+    plt.ylabel('Signature Size (bytes)')
+    plt.title('Comparison of Signature Sizes - ' + title)
+    plt.yscale('linear')
+    plt.grid(True)
+    
+    save_or_show_plot(output_file)
+    plt.close()
 
 
 ### ================================================
@@ -266,8 +214,8 @@ with tqdm(total=len(file_groups), desc="Generating Signature Size Plots", unit="
 ### ================================================
 
 # Funzione per creare il grafico con la media dei tempi di keygen
-def create_keygen_time_histogram(df_all, output_file, title):
-    plt.figure(figsize=(file_paths[3], file_paths[4]))
+def create_keygen_time_histogram(df_all, output_file, title, figsize):
+    plt.figure(figsize=figsize)
 
     # Calcola la media dei tempi di keygen per ogni algoritmo e versione
     df_mean_keygen_time = df_all.groupby(['algorithm', 'version'])['keygen_time'].mean().reset_index()
@@ -288,39 +236,15 @@ def create_keygen_time_histogram(df_all, output_file, title):
     
     save_or_show_plot(output_file)
     plt.close()
-    # Aggiorna la progress bar
-    pbar.update(1)
 
-# Gruppi di file da confrontare + nome di salvataggio grafo
-file_groups = [
-    [['./output/dilithium2_ref', './output/dilithium3_ref', './output/dilithium5_ref', './output/dilithium2_avx2', './output/dilithium3_avx2', './output/dilithium5_avx2'], 'TM_KG_dilithium.png', 'Dilithium Versions',12,7],
-    [['./output/falcon2_ref', './output/falcon5_ref', './output/falcon2_avx2', './output/falcon5_avx2'], 'TM_KG_falcon.png', 'Falcon Versions',12,7],
-    [['./output/sphincs128_ref', './output/sphincs192_ref', './output/sphincs256_ref', './output/sphincs128_avx2', './output/sphincs192_avx2', './output/sphincs256_avx2'], 'TM_KG_sphincs.png', 'Sphincs+ Versions',12,7],
-    [['./output/rsa_80_sha256', './output/rsa_112_sha256', './output/rsa_128_sha256', './output/rsa_192_sha256', './output/rsa_256_sha256'], 'TM_KG_rsa.png', 'RSA Versions',12,4],
-    [['./output/dilithium2_ref', './output/falcon2_ref', './output/sphincs128_ref', './output/dilithium2_avx2', './output/falcon2_avx2', './output/sphincs128_avx2', './output/rsa_112_sha256'], 'TM_KG_128bit_security_level.png', 'Security Level 1 & 2',12,7],
-    [['./output/dilithium3_ref', './output/sphincs192_ref', './output/dilithium3_avx2', './output/sphincs192_avx2', './output/rsa_128_sha256'], 'TM_KG_192bit_security_level.png', 'Security Level 3',12,7],
-    [['./output/dilithium5_ref', './output/falcon5_ref', './output/sphincs256_ref', './output/dilithium5_avx2', './output/falcon5_avx2', './output/sphincs256_avx2', './output/rsa_256_sha256'], 'TM_KG_256bit_security_level.png', 'Security Level 5',12,7],
-    [['./output/dilithium2_avx2', './liboqs_double_check/risultati_Dilithium2_avx2', './output/dilithium3_avx2', './liboqs_double_check/risultati_Dilithium3_avx2', './output/dilithium5_avx2', './liboqs_double_check/risultati_Dilithium5_avx2'], 'double_check/TM_KG_dilithium.png', 'Dilithium Version - Double Check',12,4],
-    [['./output/falcon2_avx2', './liboqs_double_check/risultati_Falcon-512_avx2', './output/falcon5_avx2', './liboqs_double_check/risultati_Falcon-1024_avx2'], 'double_check/TM_KG_falcon.png', 'Falcon Version - Double Check',12,4],
-    [['./output/sphincs128_avx2', './liboqs_double_check/risultati_SPHINCS+-SHA2-128f-simple_avx2', './output/sphincs192_avx2', './liboqs_double_check/risultati_SPHINCS+-SHA2-192f-simple_avx2', './output/sphincs256_avx2', './liboqs_double_check/risultati_SPHINCS+-SHA2-256f-simple_avx2'], 'double_check/TM_KG_sphincs.png', 'Sphincs+ Version - Double Check',12,4]
-]
 
-# Aggiungi una progress bar
-with tqdm(total=len(file_groups), desc="Generating KeyGen Time Plots", unit="plot") as pbar:
-    for file_paths in file_groups:
-        # Lettura del gruppo di files
-        df_all = read_multiple_files(file_paths[0])
-        # Applicazione del mapping ai nomi degli algoritmi
-        df_all['algorithm'] = df_all['algorithm'].map(algorithm_name_mapping)
-        # Creazione del grafico con la media dei tempi di keygen
-        create_keygen_time_histogram(df_all, './plot/Time_Keygen/' + file_paths[1], file_paths[2])
 
 
 
 
 
 # Dizionario per mappare i nomi degli algoritmi ai nuovi nomi
-algorithm_name_mapping = {
+algorithm_name_mapping_time = {
     'dilithium2_ref': 'Dilithium 2',
     'dilithium3_ref': 'Dilithium 3',
     'dilithium5_ref': 'Dilithium 5',
@@ -398,8 +322,8 @@ algorithm_name_mapping = {
 ### ================================================
 
 # Funzione per creare il grafico con simboli diversi per REF e AVX2
-def create_sign_time_plot(df_all, output_file, title):
-    plt.figure(figsize=(file_paths[3], file_paths[4]))
+def create_sign_time_plot(df_all, output_file, title, figsize):
+    plt.figure(figsize=figsize)
     
     # Definisci la palette di colori per gli algoritmi
     palette = sns.color_palette("tab10", n_colors=len(df_all['algorithm'].unique()))
@@ -424,64 +348,9 @@ def create_sign_time_plot(df_all, output_file, title):
     plt.yscale('log')
     save_or_show_plot(output_file)
     plt.close()
-    # Aggiorna la progress bar
-    pbar.update(1)
-
-# Gruppi di file da confrontare + nome di salvataggio grafo
-file_groups = [# NORMAL VERSIONS
-    [['./output/dilithium2_ref', './output/dilithium3_ref', './output/dilithium5_ref', './output/dilithium2_avx2', './output/dilithium3_avx2', './output/dilithium5_avx2'], 'TM_SG_dilithium.png', 'Dilithium Versions',10,6],
-    [['./output/falcon2_ref', './output/falcon5_ref', './output/falcon2_avx2', './output/falcon5_avx2'], 'TM_SG_falcon.png', 'Falcon Versions',10,6],
-    [['./output/sphincs128_ref', './output/sphincs192_ref', './output/sphincs256_ref', './output/sphincs128_avx2', './output/sphincs192_avx2', './output/sphincs256_avx2'], 'TM_SG_sphincs.png', 'Sphincs+ Versions',10,6],
-    [['./output/rsa_80_sha256', './output/rsa_80_sha512', './output/rsa_112_sha256',  './output/rsa_112_sha512', './output/rsa_128_sha256', './output/rsa_128_sha512', './output/rsa_192_sha256', './output/rsa_192_sha512', './output/rsa_256_sha256', './output/rsa_256_sha512'], 'TM_SG_rsa.png', 'RSA Versions',10,6],
-    # WITH SHA-256
-    [['./output/dilithium2_sha256_ref', './output/dilithium3_sha256_ref', './output/dilithium5_sha256_ref', './output/dilithium2_sha256_avx2', './output/dilithium3_sha256_avx2', './output/dilithium5_sha256_avx2'], 'deprecated/TM_SG_dilithium_sha256.png', 'Dilithium Versions with SHA-256',10,6],
-    [['./output/falcon2_ref_sha256', './output/falcon5_ref_sha256', './output/falcon2_avx2_sha256', './output/falcon5_avx2_sha256'], 'deprecated/TM_SG_falcon_sha256.png', 'Falcon Versions with SHA-256',10,6],
-    [['./output/sphincs128_sha256_ref', './output/sphincs192_sha256_ref', './output/sphincs256_sha256_ref', './output/sphincs128_sha256_avx2', './output/sphincs192_sha256_avx2', './output/sphincs256_sha256_avx2'], 'deprecated/TM_SG_sphincs_sha256.png', 'Sphincs+ Versions with SHA-256',10,6],
-    [['./output/rsa_80_sha256', './output/rsa_112_sha256', './output/rsa_128_sha256', './output/rsa_192_sha256', './output/rsa_256_sha256'], 'deprecated/TM_SG_rsa_sha256.png', 'RSA Versions with SHA-256',10,6],
-    # WITH SHA-512
-    [['./output/dilithium2_sha512_ref', './output/dilithium3_sha512_ref', './output/dilithium5_sha512_ref', './output/dilithium2_sha512_avx2', './output/dilithium3_sha512_avx2', './output/dilithium5_sha512_avx2'], 'deprecated/TM_SG_dilithium_sha512.png', 'Dilithium Versions with SHA-512',10,6],
-    [['./output/falcon2_ref_sha512', './output/falcon5_ref_sha512', './output/falcon2_avx2_sha512', './output/falcon5_avx2_sha512'], 'deprecated/TM_SG_falcon_sha512.png', 'Falcon Versions with SHA-512',10,6],
-    [['./output/sphincs128_sha512_ref', './output/sphincs192_sha512_ref', './output/sphincs256_sha512_ref', './output/sphincs128_sha512_avx2', './output/sphincs192_sha512_avx2', './output/sphincs256_sha512_avx2'], 'deprecated/TM_SG_sphincs_sha512.png', 'Sphincs+ Versions with SHA-512',10,6],
-    [['./output/rsa_80_sha512', './output/rsa_112_sha512', './output/rsa_128_sha512', './output/rsa_192_sha512', './output/rsa_256_sha512'], 'deprecated/TM_SG_rsa_sha512.png', 'RSA Versions with SHA-512',10,6],
-    # ONLY DILITHIUM 2,3,5
-    [['./output/dilithium2_ref', './output/dilithium2_sha256_ref', './output/dilithium2_sha512_ref', './output/dilithium2_avx2', './output/dilithium2_sha256_avx2', './output/dilithium2_sha512_avx2'], 'TM_SG_dilithium_2_All.png', 'Dilithium 2 Versions vs SHA',10,6],
-    [['./output/dilithium3_ref', './output/dilithium3_sha256_ref', './output/dilithium3_sha512_ref', './output/dilithium3_avx2', './output/dilithium3_sha256_avx2', './output/dilithium3_sha512_avx2'], 'TM_SG_dilithium_3_All.png', 'Dilithium 3 Versions vs SHA',10,6],
-    [['./output/dilithium5_ref', './output/dilithium5_sha256_ref', './output/dilithium5_sha512_ref', './output/dilithium5_avx2', './output/dilithium5_sha256_avx2', './output/dilithium5_sha512_avx2'], 'TM_SG_dilithium_5_All.png', 'Dilithium 5 Versions vs SHA',10,6],
-    # ONLY FALCON 512 and 1024
-    [['./output/falcon2_ref', './output/falcon2_ref_sha256', './output/falcon2_ref_sha512', './output/falcon2_avx2', './output/falcon2_avx2_sha256', './output/falcon2_avx2_sha512'], 'TM_SG_falcon_2_All.png', 'Falcon 2 Versions vs SHA',10,6],
-    [['./output/falcon5_ref', './output/falcon5_ref_sha256', './output/falcon5_ref_sha512', './output/falcon5_avx2', './output/falcon5_avx2_sha256', './output/falcon5_avx2_sha512'], 'TM_SG_falcon_5_All.png', 'Falcon 5 Versions vs SHA',10,6],
-    # ONLY SPHINCS+ 128,192,256
-    [['./output/sphincs128_ref', './output/sphincs128_sha256_ref', './output/sphincs128_sha512_ref', './output/sphincs128_avx2', './output/sphincs128_sha256_avx2', './output/sphincs128_sha512_avx2'], 'TM_SG_sphincs_128_All.png', 'SPHINCS+ 128 Versions vs SHA',10,6],
-    [['./output/sphincs192_ref', './output/sphincs192_sha256_ref', './output/sphincs192_sha512_ref', './output/sphincs192_avx2', './output/sphincs192_sha256_avx2', './output/sphincs192_sha512_avx2'], 'TM_SG_sphincs_192_All.png', 'SPHINCS+ 192 Versions vs SHA',10,6],
-    [['./output/sphincs256_ref', './output/sphincs256_sha256_ref', './output/sphincs256_sha512_ref', './output/sphincs256_avx2', './output/sphincs256_sha256_avx2', './output/sphincs256_sha512_avx2'], 'TM_SG_sphincs_256_All.png', 'SPHINCS+ 256 Versions vs SHA',10,6],
-    # DIFFERENT SECURITY LEVELS WITH NO SHA
-    [['./output/dilithium2_ref', './output/falcon2_ref', './output/sphincs128_ref', './output/dilithium2_avx2', './output/falcon2_avx2', './output/sphincs128_avx2'], 'TM_SG_128bit_security_level.png', 'Security Level 1 & 2',10,6],
-    [['./output/dilithium3_ref', './output/sphincs192_ref', './output/dilithium3_avx2', './output/sphincs192_avx2'], 'TM_SG_192bit_security_level.png', 'Security Level 3',10,6],
-    [['./output/dilithium5_ref', './output/falcon5_ref', './output/sphincs256_ref', './output/dilithium5_avx2', './output/falcon5_avx2', './output/sphincs256_avx2'], 'TM_SG_256bit_security_level.png', 'Security Level 5',10,6],
-    # DIFFERENT SECURITY LEVELS WITH SHA-256
-    [['./output/dilithium2_sha256_ref', './output/falcon2_ref_sha256', './output/sphincs128_sha256_ref', './output/dilithium2_sha256_avx2', './output/falcon2_avx2_sha256', './output/sphincs128_sha256_avx2', './output/rsa_112_sha256'], 'deprecated/TM_SG_128bit_security_level_sha256.png', 'Security Level 1 & 2 with SHA-256',10,6],
-    [['./output/dilithium3_sha256_ref', './output/sphincs192_sha256_ref', './output/dilithium3_sha256_avx2', './output/sphincs192_sha256_avx2', './output/rsa_128_sha256'], 'deprecated/TM_SG_192bit_security_level_sha256.png', 'Security Level 3 with SHA-256',10,6],
-    [['./output/dilithium5_sha256_ref', './output/falcon5_ref_sha256', './output/sphincs256_sha256_ref', './output/dilithium5_sha256_avx2', './output/falcon5_avx2_sha256', './output/sphincs256_sha256_avx2', './output/rsa_256_sha256'], 'deprecated/TM_SG_256bit_security_level_sha256.png', 'Security Level 5 with SHA-256',10,6],
-    # DIFFERENT SECURITY LEVELS WITH SHA-512
-    [['./output/dilithium2_sha512_ref', './output/falcon2_ref_sha512', './output/sphincs128_sha512_ref', './output/dilithium2_sha512_avx2', './output/falcon2_avx2_sha512', './output/sphincs128_sha512_avx2', './output/rsa_112_sha512'], 'deprecated/TM_SG_128bit_security_level_sha512.png', 'Security Level 1 & 2 with SHA-512',10,6],
-    [['./output/dilithium3_sha512_ref', './output/sphincs192_sha512_ref', './output/dilithium3_sha512_avx2', './output/sphincs192_sha512_avx2', './output/rsa_128_sha512'], 'deprecated/TM_SG_192bit_security_level_sha512.png', 'Security Level 3 with SHA-512',10,6],
-    [['./output/dilithium5_sha512_ref', './output/falcon5_ref_sha512', './output/sphincs256_sha512_ref', './output/dilithium5_sha512_avx2', './output/falcon5_avx2_sha512', './output/sphincs256_sha512_avx2', './output/rsa_256_sha512'], 'deprecated/TM_SG_256bit_security_level_sha512.png', 'Security Level 5 with SHA-512',10,6],
-    # DOUBLE CHECK
-    [['./output/dilithium2_avx2', './liboqs_double_check/risultati_Dilithium2_avx2', './output/dilithium3_avx2', './liboqs_double_check/risultati_Dilithium3_avx2', './output/dilithium5_avx2', './liboqs_double_check/risultati_Dilithium5_avx2'], 'double_check/TM_SG_dilithium.png', 'Dilithium - Double Check',10,6],
-    [['./output/falcon2_avx2', './liboqs_double_check/risultati_Falcon-512_avx2', './output/falcon5_avx2', './liboqs_double_check/risultati_Falcon-1024_avx2'], 'double_check/TM_SG_falcon.png', 'Falcon - Double Check',10,6],
-    [['./output/sphincs128_avx2', './liboqs_double_check/risultati_SPHINCS+-SHA2-128f-simple_avx2', './output/sphincs192_avx2', './liboqs_double_check/risultati_SPHINCS+-SHA2-192f-simple_avx2', './output/sphincs256_avx2', './liboqs_double_check/risultati_SPHINCS+-SHA2-256f-simple_avx2'], 'double_check/TM_SG_sphincs.png', 'Sphincs+ - Double Check',10,6]
-]
-
-
-# Aggiungi una progress bar
-with tqdm(total=len(file_groups), desc="Generating Sign Time Plots", unit="plot") as pbar:
-    for file_paths in file_groups:
-        # Lettura del gruppo di files
-        df_all = read_multiple_files(file_paths[0])
-        # Applicazione del mapping ai nomi degli algoritmi
-        df_all['algorithm'] = df_all['algorithm'].map(algorithm_name_mapping)
-        # Creazione del grafico con simboli diversi per REF e AVX2
-        create_sign_time_plot(df_all, './plot/Time_Sign/' + file_paths[1], file_paths[2])
+
+
+
 
 
 
@@ -491,8 +360,8 @@ with tqdm(total=len(file_groups), desc="Generating Sign Time Plots", unit="plot"
 ### ================================================
 
 # Funzione per creare il grafico con simboli diversi per REF e AVX2
-def create_verify_time_plot(df_all, output_file, title):
-    plt.figure(figsize=(file_paths[3], file_paths[4]))
+def create_verify_time_plot(df_all, output_file, title, figsize):
+    plt.figure(figsize=figsize)
     
     # Definisci la palette di colori per gli algoritmi
     palette = sns.color_palette("tab10", n_colors=len(df_all['algorithm'].unique()))
@@ -517,70 +386,15 @@ def create_verify_time_plot(df_all, output_file, title):
     plt.yscale('log')
     save_or_show_plot(output_file)
     plt.close()
-    # Aggiorna la progress bar
-    pbar.update(1)
-
-# Gruppi di file da confrontare + nome di salvataggio grafo
-file_groups = [# NORMAL VERSIONS
-    [['./output/dilithium2_ref', './output/dilithium3_ref', './output/dilithium5_ref', './output/dilithium2_avx2', './output/dilithium3_avx2', './output/dilithium5_avx2'], 'TM_VF_dilithium.png', 'Dilithium Versions',10,6],
-    [['./output/falcon2_ref', './output/falcon5_ref', './output/falcon2_avx2', './output/falcon5_avx2'], 'TM_VF_falcon.png', 'Falcon Versions',10,6],
-    [['./output/sphincs128_ref', './output/sphincs192_ref', './output/sphincs256_ref', './output/sphincs128_avx2', './output/sphincs192_avx2', './output/sphincs256_avx2'], 'TM_VF_sphincs.png', 'Sphincs+ Versions',10,6],
-    [['./output/rsa_80_sha256', './output/rsa_80_sha512', './output/rsa_112_sha256',  './output/rsa_112_sha512', './output/rsa_128_sha256', './output/rsa_128_sha512', './output/rsa_192_sha256', './output/rsa_192_sha512', './output/rsa_256_sha256', './output/rsa_256_sha512'], 'TM_VF_rsa.png', 'RSA Versions',10,6],
-    # WITH SHA-256
-    [['./output/dilithium2_sha256_ref', './output/dilithium3_sha256_ref', './output/dilithium5_sha256_ref', './output/dilithium2_sha256_avx2', './output/dilithium3_sha256_avx2', './output/dilithium5_sha256_avx2'], 'deprecated/TM_VF_dilithium_sha256.png', 'Dilithium Versions with SHA-256',10,6],
-    [['./output/falcon2_ref_sha256', './output/falcon5_ref_sha256', './output/falcon2_avx2_sha256', './output/falcon5_avx2_sha256'], 'deprecated/TM_VF_falcon_sha256.png', 'Falcon Versions with SHA-256',10,6],
-    [['./output/sphincs128_sha256_ref', './output/sphincs192_sha256_ref', './output/sphincs256_sha256_ref', './output/sphincs128_sha256_avx2', './output/sphincs192_sha256_avx2', './output/sphincs256_sha256_avx2'], 'deprecated/TM_VF_sphincs_sha256.png', 'Sphincs+ Versions with SHA-256',10,6],
-    [['./output/rsa_80_sha256', './output/rsa_112_sha256', './output/rsa_128_sha256', './output/rsa_192_sha256', './output/rsa_256_sha256'], 'deprecated/TM_VF_rsa_sha256.png', 'RSA Versions with SHA-256',10,6],
-    # WITH SHA-512
-    [['./output/dilithium2_sha512_ref', './output/dilithium3_sha512_ref', './output/dilithium5_sha512_ref', './output/dilithium2_sha512_avx2', './output/dilithium3_sha512_avx2', './output/dilithium5_sha512_avx2'], 'deprecated/TM_VF_dilithium_sha512.png', 'Dilithium Versions with SHA-512',10,6],
-    [['./output/falcon2_ref_sha512', './output/falcon5_ref_sha512', './output/falcon2_avx2_sha512', './output/falcon5_avx2_sha512'], 'deprecated/TM_VF_falcon_sha512.png', 'Falcon Versions with SHA-512',10,6],
-    [['./output/sphincs128_sha512_ref', './output/sphincs192_sha512_ref', './output/sphincs256_sha512_ref', './output/sphincs128_sha512_avx2', './output/sphincs192_sha512_avx2', './output/sphincs256_sha512_avx2'], 'deprecated/TM_VF_sphincs_sha512.png', 'Sphincs+ Versions with SHA-512',10,6],
-    [['./output/rsa_80_sha512', './output/rsa_112_sha512', './output/rsa_128_sha512', './output/rsa_192_sha512', './output/rsa_256_sha512'], 'deprecated/TM_VF_rsa_sha512.png', 'RSA Versions with SHA-512',10,6],
-    # ONLY DILITHIUM 2,3,5
-    [['./output/dilithium2_ref', './output/dilithium2_sha256_ref', './output/dilithium2_sha512_ref', './output/dilithium2_avx2', './output/dilithium2_sha256_avx2', './output/dilithium2_sha512_avx2'], 'TM_VF_dilithium_2_All.png', 'Dilithium 2 Versions vs SHA',10,6],
-    [['./output/dilithium3_ref', './output/dilithium3_sha256_ref', './output/dilithium3_sha512_ref', './output/dilithium3_avx2', './output/dilithium3_sha256_avx2', './output/dilithium3_sha512_avx2'], 'TM_VF_dilithium_3_All.png', 'Dilithium 3 Versions vs SHA',10,6],
-    [['./output/dilithium5_ref', './output/dilithium5_sha256_ref', './output/dilithium5_sha512_ref', './output/dilithium5_avx2', './output/dilithium5_sha256_avx2', './output/dilithium5_sha512_avx2'], 'TM_VF_dilithium_5_All.png', 'Dilithium 5 Versions vs SHA',10,6],
-    # ONLY FALCON 512 and 1024
-    [['./output/falcon2_ref', './output/falcon2_ref_sha256', './output/falcon2_ref_sha512', './output/falcon2_avx2', './output/falcon2_avx2_sha256', './output/falcon2_avx2_sha512'], 'TM_VF_falcon_2_All.png', 'Falcon 2 Versions vs SHA',10,6],
-    [['./output/falcon5_ref', './output/falcon5_ref_sha256', './output/falcon5_ref_sha512', './output/falcon5_avx2', './output/falcon5_avx2_sha256', './output/falcon5_avx2_sha512'], 'TM_VF_falcon_5_All.png', 'Falcon 5 Versions vs SHA',10,6],
-    # ONLY SPHINCS+ 128,192,256
-    [['./output/sphincs128_ref', './output/sphincs128_sha256_ref', './output/sphincs128_sha512_ref', './output/sphincs128_avx2', './output/sphincs128_sha256_avx2', './output/sphincs128_sha512_avx2'], 'TM_VF_sphincs_128_All.png', 'SPHINCS+ 128 Versions vs SHA',10,6],
-    [['./output/sphincs192_ref', './output/sphincs192_sha256_ref', './output/sphincs192_sha512_ref', './output/sphincs192_avx2', './output/sphincs192_sha256_avx2', './output/sphincs192_sha512_avx2'], 'TM_VF_sphincs_192_All.png', 'SPHINCS+ 192 Versions vs SHA',10,6],
-    [['./output/sphincs256_ref', './output/sphincs256_sha256_ref', './output/sphincs256_sha512_ref', './output/sphincs256_avx2', './output/sphincs256_sha256_avx2', './output/sphincs256_sha512_avx2'], 'TM_VF_sphincs_256_All.png', 'SPHINCS+ 256 Versions vs SHA',10,6],
-    # DIFFERENT SECURITY LEVELS WITH NO SHA
-    [['./output/dilithium2_ref', './output/falcon2_ref', './output/sphincs128_ref', './output/dilithium2_avx2', './output/falcon2_avx2', './output/sphincs128_avx2'], 'TM_VF_128bit_security_level.png', 'Security Level 1 & 2',10,6],
-    [['./output/dilithium3_ref', './output/sphincs192_ref', './output/dilithium3_avx2', './output/sphincs192_avx2'], 'TM_VF_192bit_security_level.png', 'Security Level 3',10,6],
-    [['./output/dilithium5_ref', './output/falcon5_ref', './output/sphincs256_ref', './output/dilithium5_avx2', './output/falcon5_avx2', './output/sphincs256_avx2'], 'TM_VF_256bit_security_level.png', 'Security Level 5',10,6],
-    # DIFFERENT SECURITY LEVELS WITH SHA-256
-    [['./output/dilithium2_sha256_ref', './output/falcon2_ref_sha256', './output/sphincs128_sha256_ref', './output/dilithium2_sha256_avx2', './output/falcon2_avx2_sha256', './output/sphincs128_sha256_avx2', './output/rsa_112_sha256'], 'deprecated/TM_VF_128bit_security_level_sha256.png', 'Security Level 1 & 2 with SHA-256',10,6],
-    [['./output/dilithium3_sha256_ref', './output/sphincs192_sha256_ref', './output/dilithium3_sha256_avx2', './output/sphincs192_sha256_avx2', './output/rsa_128_sha256'], 'deprecated/TM_VF_192bit_security_level_sha256.png', 'Security Level 3 with SHA-256',10,6],
-    [['./output/dilithium5_sha256_ref', './output/falcon5_ref_sha256', './output/sphincs256_sha256_ref', './output/dilithium5_sha256_avx2', './output/falcon5_avx2_sha256', './output/sphincs256_sha256_avx2', './output/rsa_256_sha256'], 'deprecated/TM_VF_256bit_security_level_sha256.png', 'Security Level 5 with SHA-256',10,6],
-    # DIFFERENT SECURITY LEVELS WITH SHA-512
-    [['./output/dilithium2_sha512_ref', './output/falcon2_ref_sha512', './output/sphincs128_sha512_ref', './output/dilithium2_sha512_avx2', './output/falcon2_avx2_sha512', './output/sphincs128_sha512_avx2', './output/rsa_112_sha512'], 'deprecated/TM_VF_128bit_security_level_sha512.png', 'Security Level 1 & 2 with SHA-512',10,6],
-    [['./output/dilithium3_sha512_ref', './output/sphincs192_sha512_ref', './output/dilithium3_sha512_avx2', './output/sphincs192_sha512_avx2', './output/rsa_128_sha512'], 'deprecated/TM_VF_192bit_security_level_sha512.png', 'Security Level 3 with SHA-512',10,6],
-    [['./output/dilithium5_sha512_ref', './output/falcon5_ref_sha512', './output/sphincs256_sha512_ref', './output/dilithium5_sha512_avx2', './output/falcon5_avx2_sha512', './output/sphincs256_sha512_avx2', './output/rsa_256_sha512'], 'deprecated/TM_VF_256bit_security_level_sha512.png', 'Security Level 5 with SHA-512',10,6],
-    # DOUBLE CHECK
-    [['./output/dilithium2_avx2', './liboqs_double_check/risultati_Dilithium2_avx2', './output/dilithium3_avx2', './liboqs_double_check/risultati_Dilithium3_avx2', './output/dilithium5_avx2', './liboqs_double_check/risultati_Dilithium5_avx2'], 'double_check/TM_VF_dilithium.png', 'Dilithium - Double Check',10,6],
-    [['./output/falcon2_avx2', './liboqs_double_check/risultati_Falcon-512_avx2', './output/falcon5_avx2', './liboqs_double_check/risultati_Falcon-1024_avx2'], 'double_check/TM_VF_falcon.png', 'Falcon - Double Check',10,6],
-     [['./output/sphincs128_avx2', './liboqs_double_check/risultati_SPHINCS+-SHA2-128f-simple_avx2', './output/sphincs192_avx2', './liboqs_double_check/risultati_SPHINCS+-SHA2-192f-simple_avx2', './output/sphincs256_avx2', './liboqs_double_check/risultati_SPHINCS+-SHA2-256f-simple_avx2'], 'double_check/TM_VF_sphincs.png', 'Sphincs+ - Double Check',10,6]
-]
-
-# Aggiungi una progress bar
-with tqdm(total=len(file_groups), desc="Generating Verify Time Plots", unit="plot") as pbar:
-    for file_paths in file_groups:
-        # Lettura del gruppo di files
-        df_all = read_multiple_files(file_paths[0])
-        # Applicazione del mapping ai nomi degli algoritmi
-        df_all['algorithm'] = df_all['algorithm'].map(algorithm_name_mapping)
-        # Creazione del grafico con simboli diversi per REF e AVX2
-        create_verify_time_plot(df_all, './plot/Time_Verify/' + file_paths[1], file_paths[2])
+
+
 
 
 
 
 
 # Dizionario per mappare i nomi degli algoritmi ai nuovi nomi
-algorithm_name_mapping = {
+algorithm_name_mapping_histogram = {
     'dilithium2_ref': 'Dilithium 2',
     'dilithium3_ref': 'Dilithium 3',
     'dilithium5_ref': 'Dilithium 5',
@@ -657,8 +471,8 @@ algorithm_name_mapping = {
 ### =========================================================
 
 # Funzione per creare il grafico a barre con il tempo medio di firma
-def create_sign_time_histogram_plot(df_all, output_file, title):
-    plt.figure(figsize=(file_paths[3], file_paths[4]))
+def create_sign_time_histogram_plot(df_all, output_file, title, figsize):
+    plt.figure(figsize=figsize)
     
     # Calcola il tempo medio di firma per ogni combinazione di algoritmo e versione
     avg_sign_times = df_all.groupby(['algorithm', 'version'])['sign_time'].mean().reset_index()
@@ -679,40 +493,9 @@ def create_sign_time_histogram_plot(df_all, output_file, title):
     plt.yscale('log')
     save_or_show_plot(output_file)
     plt.close()
-    # Aggiorna la progress bar
-    pbar.update(1)
-
-# Gruppi di file da confrontare + nome di salvataggio grafo
-file_groups = [ # WITH SHA-256
-    [['./output/dilithium2_sha256_ref', './output/dilithium3_sha256_ref', './output/dilithium5_sha256_ref', './output/dilithium2_sha256_avx2', './output/dilithium3_sha256_avx2', './output/dilithium5_sha256_avx2'], 'TM_SG_H_dilithium_sha256.png', 'Dilithium Versions with SHA-256',12,4],
-    [['./output/falcon2_ref_sha256', './output/falcon5_ref_sha256', './output/falcon2_avx2_sha256', './output/falcon5_avx2_sha256'], 'TM_SG_H_falcon_sha256.png', 'Falcon Versions with SHA-256',12,4],
-    [['./output/sphincs128_sha256_ref', './output/sphincs192_sha256_ref', './output/sphincs256_sha256_ref', './output/sphincs128_sha256_avx2', './output/sphincs192_sha256_avx2', './output/sphincs256_sha256_avx2'], 'TM_SG_H_sphincs_sha256.png', 'Sphincs+ Versions with SHA-256',12,4],
-    [['./output/rsa_80_sha256', './output/rsa_112_sha256', './output/rsa_128_sha256', './output/rsa_192_sha256', './output/rsa_256_sha256'], 'TM_SG_H_rsa_sha256.png', 'RSA Versions with SHA-256',12,4],
-    # WITH SHA-512
-    [['./output/dilithium2_sha512_ref', './output/dilithium3_sha512_ref', './output/dilithium5_sha512_ref', './output/dilithium2_sha512_avx2', './output/dilithium3_sha512_avx2', './output/dilithium5_sha512_avx2'], 'TM_SG_H_dilithium_sha512.png', 'Dilithium Versions with SHA-512',12,4],
-    [['./output/falcon2_ref_sha512', './output/falcon5_ref_sha512', './output/falcon2_avx2_sha512', './output/falcon5_avx2_sha512'], 'TM_SG_H_falcon_sha512.png', 'Falcon Versions with SHA-512',12,4],
-    [['./output/sphincs128_sha512_ref', './output/sphincs192_sha512_ref', './output/sphincs256_sha512_ref', './output/sphincs128_sha512_avx2', './output/sphincs192_sha512_avx2', './output/sphincs256_sha512_avx2'], 'TM_SG_H_sphincs_sha512.png', 'Sphincs+ Versions with SHA-512',12,4],
-    [['./output/rsa_80_sha512', './output/rsa_112_sha512', './output/rsa_128_sha512', './output/rsa_192_sha512', './output/rsa_256_sha512'], 'TM_SG_H_rsa_sha512.png', 'RSA Versions with SHA-512',12,4],
-    # DIFFERENT SECURITY LEVELS WITH SHA-256
-    [['./output/dilithium2_sha256_ref', './output/falcon2_ref_sha256', './output/sphincs128_sha256_ref', './output/dilithium2_sha256_avx2', './output/falcon2_avx2_sha256', './output/sphincs128_sha256_avx2', './output/rsa_112_sha256'], 'TM_SG_H_128bit_security_level_sha256.png', 'Security Level 1 & 2 with SHA-256',12,4],
-    [['./output/dilithium3_sha256_ref', './output/sphincs192_sha256_ref', './output/dilithium3_sha256_avx2', './output/sphincs192_sha256_avx2', './output/rsa_128_sha256'], 'TM_SG_H_192bit_security_level_sha256.png', 'Security Level 3 with SHA-256',12,4],
-    [['./output/dilithium5_sha256_ref', './output/falcon5_ref_sha256', './output/sphincs256_sha256_ref', './output/dilithium5_sha256_avx2', './output/falcon5_avx2_sha256', './output/sphincs256_sha256_avx2', './output/rsa_256_sha256'], 'TM_SG_H_256bit_security_level_sha256.png', 'Security Level 5 with SHA-256',12,4],
-    # DIFFERENT SECURITY LEVELS WITH SHA-512
-    [['./output/dilithium2_sha512_ref', './output/falcon2_ref_sha512', './output/sphincs128_sha512_ref', './output/dilithium2_sha512_avx2', './output/falcon2_avx2_sha512', './output/sphincs128_sha512_avx2', './output/rsa_112_sha512'], 'TM_SG_H_128bit_security_level_sha512.png', 'Security Level 1 & 2 with SHA-512',12,4],
-    [['./output/dilithium3_sha512_ref', './output/sphincs192_sha512_ref', './output/dilithium3_sha512_avx2', './output/sphincs192_sha512_avx2', './output/rsa_128_sha512'], 'TM_SG_H_192bit_security_level_sha512.png', 'Security Level 3 with SHA-512',12,4],
-    [['./output/dilithium5_sha512_ref', './output/falcon5_ref_sha512', './output/sphincs256_sha512_ref', './output/dilithium5_sha512_avx2', './output/falcon5_avx2_sha512', './output/sphincs256_sha512_avx2', './output/rsa_256_sha512'], 'TM_SG_H_256bit_security_level_sha512.png', 'Security Level 5 with SHA-512',12,4]
-]
-
-
-# Aggiungi una progress bar
-with tqdm(total=len(file_groups), desc="Generating Sign Time H-Plots", unit="plot") as pbar:
-    for file_paths in file_groups:
-        # Lettura del gruppo di files
-        df_all = read_multiple_files(file_paths[0])
-        # Applicazione del mapping ai nomi degli algoritmi
-        df_all['algorithm'] = df_all['algorithm'].map(algorithm_name_mapping)
-        # Creazione del grafico con simboli diversi per REF e AVX2
-        create_sign_time_histogram_plot(df_all, './plot/Time_Sign/' + file_paths[1], file_paths[2])
+
+
+
 
 
 ### ============================================================
@@ -720,8 +503,8 @@ with tqdm(total=len(file_groups), desc="Generating Sign Time H-Plots", unit="plo
 ### ============================================================
 
 # Funzione per creare il grafico a barre con il tempo medio di firma
-def create_verify_time_histogram_plot(df_all, output_file, title):
-    plt.figure(figsize=(file_paths[3], file_paths[4]))
+def create_verify_time_histogram_plot(df_all, output_file, title, figsize):
+    plt.figure(figsize=figsize)
     
     # Calcola il tempo medio di firma per ogni combinazione di algoritmo e versione
     avg_verify_times = df_all.groupby(['algorithm', 'version'])['verify_time'].mean().reset_index()
@@ -742,36 +525,75 @@ def create_verify_time_histogram_plot(df_all, output_file, title):
     plt.yscale('log')
     save_or_show_plot(output_file)
     plt.close()
-    # Aggiorna la progress bar
-    pbar.update(1)
-
-# Gruppi di file da confrontare + nome di salvataggio grafo
-file_groups = [ # WITH SHA-256
-    [['./output/dilithium2_sha256_ref', './output/dilithium3_sha256_ref', './output/dilithium5_sha256_ref', './output/dilithium2_sha256_avx2', './output/dilithium3_sha256_avx2', './output/dilithium5_sha256_avx2'], 'TM_VF_H_dilithium_sha256.png', 'Dilithium Versions with SHA-256',12,4],
-    [['./output/falcon2_ref_sha256', './output/falcon5_ref_sha256', './output/falcon2_avx2_sha256', './output/falcon5_avx2_sha256'], 'TM_VF_H_falcon_sha256.png', 'Falcon Versions with SHA-256',12,4],
-    [['./output/sphincs128_sha256_ref', './output/sphincs192_sha256_ref', './output/sphincs256_sha256_ref', './output/sphincs128_sha256_avx2', './output/sphincs192_sha256_avx2', './output/sphincs256_sha256_avx2'], 'TM_VF_H_sphincs_sha256.png', 'Sphincs+ Versions with SHA-256',12,4],
-    [['./output/rsa_80_sha256', './output/rsa_112_sha256', './output/rsa_128_sha256', './output/rsa_192_sha256', './output/rsa_256_sha256'], 'TM_VF_H_rsa_sha256.png', 'RSA Versions with SHA-256',12,4],
-    # WITH SHA-512
-    [['./output/dilithium2_sha512_ref', './output/dilithium3_sha512_ref', './output/dilithium5_sha512_ref', './output/dilithium2_sha512_avx2', './output/dilithium3_sha512_avx2', './output/dilithium5_sha512_avx2'], 'TM_VF_H_dilithium_sha512.png', 'Dilithium Versions with SHA-512',12,4],
-    [['./output/falcon2_ref_sha512', './output/falcon5_ref_sha512', './output/falcon2_avx2_sha512', './output/falcon5_avx2_sha512'], 'TM_VF_H_falcon_sha512.png', 'Falcon Versions with SHA-512',12,4],
-    [['./output/sphincs128_sha512_ref', './output/sphincs192_sha512_ref', './output/sphincs256_sha512_ref', './output/sphincs128_sha512_avx2', './output/sphincs192_sha512_avx2', './output/sphincs256_sha512_avx2'], 'TM_VF_H_sphincs_sha512.png', 'Sphincs+ Versions with SHA-512',12,4],
-    [['./output/rsa_80_sha512', './output/rsa_112_sha512', './output/rsa_128_sha512', './output/rsa_192_sha512', './output/rsa_256_sha512'], 'TM_VF_H_rsa_sha512.png', 'RSA Versions with SHA-512',12,4],
-    # DIFFERENT SECURITY LEVELS WITH SHA-256
-    [['./output/dilithium2_sha256_ref', './output/falcon2_ref_sha256', './output/sphincs128_sha256_ref', './output/dilithium2_sha256_avx2', './output/falcon2_avx2_sha256', './output/sphincs128_sha256_avx2', './output/rsa_112_sha256'], 'TM_VF_H_128bit_security_level_sha256.png', 'Security Level 1 & 2 with SHA-256',12,4],
-    [['./output/dilithium3_sha256_ref', './output/sphincs192_sha256_ref', './output/dilithium3_sha256_avx2', './output/sphincs192_sha256_avx2', './output/rsa_128_sha256'], 'TM_VF_H_192bit_security_level_sha256.png', 'Security Level 3 with SHA-256',12,4],
-    [['./output/dilithium5_sha256_ref', './output/falcon5_ref_sha256', './output/sphincs256_sha256_ref', './output/dilithium5_sha256_avx2', './output/falcon5_avx2_sha256', './output/sphincs256_sha256_avx2', './output/rsa_256_sha256'], 'TM_VF_H_256bit_security_level_sha256.png', 'Security Level 5 with SHA-256',12,4],
-    # DIFFERENT SECURITY LEVELS WITH SHA-512
-    [['./output/dilithium2_sha512_ref', './output/falcon2_ref_sha512', './output/sphincs128_sha512_ref', './output/dilithium2_sha512_avx2', './output/falcon2_avx2_sha512', './output/sphincs128_sha512_avx2', './output/rsa_112_sha512'], 'TM_VF_H_128bit_security_level_sha512.png', 'Security Level 1 & 2 with SHA-512',12,4],
-    [['./output/dilithium3_sha512_ref', './output/sphincs192_sha512_ref', './output/dilithium3_sha512_avx2', './output/sphincs192_sha512_avx2', './output/rsa_128_sha512'], 'TM_VF_H_192bit_security_level_sha512.png', 'Security Level 3 with SHA-512',12,4],
-    [['./output/dilithium5_sha512_ref', './output/falcon5_ref_sha512', './output/sphincs256_sha512_ref', './output/dilithium5_sha512_avx2', './output/falcon5_avx2_sha512', './output/sphincs256_sha512_avx2', './output/rsa_256_sha512'], 'TM_VF_H_256bit_security_level_sha512.png', 'Security Level 5 with SHA-512',12,4]
-]
-
-# Aggiungi una progress bar
-with tqdm(total=len(file_groups), desc="Generating Verify Time H-Plots", unit="plot") as pbar:
-    for file_paths in file_groups:
-        # Lettura del gruppo di files
-        df_all = read_multiple_files(file_paths[0])
-        # Applicazione del mapping ai nomi degli algoritmi
-        df_all['algorithm'] = df_all['algorithm'].map(algorithm_name_mapping)
-        # Creazione del grafico con simboli diversi per REF e AVX2
-        create_verify_time_histogram_plot(df_all, './plot/Time_Verify/' + file_paths[1], file_paths[2])
\ No newline at end of file
+
+
+
+
+
+### ================================================
+### ========= RENDERING PARALLELO DEI GRAFICI =======
+### ================================================
+
+# Funzioni di disegno per ogni tipo di grafico dichiarato nel manifest
+plot_functions = {
+    'key_sizes': create_key_sizes_plot,
+    'message_io': create_signature_size_plot,
+    'keygen_time': create_keygen_time_histogram,
+    'sign_time': create_sign_time_plot,
+    'verify_time': create_verify_time_plot,
+    'sign_time_histogram': create_sign_time_histogram_plot,
+    'verify_time_histogram': create_verify_time_histogram_plot
+}
+
+# Mapping dei nomi degli algoritmi utilizzabili dai tipi di grafico del manifest
+name_mappings = {
+    'default': algorithm_name_mapping,
+    'time': algorithm_name_mapping_time,
+    'histogram': algorithm_name_mapping_histogram
+}
+
+# Gruppi di file da confrontare, nomi e dimensioni dei grafici: vedi plot_manifest.json
+manifest = plot_engine.load_manifest('performance')
+
+# File con lo stato della build incrementale: grafico -> impronta dei suoi input
+BUILD_STATE_FILE = './plot/.build_state.json'
+
+# Funzione eseguita da ogni job (nel processo principale o in un worker)
+# I dati non vengono passati al worker: vengono letti dalla cache su disco di result_store
+def render_job(job):
+    kind, file_paths = job
+    plot_kind = manifest['plot_kinds'][kind]
+    # Lettura del gruppo di files
+    df_all = read_multiple_files(file_paths[0])
+    # Applicazione del mapping ai nomi degli algoritmi
+    df_all['algorithm'] = df_all['algorithm'].map(name_mappings[plot_kind['name_mapping']])
+    # Creazione del grafico
+    output_file = plot_kind['output_dir'] + file_paths[1]
+    plot_functions[kind](df_all, output_file, file_paths[2], (file_paths[3], file_paths[4]))
+    return output_file
+
+# Funzione per descrivere un job: percorso del grafico e parametri che ne determinano il contenuto
+def describe_job(job):
+    kind, file_paths = job
+    plot_kind = manifest['plot_kinds'][kind]
+    params = {
+        'kind': kind,
+        'output_dir': plot_kind['output_dir'],
+        'name_mapping': name_mappings[plot_kind['name_mapping']],
+        'rcparams': {'font.size': plt.rcParams['font.size']}
+    }
+    return plot_kind['output_dir'] + file_paths[1], params
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generazione dei grafici delle performance')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='numero di processi per il rendering (1 = seriale)')
+    parser.add_argument('-f', '--force', action='store_true', help='rigenera tutti i grafici, anche quelli i cui input non sono cambiati')
+    parser.add_argument('-k', '--kind', action='append', choices=sorted(plot_functions), help='genera solo i grafici del tipo indicato (ripetibile)')
+    parser.add_argument('-a', '--available', action='store_true', help='genera solo i grafici i cui file di input esistono già')
+    args = parser.parse_args()
+
+    jobs = plot_engine.build_jobs(manifest, args.kind)
+    if args.available:
+        jobs = plot_engine.available_jobs(jobs)
+    plot_engine.render_all(jobs, render_job, describe_job, BUILD_STATE_FILE, os.path.abspath(__file__),
+                           workers=args.jobs, incremental=not args.force, show_plots=SHOW_PLOTS)